@@ -1,8 +1,9 @@
 import itertools
 import logging
+import mmap
 import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Iterable
 from typing import IO, Any, Optional, cast
 
 from fandango.constraints.constraint import Constraint
@@ -22,6 +23,9 @@ from fandango.logger import LOGGER, set_raise_on_logged_exceptions
 
 DEFAULT_MAX_GENERATIONS = 500
 
+# Default number of bytes (or characters) read at once by `parse_stream()`
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
 
 class FandangoBase(ABC):
     """Public Fandango API"""
@@ -172,6 +176,36 @@ class FandangoBase(ABC):
         """
         pass
 
+    @abstractmethod
+    def parse_stream(
+        self,
+        source: str | bytes | mmap.mmap | IO[Any] | Iterable[str | bytes],
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Parse a (possibly unbounded) input incrementally.
+        :param source: The input: a string, bytes, a memory-mapped file, an open file or pipe, or an iterable of chunks
+        :param chunk_size: The number of bytes (or characters) to read at once
+        :return: A generator yielding derivation trees as soon as they are complete
+        """
+        pass
+
+
+def _read_chunks(
+    source: str | bytes | mmap.mmap | IO[Any] | Iterable[str | bytes],
+    chunk_size: int,
+) -> Generator[str | bytes, None, None]:
+    """Yield the contents of `source` in chunks of at most `chunk_size`"""
+    if isinstance(source, (str, bytes, mmap.mmap)):
+        for i in range(0, len(source), chunk_size):
+            yield source[i : i + chunk_size]
+    elif hasattr(source, "read"):
+        while chunk := source.read(chunk_size):
+            yield chunk
+    else:
+        yield from source
+
 
 class Fandango(FandangoBase):
     """Evolutionary testing with Fandango."""
@@ -272,8 +306,14 @@ class Fandango(FandangoBase):
                 )
                 constraints += cast(list[Constraint | SoftValue], extra_constraints)
 
+        sessions = settings.pop("sessions", None) or 1
+
         match self._last_fuzzing_mode:
             case FuzzingMode.COMPLETE:
+                if sessions > 1:
+                    LOGGER.warning(
+                        "Concurrent sessions are only supported for protocol specs; ignoring"
+                    )
                 self.fandango = DefaultAlgorithm(
                     self.grammar, constraints, start_symbol=start_symbol, **settings
                 )
@@ -285,6 +325,7 @@ class Fandango(FandangoBase):
                         start_symbol=start_symbol,
                         **settings,
                     ),
+                    sessions=sessions,
                 )
             case _:
                 raise ValueError(f"Unknown fuzzing mode: {self._last_fuzzing_mode}")
@@ -442,6 +483,8 @@ class Fandango(FandangoBase):
         solution_i = 0
         solutions = []
 
+        # Initialize for `mode`, such that generate_solutions() keeps the settings
+        self._last_fuzzing_mode = mode
         self.init_population(extra_constraints=extra_constraints, **settings)
         raw_generator = self.generate_solutions(max_generations, mode)
 
@@ -496,3 +539,27 @@ class Fandango(FandangoBase):
                 last_tree = tree
 
         return last_tree
+
+    def parse_stream(
+        self,
+        source: str | bytes | mmap.mmap | IO[Any] | Iterable[str | bytes],
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Parse a (possibly unbounded) input incrementally, with bounded memory.
+        If the start symbol is defined as a repetition `<element>*` (or `+`, `{m,n}`),
+        yield a tree for each `<element>` as soon as it is complete;
+        otherwise, yield a tree for each consecutive instance of the start symbol.
+        Each element is the longest prefix of the remaining input that parses.
+        Constraints are not checked, as they refer to the input as a whole.
+        :param source: The input: a string, bytes, a memory-mapped file, an open file or pipe, or an iterable of chunks
+        :param chunk_size: The number of bytes (or characters) to read at once
+        :return: A generator yielding derivation trees as soon as they are complete
+        :raises FandangoParseError: if (the remainder of) the input does not parse
+        """
+        for tree in self.grammar.parse_stream(
+            _read_chunks(source, chunk_size), start=self._start_symbol
+        ):
+            self.grammar.populate_sources(tree)
+            yield tree
@@ -0,0 +1,202 @@
+import os
+import sys
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Iterator, MutableMapping
+from typing import Any, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Default bound on the memory held by all managed caches together, in MiB
+DEFAULT_CACHE_MEMORY_MB = 512
+
+# How deep `approximate_size()` follows references
+SIZE_DEPTH = 4
+
+
+def cache_memory() -> int:
+    """Return the bound on the memory held by all managed caches, in bytes"""
+    return int(
+        float(os.environ.get("FANDANGO_CACHE_MEMORY_MB", DEFAULT_CACHE_MEMORY_MB))
+        * 1024
+        * 1024
+    )
+
+
+def approximate_size(value: Any, depth: int = SIZE_DEPTH) -> int:
+    """
+    Approximate the number of bytes held by `value`: its own size plus the sizes
+    of the containers and objects it refers to, up to `depth` references deep.
+    Objects without a `__dict__` (such as derivation trees) count with their own size only,
+    as they are typically shared with the rest of the program.
+
+    :param value: The value to measure
+    :param depth: How deep to follow references
+    :return: The approximate size in bytes
+    """
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    items: Any
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        items = [*value.keys(), *value.values()]
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        items = value
+    elif hasattr(value, "__dict__"):
+        size += sys.getsizeof(value.__dict__)
+        items = value.__dict__.values()
+    else:
+        return size
+    return size + sum(approximate_size(item, depth - 1) for item in items)
+
+
+class CacheManager:
+    """
+    Bounds the memory held by a number of `ManagedCache` instances together.
+    All entries of all caches are kept in one least-recently-used order;
+    when the approximate size of all entries exceeds `max_bytes`,
+    the least recently used entries are evicted, regardless of the cache they are in.
+
+    Like the caches themselves, the manager is not thread-safe.
+    """
+
+    _instance: Optional["CacheManager"] = None
+
+    @classmethod
+    def instance(cls) -> "CacheManager":
+        """
+        Returns the manager shared by all caches that are not given one explicitly.
+        If it does not exist, it creates one.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        :param max_bytes: The bound on the memory held by all caches;
+            default: `$FANDANGO_CACHE_MEMORY_MB` (512) MiB
+        """
+        self.max_bytes = cache_memory() if max_bytes is None else max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        # Sizes of all entries as (cache ID, key) pairs, least recently used first
+        self._entries: OrderedDict[tuple[int, Hashable], int] = OrderedDict()
+        self._caches: weakref.WeakValueDictionary[int, ManagedCache[Any, Any]] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def __len__(self) -> int:
+        """The number of entries across all caches"""
+        return len(self._entries)
+
+    def _register(self, cache: "ManagedCache[Any, Any]") -> None:
+        self._caches[id(cache)] = cache
+        # Release the memory accounted to a cache once it is garbage-collected
+        weakref.finalize(cache, self._release, id(cache), cache._data)
+
+    def _touch(self, cache_id: int, key: Hashable) -> None:
+        self._entries.move_to_end((cache_id, key))
+
+    def _add(self, cache: "ManagedCache[Any, Any]", key: Hashable, size: int) -> None:
+        self._entries[(id(cache), key)] = size
+        self.bytes += size
+        cache.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            (cache_id, old_key), old_size = self._entries.popitem(last=False)
+            self.bytes -= old_size
+            self.evictions += 1
+            owner = self._caches.get(cache_id)
+            if owner is not None:
+                owner.bytes -= old_size
+                owner._data.pop(old_key, None)
+
+    def _remove(self, cache: "ManagedCache[Any, Any]", key: Hashable) -> None:
+        size = self._entries.pop((id(cache), key), 0)
+        self.bytes -= size
+        cache.bytes -= size
+
+    def _release(self, cache_id: int, keys: Iterable[Hashable]) -> None:
+        """Forget the entries `keys` of the cache with the ID `cache_id`."""
+        for key in keys:
+            self.bytes -= self._entries.pop((cache_id, key), 0)
+
+    def stats(self) -> dict[str, Any]:
+        """:return: The memory held, entries, evictions, and overall hit rate of all caches."""
+        caches = list(self._caches.values())
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        return {
+            "caches": len(caches),
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        }
+
+
+class ManagedCache(MutableMapping[K, V]):
+    """
+    A cache whose entries are evicted by a `CacheManager`, which bounds the
+    memory held by all of its caches together.
+    The cache counts its hits and misses.
+    A hit is a successful lookup; a miss is the storing of a newly computed value,
+    as all users store what they could not look up.
+
+    Caches are pickled without their entries.
+    """
+
+    def __init__(self, manager: Optional[CacheManager] = None):
+        """
+        :param manager: The manager to account entries to; default: `CacheManager.instance()`
+        """
+        self.manager = manager if manager is not None else CacheManager.instance()
+        self.hits = 0
+        self.misses = 0
+        # The approximate size of all entries; maintained by the manager
+        self.bytes = 0
+        self._data: dict[K, V] = {}
+        self.manager._register(self)
+
+    def __getitem__(self, key: K) -> V:
+        value = self._data[key]
+        self.manager._touch(id(self), key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if key in self._data:
+            self.manager._remove(self, key)
+        self._data[key] = value
+        self.misses += 1
+        self.manager._add(self, key, approximate_size(value))
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+        self.manager._remove(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self.manager._release(id(self), self._data)
+        self.bytes = 0
+        self._data.clear()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return ManagedCache, ()
+
+    def __repr__(self) -> str:
+        return f"ManagedCache({len(self)} entries, {self.bytes} bytes)"
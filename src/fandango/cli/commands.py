@@ -12,7 +12,12 @@ from ansi_styles import ansiStyles as styles
 
 import fandango
 from fandango import DerivationTree, Fandango
-from fandango.cli.output import open_file, output_population, output_solution
+from fandango.cli.output import (
+    make_executor_pool,
+    open_file,
+    output_population,
+    output_solution,
+)
 from fandango.cli.parser import get_parser
 from fandango.cli.upgrade import check_for_fandango_update
 from fandango.cli.utils import (
@@ -31,9 +36,11 @@ from fandango.converters.fan.FandangoFandangoConverter import FandangoFandangoCo
 from fandango.converters.FandangoConverter import FandangoConverter
 from fandango.converters.state.FandangoStateConverter import FandangoStateConverter
 from fandango.errors import FandangoError, FandangoParseError
+from fandango.evolution.havoc import HavocStage
+from fandango.evolution.profiler import Profiler, span
 from fandango.language.grammar import FuzzingMode
 from fandango.language.grammar.grammar import Grammar
-from fandango.language.parse.cache import clear_cache, get_cache_dir
+from fandango.language.parse.cache import cache_stats, clear_cache, get_cache_dir
 from fandango.logger import LOGGER, print_exception
 
 
@@ -140,10 +147,22 @@ def cd_command(args: argparse.Namespace) -> None:
 def fuzz_command(args: argparse.Namespace) -> None:
     """Invoke the fuzzer"""
 
+    profile_out = getattr(args, "profile_out", None)
+    profiler = Profiler(enabled=profile_out is not None)
+    try:
+        with profiler:
+            _fuzz(args)
+    finally:
+        if profile_out is not None:
+            profiler.write(profile_out)
+
+
+def _fuzz(args: argparse.Namespace) -> None:
     LOGGER.info("---------- Parsing FANDANGO content ----------")
     if args.fan_files:
         # Override given default content (if any)
-        grammar, constraints = parse_contents_from_args(args)
+        with span("parse_spec"):
+            grammar, constraints = parse_contents_from_args(args)
     else:
         grammar = DEFAULT_FAN_CONTENT[0]
         constraints = DEFAULT_FAN_CONTENT[1]
@@ -186,21 +205,60 @@ def fuzz_command(args: argparse.Namespace) -> None:
                 f"Output directory {out_dir} is not a directory or is not empty"
             )
 
+    executor_pool = make_executor_pool(args)
+
+    havoc_stage: Optional[HavocStage] = None
+    if getattr(args, "havoc_ratio", None):
+        if args.format != "string":
+            LOGGER.warning(
+                f"--havoc-ratio requires --format=string, not {args.format!r}; not producing havoc mutants"
+            )
+        else:
+            havoc_stage = HavocStage(args.havoc_ratio)
+
+    def output_mutants(mutants: list[bytes]) -> None:
+        assert havoc_stage is not None
+        first_index = havoc_stage.mutants_made - len(mutants)
+        with span("output"):
+            for i, mutant in enumerate(mutants):
+                output_solution(
+                    mutant,
+                    args,
+                    first_index + i,
+                    file_mode,
+                    executor_pool=executor_pool,
+                    prefix="fandango-havoc",
+                )
+
     def solutions_callback(sol: DerivationTree, i: int) -> None:
-        return output_solution(sol, args, i, file_mode)
+        with span("output"):
+            output_solution(sol, args, i, file_mode, executor_pool=executor_pool)
+        if havoc_stage is not None:
+            with span("havoc"):
+                mutants = havoc_stage.add(sol)
+            output_mutants(mutants)
 
     max_generations = args.max_generations
     desired_solutions = args.desired_solutions
     infinite = args.infinite
 
-    population = fandango.fuzz(
-        solution_callback=solutions_callback,
-        max_generations=max_generations,
-        desired_solutions=desired_solutions,
-        infinite=infinite,
-        mode=FuzzingMode.COMPLETE,
-        **settings,
-    )
+    try:
+        population = fandango.fuzz(
+            solution_callback=solutions_callback,
+            max_generations=max_generations,
+            desired_solutions=desired_solutions,
+            infinite=infinite,
+            mode=FuzzingMode.COMPLETE,
+            **settings,
+        )
+        if havoc_stage is not None:
+            with span("havoc"):
+                mutants = havoc_stage.flush()
+            output_mutants(mutants)
+            LOGGER.info(f"Produced {havoc_stage.mutants_made} havoc mutants")
+    finally:
+        if executor_pool is not None:
+            executor_pool.close()
 
     if args.validate:
         LOGGER.debug("Validating population")
@@ -468,6 +526,20 @@ def clear_command(args: argparse.Namespace) -> None:
         print("done", file=sys.stderr)
 
 
+def cache_command(args: argparse.Namespace) -> None:
+    if args.cache_action == "clear":
+        clear_command(args)
+        return
+
+    stats = cache_stats()
+    print(f"Cache directory: {stats.directory}")
+    print(f"Cached specs:    {stats.entries}")
+    print(
+        f"Total size:      {stats.total_bytes / 1024 / 1024:.1f} MB"
+        f" (limit: {stats.max_bytes / 1024 / 1024:.1f} MB)"
+    )
+
+
 def nop_command(args: argparse.Namespace) -> None:
     # Dummy command such that we can list ! and / as commands. Never executed.
     pass
@@ -504,6 +576,7 @@ COMMANDS: dict[str, Callable[[argparse.Namespace], None]] = {
     "talk": talk_command,
     "convert": convert_command,
     "clear-cache": clear_command,
+    "cache": cache_command,
     "cd": cd_command,
     "help": help_command,
     "copyright": copyright_command,
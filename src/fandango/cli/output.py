@@ -2,22 +2,29 @@ import argparse
 import contextlib
 import ctypes
 import os
-import subprocess
 import sys
-import tempfile
 from io import UnsupportedOperation
-from typing import IO, Any
+from typing import IO, Any, Optional
 
 from fandango.errors import FandangoError
+from fandango.executor import INPUT_METHODS, Executor, ExecutorPool
 from fandango.language.tree import DerivationTree
 from fandango.logger import LOGGER, clear_visualization
 
 
 def output(
-    tree: DerivationTree, args: argparse.Namespace, file_mode: str
+    tree: DerivationTree | bytes, args: argparse.Namespace, file_mode: str
 ) -> str | bytes:
     assert file_mode == "binary" or file_mode == "text"
 
+    if isinstance(tree, bytes):
+        # Havoc mutants have no tree structure; we can only output their bytes
+        if args.format != "string":
+            raise FandangoError(f"Cannot output raw bytes in format {args.format!r}")
+        if file_mode == "binary":
+            return tree
+        return tree.decode("utf-8", errors="replace")
+
     if args.format == "string":
         if file_mode == "binary":
             LOGGER.debug("Output as bytes")
@@ -97,22 +104,24 @@ def output_population(
 
 
 def output_solution_to_directory(
-    solution: DerivationTree,
+    solution: DerivationTree | bytes,
     args: argparse.Namespace,
     solution_index: int,
     file_mode: str,
+    *,
+    prefix: str = "fandango",
 ) -> None:
     LOGGER.debug(f"Storing solution in directory {args.directory!r}")
     os.makedirs(args.directory, exist_ok=True)
 
-    basename = f"fandango-{solution_index:04d}{args.filename_extension}"
+    basename = f"{prefix}-{solution_index:04d}{args.filename_extension}"
     filename = os.path.join(args.directory, basename)
     with open_file(filename, file_mode, mode="w") as fd:
         fd.write(output(solution, args, file_mode))
 
 
 def output_solution_to_file(
-    solution: DerivationTree,
+    solution: DerivationTree | bytes,
     args: argparse.Namespace,
     file_mode: str,
 ) -> None:
@@ -133,47 +142,51 @@ def output_solution_to_file(
         fd.write(output(solution, args, file_mode))
 
 
+def make_executor_pool(args: argparse.Namespace) -> Optional[ExecutorPool]:
+    """
+    Create a pool of executors for running the test command given in `args`.
+    :return: The pool, or None if there is no test command or it is run in-process.
+    """
+    if (
+        getattr(args, "use_fcc", False)
+        or not getattr(args, "test_command", None)
+        or getattr(args, "input_method", None) not in INPUT_METHODS
+    ):
+        return None
+    return ExecutorPool(
+        [args.test_command] + args.test_args,
+        executors=getattr(args, "executors", None) or 1,
+        input_method=args.input_method,
+        timeout=getattr(args, "exec_timeout", None),
+        suffix=getattr(args, "filename_extension", ""),
+    )
+
+
 def output_solution_with_test_command(
-    solution: DerivationTree, args: argparse.Namespace, file_mode: str
+    solution: DerivationTree | bytes,
+    args: argparse.Namespace,
+    file_mode: str,
+    *,
+    executor_pool: Optional[ExecutorPool] = None,
 ) -> None:
     LOGGER.info(f"Running {args.test_command}")
     base_cmd = [args.test_command] + args.test_args
 
-    if args.input_method == "filename":
-        prefix = "fandango-"
-        suffix = args.filename_extension
-        mode = "wb" if file_mode == "binary" else "w"
-
-        # The return type is private, so we need to use Any
-        def named_temp_file(*, mode: str, prefix: str, suffix: str) -> Any:
-            try:
-                # Windows needs delete_on_close=False, so the subprocess can access the file by name
-                return tempfile.NamedTemporaryFile(  # type: ignore [call-overload, unused-ignore] # the mode type is not available from the library and only broken on some OSs
-                    mode=mode,
-                    prefix=prefix,
-                    suffix=suffix,
-                    delete_on_close=False,
-                )
-            except Exception:
-                # Python 3.11 and earlier have no 'delete_on_close'
-                return tempfile.NamedTemporaryFile(
-                    mode=mode, prefix=prefix, suffix=suffix
-                )
-
-        with named_temp_file(mode=mode, prefix=prefix, suffix=suffix) as fd:
-            fd.write(output(solution, args, file_mode))
-            fd.flush()
-            cmd = base_cmd + [fd.name]
-            LOGGER.debug(f"Running {cmd}")
-            subprocess.run(cmd, text=True)
-    elif args.input_method == "stdin":
-        cmd = base_cmd
-        LOGGER.debug(f"Running {cmd} with individual as stdin")
-        subprocess.run(
-            cmd,
-            input=output(solution, args, file_mode),
-            text=(None if file_mode == "binary" else True),
+    if args.input_method in INPUT_METHODS:
+        data = output(solution, args, file_mode)
+        if executor_pool is not None:
+            executor_pool.submit(data)
+            return
+        executor = Executor(
+            base_cmd,
+            input_method=args.input_method,
+            timeout=getattr(args, "exec_timeout", None),
+            suffix=args.filename_extension,
         )
+        try:
+            executor.run(data)
+        finally:
+            executor.close()
     elif args.input_method == "libfuzzer":
         if args.file_mode != "binary" or file_mode != "binary":
             raise NotImplementedError("LibFuzzer harnesses only support binary input")
@@ -186,7 +199,7 @@ def output_solution_with_test_command(
 
 
 def output_solution_to_stdout(
-    solution: DerivationTree,
+    solution: DerivationTree | bytes,
     args: argparse.Namespace,
     file_mode: str,
 ) -> None:
@@ -226,12 +239,14 @@ def output_solution_to_stdout(
 
 
 def output_solution(
-    solution: DerivationTree,
+    solution: DerivationTree | bytes,
     args: argparse.Namespace,
     solution_index: int,
     file_mode: str,
     *,
     output_on_stdout: bool = True,
+    executor_pool: Optional[ExecutorPool] = None,
+    prefix: str = "fandango",
 ) -> None:
     assert file_mode == "binary" or file_mode == "text"
 
@@ -241,7 +256,9 @@ def output_solution(
         return
 
     if args.directory:
-        output_solution_to_directory(solution, args, solution_index, file_mode)
+        output_solution_to_directory(
+            solution, args, solution_index, file_mode, prefix=prefix
+        )
         output_on_stdout = False
 
     if args.output:
@@ -253,7 +270,9 @@ def output_solution(
         and "test_command" in args
         and args.test_command
     ):
-        output_solution_with_test_command(solution, args, file_mode)
+        output_solution_with_test_command(
+            solution, args, file_mode, executor_pool=executor_pool
+        )
         output_on_stdout = False
 
     # Default
@@ -79,6 +79,12 @@ def get_parser(in_command_line: bool = True) -> argparse.ArgumentParser:
         )
     )
 
+    _populate_cache_parser(
+        parser=commands.add_parser(
+            "cache", help="Show statistics on or clear the Fandango parsing cache."
+        )
+    )
+
     if in_command_line:
         commands.add_parser("shell", help="Run an interactive shell (default).")
     else:
@@ -273,6 +279,86 @@ def _get_algorithm_parser() -> argparse.ArgumentParser:
         help="Directory or ZIP archive with initial population.",
         default=None,
     )
+    algorithm_group.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of processes to evaluate constraints in (default: 1; 0: one per CPU).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--islands",
+        type=int,
+        help="Number of populations to evolve in separate processes, exchanging their elites (default: 1; 0: one per CPU).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--migration-interval",
+        type=int,
+        help="With --islands, the number of generations between migrations of elites (default: 5).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--migration-rate",
+        type=float,
+        help="With --islands, the fraction of the population that migrates (default: 0.1).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--sessions",
+        type=int,
+        metavar="N",
+        help="For protocol specs, run N sessions concurrently, each with its own party instances and connections (default: 1).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse constraint results for unchanged subtrees after mutation and crossover. Assumes constraints only depend on the subtrees they refer to.",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--dedup",
+        choices=["exact", "bloom", "disk"],
+        help="How to remember the solutions produced so far, such that none is produced twice: "
+        "'exact' keeps all of them in memory (default); "
+        "'bloom' uses a few bytes per solution, but suppresses new solutions with a small probability (see --dedup-error-rate); "
+        "'disk' keeps them in a file (see --dedup-file). Use 'bloom' or 'disk' for long --infinite runs.",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--dedup-error-rate",
+        type=float,
+        metavar="RATE",
+        help="With --dedup=bloom, the probability of suppressing a new solution (default: 1e-6).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--dedup-file",
+        metavar="FILE",
+        help="With --dedup=disk, the file to keep solutions in; solutions already in it are not produced again (default: a temporary file).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--checkpoint-dir",
+        metavar="DIR",
+        help="Periodically save the state of the evolution (population, adaptive parameters, solutions produced) to DIR, such that it can be resumed with --resume.",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        metavar="N",
+        help="With --checkpoint-dir or --resume, the number of generations between checkpoints (default: 10).",
+        default=None,
+    )
+    algorithm_group.add_argument(
+        "--resume",
+        metavar="DIR",
+        help="Resume the evolution from the checkpoint in DIR instead of creating a new initial population, and keep saving checkpoints there. "
+        "If DIR holds no checkpoint yet, start from scratch.",
+        default=None,
+    )
     algorithm_group.add_argument(
         "--progress-bar",
         choices=["on", "off", "auto"],
@@ -481,14 +567,44 @@ def _populate_fuzz_parser(parser: argparse.ArgumentParser) -> None:
         default=None,
         help="Stop after a given number of seconds, evaluated at each generation beginning. Example: `--stop-after-seconds 60`",
     )
+    parser.add_argument(
+        "--havoc-ratio",
+        type=float,
+        metavar="RATIO",
+        dest="havoc_ratio",
+        default=None,
+        help="For each solution, also output RATIO byte-level havoc mutants of it. These are near-valid inputs that need not conform to the spec. Requires `--format=string`. Example: `--havoc-ratio 100`",
+    )
+    parser.add_argument(
+        "--profile-out",
+        type=str,
+        metavar="FILE",
+        dest="profile_out",
+        default=None,
+        help="Profile Fandango and write the time spent in each phase, constraint, and cache to FILE (JSON; also in Chrome trace event format, viewable in `chrome://tracing` or Perfetto).",
+    )
 
     command_group = parser.add_argument_group("command invocation settings")
 
     command_group.add_argument(
         "--input-method",
-        choices=["stdin", "filename", "libfuzzer"],
+        choices=["stdin", "filename", "persistent", "libfuzzer"],
         default="filename",
-        help="When invoking COMMAND, choose whether Fandango input will be passed as standard input (`stdin`), as last argument on the command line (`filename`) (default), or to a libFuzzer style harness compiled to a shared .so/.dylib object (`libfuzzer`).",
+        help="When invoking COMMAND, choose whether Fandango input will be passed as standard input (`stdin`), as last argument on the command line (`filename`) (default), to a persistent COMMAND reading length-prefixed inputs from standard input and writing one status line per input (`persistent`), or to a libFuzzer style harness compiled to a shared .so/.dylib object (`libfuzzer`).",
+    )
+    command_group.add_argument(
+        "--executors",
+        type=int,
+        metavar="N",
+        default=None,
+        help="Run up to N instances of COMMAND concurrently while Fandango keeps generating inputs (default: 1).",
+    )
+    command_group.add_argument(
+        "--exec-timeout",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Kill COMMAND if processing an input takes longer than SECONDS (default: no timeout).",
     )
     command_group.add_argument(
         "--fcc",
@@ -624,6 +740,18 @@ def _populate_clear_cache_parser(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def _populate_cache_parser(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "cache_action",
+        type=str,
+        choices=["stats", "clear"],
+        nargs="?",
+        default="stats",
+        help="Show cache statistics (default) or clear the cache.",
+    )
+    _populate_clear_cache_parser(parser)
+
+
 def _populate_cd_parser(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "directory",
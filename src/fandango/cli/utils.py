@@ -94,6 +94,18 @@ def make_fandango_settings(
     _copy_setting(args, settings, "max_repetitions")
     _copy_setting(args, settings, "max_nodes")
     _copy_setting(args, settings, "max_node_rate")
+    _copy_setting(args, settings, "workers", args_name="jobs")
+    _copy_setting(args, settings, "incremental")
+    _copy_setting(args, settings, "islands")
+    _copy_setting(args, settings, "migration_interval")
+    _copy_setting(args, settings, "migration_rate")
+    _copy_setting(args, settings, "sessions")
+    _copy_setting(args, settings, "dedup")
+    _copy_setting(args, settings, "dedup_error_rate")
+    _copy_setting(args, settings, "dedup_file")
+    _copy_setting(args, settings, "checkpoint_dir")
+    _copy_setting(args, settings, "checkpoint_interval")
+    _copy_setting(args, settings, "resume")
     if hasattr(args, "stop_criterion") and args.stop_criterion is not None:
         # previously is a str, we eval it into a function
         settings["stop_criterion"] = eval(args.stop_criterion)
@@ -1,15 +1,51 @@
 import abc
 import itertools
 import warnings
-from typing import TYPE_CHECKING, Any, Optional, TypedDict
+from collections.abc import Callable, Iterator
+from types import CodeType
+from typing import TYPE_CHECKING, Any, Optional, TypedDict, TypeVar
 
+from fandango.cache_manager import ManagedCache
 from fandango.language.search import Container, NonTerminalSearch
 from fandango.language.symbols.non_terminal import NonTerminal
 from fandango.language.tree import DerivationTree
+from fandango.utils import compile_expression
 
 if TYPE_CHECKING:
     from fandango.constraints.fitness import Fitness
 
+T = TypeVar("T")
+
+# Tree attributes and predicates whose result depends on the context of a tree,
+# not only on the subtree itself. Expressions referring to any of these are
+# never evaluated incrementally.
+CONTEXT_DEPENDENT_NAMES = frozenset(
+    {
+        "parent",
+        "_parent",
+        "get_root",
+        "get_path",
+        "get_choices_path",
+        "get_index",
+        "split_end",
+        "prefix",
+        "sources",
+        "origin_repetitions",
+        "read_only",
+        "is_before",
+        "is_after",
+        "get_index_within",
+    }
+)
+
+
+def _code_names(code: CodeType) -> Iterator[str]:
+    """Yield all global and attribute names used in `code`, including nested code"""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_names(const)
+
 
 class GeneticBaseInitArgs(TypedDict, total=False):
     searches: Optional[dict[str, NonTerminalSearch]]
@@ -37,6 +73,7 @@ class GeneticBase(abc.ABC):
         self.searches = searches or dict()
         self.local_variables = local_variables or dict()
         self.global_variables = global_variables or dict()
+        self._combination_cache: Optional[ManagedCache[int, Any]] = None
 
     def get_access_points(self) -> list[NonTerminal]:
         """
@@ -97,6 +134,87 @@ class GeneticBase(abc.ABC):
             )
         return list(itertools.product(*nodes))
 
+    def get_expressions(self) -> list[str]:
+        """
+        Get the Python expressions evaluated for each combination.
+        :return list[str]: The list of expressions.
+        """
+        return []
+
+    def set_incremental(self, incremental: bool) -> None:
+        """
+        Enable or disable incremental evaluation.
+        In incremental mode, the results of evaluating expressions are cached
+        for each combination of bound values. After a tree has been edited,
+        only combinations that involve changed subtrees are evaluated again.
+        This assumes that expressions only depend on the subtrees bound to them;
+        expressions referring to `CONTEXT_DEPENDENT_NAMES` are always evaluated.
+        :param bool incremental: True to enable incremental evaluation.
+        """
+        if incremental and self.is_context_independent():
+            self._combination_cache = ManagedCache()
+        else:
+            self._combination_cache = None
+
+    @property
+    def incremental(self) -> bool:
+        """True if incremental evaluation is enabled."""
+        return self._combination_cache is not None
+
+    def is_context_independent(self) -> bool:
+        """
+        Check whether the expressions only depend on the values bound to them.
+        :return bool: True if no expression refers to `CONTEXT_DEPENDENT_NAMES`.
+        """
+        for expression in self.get_expressions():
+            try:
+                code = compile_expression(expression)
+            except SyntaxError:
+                return False
+            if any(name in CONTEXT_DEPENDENT_NAMES for name in _code_names(code)):
+                return False
+        return True
+
+    def combination_key(
+        self,
+        values: dict[str, Any],
+        local_variables: Optional[dict[str, Any]] = None,
+    ) -> Optional[int]:
+        """
+        Get the key to cache the results for a combination under.
+        Trees hash by their structure, so an unchanged subtree in an edited tree has the same key.
+        :param dict[str, Any] values: The values bound in the combination.
+        :param Optional[dict[str, Any]] local_variables: The local variables passed to `fitness()`.
+        :return Optional[int]: The key, or None if results are not to be cached.
+        """
+        if self._combination_cache is None:
+            return None
+        try:
+            return hash((tuple(values.items()), tuple((local_variables or {}).items())))
+        except TypeError:
+            # Unhashable values
+            return None
+
+    def evaluate_combination(
+        self, key: Optional[int], evaluate: Callable[..., T], *args: Any
+    ) -> T:
+        """
+        Evaluate a combination, reusing an earlier result for the same key in incremental mode.
+        :param Optional[int] key: The key, as returned by `combination_key()`.
+        :param Callable[..., T] evaluate: The function computing the result.
+        :param args: The arguments to pass to `evaluate`.
+        :return T: The result.
+        """
+        if key is None or self._combination_cache is None:
+            return evaluate(*args)
+        try:
+            return self._combination_cache[key]  # type: ignore[no-any-return] # the cache holds results of `evaluate`
+        except KeyError:
+            pass
+        result = evaluate(*args)
+        self._combination_cache[key] = result
+        return result
+
     def check(
         self,
         tree: DerivationTree,
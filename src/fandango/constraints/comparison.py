@@ -1,5 +1,4 @@
 import math
-from copy import copy
 from typing import Any, Optional, Unpack, cast
 
 from fandango.constraints.base import GeneticBaseInitArgs
@@ -132,6 +131,9 @@ class ComparisonConstraint(Constraint):
         self._right = right
         self._types_checked = False
 
+    def get_expressions(self) -> list[str]:
+        return [self._left, self._right]
+
     def fitness(
         self,
         tree: DerivationTree,
@@ -143,8 +145,9 @@ class ComparisonConstraint(Constraint):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return copy(self.cache[tree_hash])
+        cached = self.cached_fitness(tree_hash, tree)
+        if cached is not None:
+            return cached
         # Initialize the fitness values
         fitness_values = []
         failing_trees: list[FailingTree] = []
@@ -170,7 +173,8 @@ class ComparisonConstraint(Constraint):
                 name: (container.annotation, container.evaluate())
                 for name, container in combination
             }
-            local_vars.update({k: v[1] for k, v in var_evals.items()})
+            values = {k: v[1] for k, v in var_evals.items()}
+            local_vars.update(values)
             left_trees = []
             right_trees = []
 
@@ -187,17 +191,11 @@ class ComparisonConstraint(Constraint):
             single_right_tree = None if len(right_trees) != 1 else right_trees[0]
 
             # Evaluate the left and right side of the comparison
-            try:
-                left = self.eval(self._left, self.global_variables, local_vars)
-            except Exception as e:
-                print_exception(e, f"Evaluation failed: {self._left}")
-                continue
-
-            try:
-                right = self.eval(self._right, self.global_variables, local_vars)
-            except Exception as e:
-                print_exception(e, f"Evaluation failed: {self._right}")
+            key = self.combination_key(values, local_variables)
+            sides = self.evaluate_combination(key, self._evaluate_sides, local_vars)
+            if sides is None:
                 continue
+            left, right = sides
 
             if not hasattr(self, "types_checked") or not self._types_checked:
                 self._types_checked = self.check_type_compatibility(left, right)
@@ -226,9 +224,29 @@ class ComparisonConstraint(Constraint):
             suggestion=ApplyAllSuggestions(suggestions),
         )
         # Cache the fitness
-        self.cache[tree_hash] = fitness
+        self.cache_fitness(tree_hash, tree, fitness)
         return fitness
 
+    def _evaluate_sides(self, local_vars: dict[str, Any]) -> Optional[tuple[Any, Any]]:
+        """
+        Evaluate the left and right side of the comparison.
+        :param dict[str, Any] local_vars: The local variables to evaluate in.
+        :return: The values of both sides, or None if evaluation failed.
+        """
+        try:
+            left = self.eval(self._left, self.global_variables, local_vars)
+        except Exception as e:
+            print_exception(e, f"Evaluation failed: {self._left}")
+            return None
+
+        try:
+            right = self.eval(self._right, self.global_variables, local_vars)
+        except Exception as e:
+            print_exception(e, f"Evaluation failed: {self._right}")
+            return None
+
+        return left, right
+
     def check_type_compatibility(self, left: Any, right: Any) -> bool:
         """
         Check the types of `left` and `right` are compatible in a comparison.
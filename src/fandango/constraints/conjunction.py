@@ -1,5 +1,4 @@
 import itertools
-from copy import copy
 from typing import Any, Optional, Unpack
 
 from fandango.constraints.base import GeneticBaseInitArgs
@@ -47,8 +46,9 @@ class ConjunctionConstraint(Constraint):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return copy(self.cache[tree_hash])
+        cached = self.cached_fitness(tree_hash, tree)
+        if cached is not None:
+            return cached
         if self.lazy:
             # If the conjunction is lazy, evaluate the constraints one by one and stop if one fails
             fitness_values = list()
@@ -86,7 +86,7 @@ class ConjunctionConstraint(Constraint):
             failing_trees=failing_trees,
         )
         # Cache the fitness
-        self.cache[tree_hash] = fitness
+        self.cache_fitness(tree_hash, tree, fitness)
         return fitness
 
     def format_as_spec(self) -> str:
@@ -107,6 +107,11 @@ class ConjunctionConstraint(Constraint):
         for constraint in self.constraints:
             constraint.clear_cache()
 
+    def set_incremental(self, incremental: bool) -> None:
+        super().set_incremental(incremental)
+        for constraint in self.constraints:
+            constraint.set_incremental(incremental)
+
     def invert(self) -> "Constraint":
         """
         Return an inverted version of this conjunction constraint.
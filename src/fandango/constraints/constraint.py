@@ -1,16 +1,15 @@
 import warnings
 from abc import ABC, abstractmethod
 from collections.abc import Collection
-from typing import TYPE_CHECKING, Any, Optional
-
-from cachetools import LRUCache
+from typing import TYPE_CHECKING, Any, Optional, cast
 
+from fandango.cache_manager import ManagedCache
 from fandango.constraints.base import GeneticBase
-from fandango.constraints.fitness import ConstraintFitness
+from fandango.constraints.fitness import CachedFitness, ConstraintFitness
 from fandango.language.search import NonTerminalSearch
 from fandango.language.symbols.non_terminal import NonTerminal
 from fandango.language.tree import DerivationTree
-from fandango.utils import cache_size
+from fandango.utils import compile_expression
 
 if TYPE_CHECKING:
     from fandango.constraints.constraint_visitor import ConstraintVisitor
@@ -34,7 +33,7 @@ class Constraint(GeneticBase, ABC):
         :param Optional[dict[str, Any]] global_variables: The global variables to use.
         """
         super().__init__(searches, local_variables, global_variables)
-        self.cache: LRUCache[int, ConstraintFitness] = LRUCache(maxsize=cache_size())
+        self.cache: ManagedCache[int, CachedFitness] = ManagedCache()
 
     @abstractmethod
     def fitness(
@@ -55,9 +54,38 @@ class Constraint(GeneticBase, ABC):
         """
         pass
 
+    def cached_fitness(
+        self, tree_hash: int, tree: DerivationTree
+    ) -> Optional[ConstraintFitness]:
+        """
+        Look up the fitness cached under `tree_hash`.
+        :param int tree_hash: The hash of the tree and its scope, as returned by `get_hash()`.
+        :param DerivationTree tree: The tree to calculate the fitness of.
+        :return Optional[ConstraintFitness]: A copy of the cached fitness, with failing trees
+            within the root of `tree`; None if there is none.
+        """
+        cached = self.cache.get(tree_hash)
+        if cached is None:
+            return None
+        return cast(Optional[ConstraintFitness], cached.restore(tree.get_root()))
+
+    def cache_fitness(
+        self, tree_hash: int, tree: DerivationTree, fitness: ConstraintFitness
+    ) -> None:
+        """
+        Cache the fitness of `tree` under `tree_hash`.
+        Failing trees are cached by their paths from the root of `tree`, such that the cache does not keep it alive.
+        :param int tree_hash: The hash of the tree and its scope, as returned by `get_hash()`.
+        :param DerivationTree tree: The tree the fitness was calculated of.
+        :param ConstraintFitness fitness: The fitness.
+        """
+        self.cache[tree_hash] = CachedFitness.of(fitness, tree.get_root())
+
     def clear_cache(self) -> None:
         """Empty this constraint's fitness cache (recursing into nested constraints)."""
         self.cache.clear()
+        if self._combination_cache is not None:
+            self._combination_cache.clear()
 
     def get_symbols(self) -> Collection[NonTerminalSearch]:
         """
@@ -74,7 +102,7 @@ class Constraint(GeneticBase, ABC):
         """
         Evaluate the tree in the context of local and global variables.
         """
-        return eval(expression, global_variables, local_variables)
+        return eval(compile_expression(expression), global_variables, local_variables)
 
     @abstractmethod
     def format_as_spec(self) -> str:
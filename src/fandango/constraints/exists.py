@@ -1,5 +1,4 @@
 import itertools
-from copy import copy
 from typing import Any, Optional, Unpack
 
 from fandango.constraints import LEGACY
@@ -56,8 +55,9 @@ class ExistsConstraint(Constraint):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return copy(self.cache[tree_hash])
+        cached = self.cached_fitness(tree_hash, tree)
+        if cached is not None:
+            return cached
         fitness_values = list()
         scope = scope or dict()
         local_variables = local_variables or dict()
@@ -97,7 +97,7 @@ class ExistsConstraint(Constraint):
             failing_trees=failing_trees,
         )
         # Cache the fitness
-        self.cache[tree_hash] = fitness
+        self.cache_fitness(tree_hash, tree, fitness)
         return fitness
 
     def format_as_spec(self) -> str:
@@ -122,6 +122,10 @@ class ExistsConstraint(Constraint):
         super().clear_cache()
         self.statement.clear_cache()
 
+    def set_incremental(self, incremental: bool) -> None:
+        super().set_incremental(incremental)
+        self.statement.set_incremental(incremental)
+
     def invert(self) -> "Constraint":
         """
         Return an inverted version of this exists constraint.
@@ -1,4 +1,3 @@
-from copy import copy
 from typing import Any, Optional, Unpack
 
 from fandango.constraints.base import GeneticBaseInitArgs
@@ -26,6 +25,9 @@ class ExpressionConstraint(Constraint):
         super().__init__(**kwargs)
         self.expression = expression
 
+    def get_expressions(self) -> list[str]:
+        return [self.expression]
+
     def fitness(
         self,
         tree: DerivationTree,
@@ -41,8 +43,9 @@ class ExpressionConstraint(Constraint):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return copy(self.cache[tree_hash])
+        cached = self.cached_fitness(tree_hash, tree)
+        if cached is not None:
+            return cached
         # Initialize the fitness values
         solved = 0
         total = 0
@@ -58,11 +61,13 @@ class ExpressionConstraint(Constraint):
             local_vars = self.local_variables.copy()
             if local_variables:
                 local_vars.update(local_variables)
-            local_vars.update(
-                {name: container.evaluate() for name, container in combination}
-            )
+            values = {name: container.evaluate() for name, container in combination}
+            local_vars.update(values)
+            key = self.combination_key(values, local_variables)
             try:
-                result = self.eval(self.expression, self.global_variables, local_vars)
+                result = self.evaluate_combination(
+                    key, self.eval, self.expression, self.global_variables, local_vars
+                )
                 # Commented this out for now, as `None` is a valid result
                 # of functions such as `re.match()` -- AZ
                 # if result is None:
@@ -92,7 +97,7 @@ class ExpressionConstraint(Constraint):
             failing_trees=[FailingTree(t, self) for t in failing_trees],
         )
         # Cache the fitness
-        self.cache[tree_hash] = fitness
+        self.cache_fitness(tree_hash, tree, fitness)
         return fitness
 
     def format_as_spec(self) -> str:
@@ -1,10 +1,10 @@
 import abc
 import enum
 from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
 
 from fandango.constraints.base import GeneticBase
-from fandango.language.tree import DerivationTree
+from fandango.language.tree import DerivationTree, index_by_reference
 
 if TYPE_CHECKING:
     import fandango
@@ -224,3 +224,59 @@ class FailingTree:
 
     def __str__(self) -> str:
         return self.__repr__()
+
+
+class FailingTreeRef(NamedTuple):
+    """
+    A failing tree as held in fitness caches: by its path from the root of the
+    evaluated tree, such that cached fitnesses do not keep whole trees alive.
+    In a path, `i >= 0` stands for the `i`-th child, and `i < 0` for the `-1 - i`-th source.
+    Failing trees outside of that root are held as they are.
+    """
+
+    path: Optional[tuple[int, ...]]
+    tree: Optional[DerivationTree]
+    cause: GeneticBase
+
+    @staticmethod
+    def of(failing_tree: FailingTree, root: DerivationTree) -> "FailingTreeRef":
+        """
+        Reference `failing_tree` by its path from `root`.
+
+        :param failing_tree: The failing tree
+        :param root: The root of the evaluated tree
+        :return: The reference
+        """
+        path: list[int] = []
+        node = failing_tree.tree
+        while node is not root:
+            parent = node.parent
+            if parent is None:
+                return FailingTreeRef(None, failing_tree.tree, failing_tree.cause)
+            index = index_by_reference(parent.children, node)
+            if index is None:
+                index = index_by_reference(parent.sources, node)
+                if index is None:
+                    return FailingTreeRef(None, failing_tree.tree, failing_tree.cause)
+                index = -1 - index
+            path.append(index)
+            node = parent
+        return FailingTreeRef(tuple(reversed(path)), None, failing_tree.cause)
+
+    def resolve(self, root: DerivationTree) -> Optional[FailingTree]:
+        """
+        Return the failing tree at the path of this reference in `root`.
+
+        :param root: The root of the evaluated tree; its structure must equal the one of the root referenced from
+        :return: The failing tree, or None if the path does not exist in `root`
+        """
+        if self.path is None:
+            assert self.tree is not None
+            return FailingTree(self.tree, self.cause)
+        node = root
+        try:
+            for index in self.path:
+                node = node.children[index] if index >= 0 else node.sources[-1 - index]
+        except IndexError:
+            return None
+        return FailingTree(node, self.cause)
@@ -1,8 +1,9 @@
 import abc
 import copy
-from typing import Optional
+from typing import NamedTuple, Optional
 
-from fandango.constraints.failing_tree import FailingTree, Suggestion
+from fandango.constraints.failing_tree import FailingTree, FailingTreeRef, Suggestion
+from fandango.language.tree import DerivationTree
 
 
 class Fitness(abc.ABC):
@@ -178,3 +179,47 @@ class DistanceAwareConstraintFitness(ConstraintFitness):
 
     def __repr__(self) -> str:
         return f"DistanceAwareConstraintFitness(values={self.values})"
+
+
+class CachedFitness(NamedTuple):
+    """
+    A fitness as held in fitness caches, with its failing trees referenced by their
+    paths from the root of the evaluated tree; see `FailingTreeRef`.
+    """
+
+    fitness: Fitness
+    failing_trees: tuple[FailingTreeRef, ...]
+
+    @staticmethod
+    def of(fitness: Fitness, root: DerivationTree) -> "CachedFitness":
+        """
+        Prepare `fitness` for caching.
+
+        :param fitness: The fitness of a tree within `root`
+        :param root: The root of the evaluated tree
+        :return: The fitness to cache
+        """
+        # A shallow copy; `copy()` would copy the suggestion, too
+        stored = object.__new__(type(fitness))
+        stored.__dict__.update(fitness.__dict__)
+        stored.failing_trees = []
+        return CachedFitness(
+            stored, tuple(FailingTreeRef.of(ft, root) for ft in fitness.failing_trees)
+        )
+
+    def restore(self, root: DerivationTree) -> Optional[Fitness]:
+        """
+        Return a copy of the cached fitness, with the failing trees in `root`.
+
+        :param root: The root of the evaluated tree
+        :return: The fitness, or None if a failing tree does not exist in `root`
+        """
+        failing_trees = []
+        for ref in self.failing_trees:
+            failing_tree = ref.resolve(root)
+            if failing_tree is None:
+                return None
+            failing_trees.append(failing_tree)
+        fitness = copy.copy(self.fitness)
+        fitness.failing_trees = failing_trees
+        return fitness
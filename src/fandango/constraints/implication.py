@@ -45,8 +45,9 @@ class ImplicationConstraint(Constraint):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return copy(self.cache[tree_hash])
+        cached = self.cached_fitness(tree_hash, tree)
+        if cached is not None:
+            return cached
         # Evaluate the antecedent
         antecedent_fitness = self.antecedent.fitness(tree, scope, local_variables)
         if antecedent_fitness.success:
@@ -64,7 +65,7 @@ class ImplicationConstraint(Constraint):
                 NopSuggestion(),
             )
         # Cache the fitness
-        self.cache[tree_hash] = fitness
+        self.cache_fitness(tree_hash, tree, fitness)
         return fitness
 
     def format_as_spec(self) -> str:
@@ -85,6 +86,11 @@ class ImplicationConstraint(Constraint):
         self.antecedent.clear_cache()
         self.consequent.clear_cache()
 
+    def set_incremental(self, incremental: bool) -> None:
+        super().set_incremental(incremental)
+        self.antecedent.set_incremental(incremental)
+        self.consequent.set_incremental(incremental)
+
     def invert(self) -> "Constraint":
         """
         Return an inverted version of this implication constraint.
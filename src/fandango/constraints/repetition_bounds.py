@@ -1,5 +1,4 @@
 import random
-from copy import copy
 from itertools import zip_longest
 from typing import Any, Optional, Unpack
 
@@ -392,15 +391,16 @@ class RepetitionBoundsConstraint(Constraint):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return copy(self.cache[tree_hash])
+        cached = self.cached_fitness(tree_hash, tree)
+        if cached is not None:
+            return cached
 
         id_trees = tree.find_by_origin(self.repetition_id)
         if len(id_trees) == 0:
             # Assume that the field containing the nr of repetitions is zero.
             # This is the case where we might have deleted all repetitions from the tree.
             fitness = ConstraintFitness(1, 1, True, NopSuggestion())
-            self.cache[tree_hash] = fitness
+            self.cache_fitness(tree_hash, tree, fitness)
             return fitness
 
         reference_trees = self.group_by_repetition_id(id_trees)
@@ -472,7 +472,7 @@ class RepetitionBoundsConstraint(Constraint):
             failing_trees=failing_trees,
             suggestion=ApplyAllSuggestions(suggestions),
         )
-        self.cache[tree_hash] = fitness
+        self.cache_fitness(tree_hash, tree, fitness)
         return fitness
 
     def format_as_spec(self) -> str:
@@ -1,18 +1,18 @@
 import math
 from collections.abc import Callable, Collection
-from typing import Any, Optional
+from typing import Any, Optional, cast
 
-from cachetools import LRUCache
 from tdigest.tdigest import TDigest as BaseTDigest
 
+from fandango.cache_manager import ManagedCache
 from fandango.constraints.base import GeneticBase
 from fandango.constraints.failing_tree import FailingTree
-from fandango.constraints.fitness import ValueFitness
+from fandango.constraints.fitness import CachedFitness, ValueFitness
 from fandango.language.search import NonTerminalSearch
 from fandango.language.symbols import NonTerminal
 from fandango.language.tree import DerivationTree
 from fandango.logger import print_exception
-from fandango.utils import cache_size
+from fandango.utils import compile_expression
 
 
 class TDigest(BaseTDigest):
@@ -25,13 +25,34 @@ class TDigest(BaseTDigest):
             self.amplify_near_0 if optimization_goal == "min" else self.amplify_near_1
         )
 
-    def update(self, x: float, w: int = 1) -> None:
+    def update(self, x: float, w: float | int = 1) -> None:
         super().update(x, w)  # type: ignore[no-untyped-call] # TDigest is not typed
         if self._min is None or x < self._min:
             self._min = x
         if self._max is None or x > self._max:
             self._max = x
 
+    def to_dict(self) -> dict[str, Any]:
+        """Return the digest as a JSON-serializable dictionary, including the observed extrema."""
+        values: dict[str, Any] = super().to_dict()  # type: ignore[no-untyped-call] # TDigest is not typed
+        values["min"] = self._min
+        values["max"] = self._max
+        return values
+
+    def update_from_dict(self, dict_values: dict[str, Any]) -> "TDigest":
+        """Merge a digest saved by `to_dict()` into this one."""
+        super().update_from_dict(dict_values)  # type: ignore[no-untyped-call] # TDigest is not typed
+        for name, better in (("min", min), ("max", max)):
+            saved = dict_values.get(name)
+            current = getattr(self, f"_{name}")
+            if saved is not None:
+                setattr(
+                    self,
+                    f"_{name}",
+                    saved if current is None else better(saved, current),
+                )
+        return self
+
     def amplify_near_0(self, q: float | int) -> float:
         return 1 - math.exp(-self.contrast * q)
 
@@ -80,7 +101,10 @@ class Value(GeneticBase):
             global_variables=global_variables,
         )
         self.expression = expression
-        self.cache = LRUCache[int, ValueFitness](maxsize=cache_size())
+        self.cache: ManagedCache[int, CachedFitness] = ManagedCache()
+
+    def get_expressions(self) -> list[str]:
+        return [self.expression]
 
     def fitness(
         self,
@@ -97,8 +121,11 @@ class Value(GeneticBase):
         """
         tree_hash = self.get_hash(tree, scope, local_variables)
         # If the fitness has already been calculated, return the cached value
-        if tree_hash in self.cache:
-            return self.cache[tree_hash]
+        cached = self.cache.get(tree_hash)
+        if cached is not None:
+            restored = cached.restore(tree.get_root())
+            if restored is not None:
+                return cast(ValueFitness, restored)
         # If the tree is None, the fitness is 0
         if tree is None:
             fitness = ValueFitness()
@@ -111,16 +138,24 @@ class Value(GeneticBase):
                 local_vars = self.local_variables.copy()
                 if local_variables:
                     local_vars.update(local_variables)
-                local_vars.update(
-                    {name: container.evaluate() for name, container in combination}
-                )
+                bound_values = {
+                    name: container.evaluate() for name, container in combination
+                }
+                local_vars.update(bound_values)
                 for _, container in combination:
                     for node in container.get_trees():
                         if node not in trees:
                             trees.append(node)
+                key = self.combination_key(bound_values, local_variables)
                 try:
                     # Evaluate the expression
-                    result = eval(self.expression, self.global_variables, local_vars)
+                    result = self.evaluate_combination(
+                        key,
+                        eval,
+                        compile_expression(self.expression),
+                        self.global_variables,
+                        local_vars,
+                    )
                     values.append(result)
                 except Exception as e:
                     print_exception(e, f"Evaluation failed: {self.expression}")
@@ -130,12 +165,14 @@ class Value(GeneticBase):
                 values, failing_trees=[FailingTree(t, self) for t in trees]
             )
         # Cache the fitness
-        self.cache[tree_hash] = fitness
+        self.cache[tree_hash] = CachedFitness.of(fitness, tree.get_root())
         return fitness
 
     def clear_cache(self) -> None:
         """Empty this value's fitness cache."""
         self.cache.clear()
+        if self._combination_cache is not None:
+            self._combination_cache.clear()
 
     def get_symbols(self) -> Collection[NonTerminalSearch]:
         """
@@ -8,49 +8,201 @@ from fandango.evolution import GeneratorWithReturn
 from fandango.evolution.algorithm.base import GeneticAlgorithm
 from fandango.evolution.algorithm.simple import SimpleGeneticAlgorithm
 from fandango.evolution.population import IoPopulationManager
-from fandango.io import FandangoIO
+from fandango.io import FandangoIO, NetworkParty
 from fandango.io.coverage_filter import PacketCoverageFilter
 from fandango.io.navigation.coverage.coverage_goal import CoverageGoal
 from fandango.io.navigation.selection.packetselector import PacketSelector
 from fandango.io.packetparser import parse_next_remote_packet
 from fandango.language.grammar import FuzzingMode
+from fandango.language.grammar.grammar import Grammar
 from fandango.language.symbols.non_terminal import NonTerminal
 from fandango.language.tree import DerivationTree
 from fandango.logger import LOGGER, log_guidance_hint, log_message_transfer
 
 
+class ProtocolSession:
+    """
+    The state of a single protocol session with the system under test:
+    its parties, the messages exchanged so far, and the packet selector forecasting the next ones.
+    """
+
+    def __init__(
+        self,
+        io_instance: FandangoIO,
+        grammar: Grammar,
+        start_symbol: NonTerminal,
+        diversity_k: int,
+        coverage_goal: CoverageGoal,
+    ):
+        self.io_instance = io_instance
+        self.protocol_tree = DerivationTree(start_symbol)
+        self.packet_selector = PacketSelector(
+            grammar, io_instance, self.protocol_tree, diversity_k
+        )
+        self.packet_selector.set_coverage_goal(coverage_goal)
+        # When the session started waiting for a remote message, and for how long it may wait (-1: indefinitely)
+        self.waiting_since: Optional[float] = None
+        self.wait_timeout = -1
+
+
 class ProtocolAlgorithm(GeneticAlgorithm):
     def __init__(
         self,
         packet_algorithm: SimpleGeneticAlgorithm,
         coverage_goal: CoverageGoal = CoverageGoal.STATE_INPUTS,
         remote_response_timeout: int = 15,
+        sessions: int = 1,
     ):
+        """
+        :param packet_algorithm: The algorithm generating the packets sent by Fandango.
+        :param coverage_goal: When to stop starting new protocol runs.
+        :param remote_response_timeout: How long to wait for a message from a remote party, in seconds.
+        :param sessions: The number of protocol sessions to run concurrently, each with its own parties.
+        """
         self.CLEAR_CONSTRAINT_CACHE_INTERVAL = 100
         self._start_symbol = NonTerminal("<start>")
         self._packet_algorithm = packet_algorithm
+        if packet_algorithm.islands > 1:
+            LOGGER.warning(
+                "Islands are not supported in IO mode; using a single population"
+            )
+            packet_algorithm.islands = 1
         self.grammar = packet_algorithm.grammar
         self._population_manager = IoPopulationManager(
             self.grammar, str(self._start_symbol)
         )
         self._packet_algorithm.population_manager = self._population_manager
-        self._protocol_tree: DerivationTree = DerivationTree(self._start_symbol)
         self._coverage_goal = coverage_goal
         self._remote_response_timeout = remote_response_timeout
-        self._io_instance: FandangoIO = FandangoIO.instance()
-        self._packet_selector: PacketSelector = PacketSelector(
-            self.grammar,
-            self._io_instance,
-            self._protocol_tree,
-            self._packet_algorithm.diversity_k,
-        )
-        self._packet_selector.set_coverage_goal(self._coverage_goal)
+        if sessions < 1:
+            raise FandangoValueError("The number of sessions must be at least 1")
+        self._max_sessions = sessions
+        self._sessions = [self._new_session(FandangoIO.instance())]
+        self._session = self._sessions[0]
+        self._next_session_idx = 0
         self._packet_coverage_filter = PacketCoverageFilter(
             self._packet_algorithm.diversity_k, self.grammar
         )
         self.violations: list[tuple[DerivationTree, Exception]] = []
         self.throw_on_violation = False
 
+    def _new_session(self, io_instance: FandangoIO) -> ProtocolSession:
+        return ProtocolSession(
+            io_instance,
+            self.grammar,
+            self._start_symbol,
+            self._packet_algorithm.diversity_k,
+            self._coverage_goal,
+        )
+
+    # The state of the session currently being stepped
+    @property
+    def _io_instance(self) -> FandangoIO:
+        return self._session.io_instance
+
+    @property
+    def _protocol_tree(self) -> DerivationTree:
+        return self._session.protocol_tree
+
+    @_protocol_tree.setter
+    def _protocol_tree(self, tree: DerivationTree) -> None:
+        self._session.protocol_tree = tree
+
+    @property
+    def _packet_selector(self) -> PacketSelector:
+        return self._session.packet_selector
+
+    def _start_sessions(self) -> None:
+        """
+        Spawn the additional sessions, switching all network parties to the asyncio transport.
+        Falls back to a single session if the parties do not support concurrent sessions.
+        """
+        if self._max_sessions <= 1 or len(self._sessions) > 1:
+            return
+        io_instance = self._sessions[0].io_instance
+        io_instance.use_asyncio = True
+        try:
+            for _ in range(self._max_sessions - 1):
+                self._sessions.append(self._new_session(io_instance.spawn()))
+        except FandangoValueError as e:
+            LOGGER.warning(f"{e}; running a single protocol session")
+            io_instance.use_asyncio = False
+            self._stop_sessions()
+            return
+        except Exception:
+            self._stop_sessions()
+            raise
+        if any(
+            isinstance(party, NetworkParty) for party in io_instance.parties.values()
+        ):
+            # Restart the existing network parties on the asyncio transport
+            io_instance.reset_parties()
+        LOGGER.info(f"Running {len(self._sessions)} protocol sessions")
+
+    def _stop_sessions(self) -> None:
+        """Stop the parties of all sessions but the first one."""
+        for session in self._sessions[1:]:
+            session.io_instance.close()
+        self._sessions = self._sessions[:1]
+        self._session = self._sessions[0]
+        self._next_session_idx = 0
+
+    def _is_session_ready(self, session: ProtocolSession) -> bool:
+        return (
+            session.waiting_since is None
+            or session.io_instance.received_msg()
+            or (
+                session.wait_timeout >= 0
+                and time.monotonic() - session.waiting_since >= session.wait_timeout
+            )
+        )
+
+    def _select_session(self) -> ProtocolSession:
+        """
+        Return the next session (round robin) that can make progress,
+        waiting for remote messages if all sessions are waiting for one.
+        """
+        while True:
+            for offset in range(len(self._sessions)):
+                idx = (self._next_session_idx + offset) % len(self._sessions)
+                session = self._sessions[idx]
+                if self._is_session_ready(session):
+                    self._next_session_idx = (idx + 1) % len(self._sessions)
+                    return session
+
+            deadlines = [
+                session.waiting_since + session.wait_timeout
+                for session in self._sessions
+                if session.waiting_since is not None and session.wait_timeout >= 0
+            ]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            # All sessions share the receive lock of the first one
+            self._sessions[0].io_instance.wait_for_receive(
+                lambda _: any(
+                    session.io_instance.received_msg() for session in self._sessions
+                ),
+                timeout=timeout,
+            )
+
+    def _remote_response_timeout_for_next_packets(self) -> int:
+        for packet in self._packet_selector.next_packets:
+            if packet.node.sender == "TimerEvent":
+                return -1
+        return self._remote_response_timeout
+
+    def _is_remote_response_pending(self) -> bool:
+        """
+        With concurrent sessions, return True if the current session is still waiting
+        for a remote message, such that other sessions can make progress meanwhile.
+        """
+        if len(self._sessions) == 1 or self._io_instance.received_msg():
+            return False
+        session = self._session
+        if session.waiting_since is None:
+            session.waiting_since = time.monotonic()
+            session.wait_timeout = self._remote_response_timeout_for_next_packets()
+        return not self._is_session_ready(session)
+
     def _is_protocol_run_complete(self) -> bool:
         return (
             len(self._packet_selector.get_next_parties()) == 0
@@ -58,19 +210,17 @@ class ProtocolAlgorithm(GeneticAlgorithm):
             or self._coverage_goal == CoverageGoal.SINGLE_DERIVATION
         ) and self._packet_selector.is_complete()
 
-    def _wait_for_remote_message(self, timeout: int) -> bool:
-        wait_start = time.time()
-        while not self._io_instance.received_msg():
-            if time.time() - wait_start > timeout and timeout >= 0:
-                return False
-            time.sleep(0.025)
-        return True
+    def _wait_for_remote_message(self, timeout: float | int) -> bool:
+        return self._io_instance.wait_for_receive(
+            timeout=timeout if timeout >= 0 else None
+        )
 
     def _handle_remote_response(self) -> DerivationTree:
-        timeout = self._remote_response_timeout
-        for packet in self._packet_selector.next_packets:
-            if packet.node.sender == "TimerEvent":
-                timeout = -1
+        timeout: float | int = self._remote_response_timeout_for_next_packets()
+        waiting_since = self._session.waiting_since
+        if waiting_since is not None and timeout >= 0:
+            # Account for the time the session has been waiting already
+            timeout = max(0.0, timeout - (time.monotonic() - waiting_since))
         if not self._wait_for_remote_message(timeout):
             external_parties = self._packet_selector.next_external_parties()
             raise FandangoFailedError(
@@ -140,6 +290,7 @@ class ProtocolAlgorithm(GeneticAlgorithm):
                             eval_individual=self._packet_algorithm.evaluator.evaluate_individual,
                             max_nodes=self._packet_algorithm.adaptive_tuner.current_max_nodes,
                             target_population_size=self._packet_algorithm.population_size,
+                            eval_batch=self._packet_algorithm.evaluator.evaluate_batch,
                         ),
                     )
                 )
@@ -198,28 +349,21 @@ class ProtocolAlgorithm(GeneticAlgorithm):
         max_generations: Optional[int] = None,
         mode: FuzzingMode = FuzzingMode.COMPLETE,
     ) -> Generator[DerivationTree, None, None]:
-        iteration = 0
-        while True:
-            iteration += 1
-            if (
-                self.CLEAR_CONSTRAINT_CACHE_INTERVAL > 0
-                and iteration % self.CLEAR_CONSTRAINT_CACHE_INTERVAL == 0
-            ):
-                self._clear_constraint_caches()
-            self._packet_selector.compute(self._protocol_tree)
-            LOGGER.info(
-                f"Current coverage: {self._packet_selector.coverage_percent() * 100:.2f}%"
-            )
-
-            if self._is_failed_forecast():
-                raise FandangoFailedError("Could not forecast next packet")
+        self._start_sessions()
+        try:
+            iteration = 0
+            while True:
+                self._session = self._select_session()
+                iteration += 1
+                if (
+                    self.CLEAR_CONSTRAINT_CACHE_INTERVAL > 0
+                    and iteration % self.CLEAR_CONSTRAINT_CACHE_INTERVAL == 0
+                ):
+                    self._clear_constraint_caches()
+                final_tree = self._step(max_generations)
+                if final_tree is None:
+                    continue
 
-            if self._is_protocol_run_complete():
-                final_tree = random.choice(
-                    list(self._packet_selector.forecasting_result.complete_trees)
-                )
-                self._packet_selector.add_completed_tree(final_tree)
-                self._packet_coverage_filter.add_completed_tree(final_tree)
                 yield final_tree
                 if self._coverage_goal == CoverageGoal.SINGLE_DERIVATION:
                     return None
@@ -227,57 +371,90 @@ class ProtocolAlgorithm(GeneticAlgorithm):
                     log_guidance_hint("Full coverage reached, stopping evolution.")
                     return None
                 log_guidance_hint("Starting new protocol run.")
-                self._io_instance.reset_parties()
-                self._protocol_tree = DerivationTree(self._start_symbol, [])
-                continue
-
-            if self._should_generate_next_packet():
-                self._packet_algorithm.reset()
-                self._configure_fuzzable_packets()
-                self._packet_coverage_filter.set_current_tree(self._protocol_tree)
-                next_history_tree = self._generate_packet(
-                    max_generations=max_generations
+                self._restart_session()
+        finally:
+            self._stop_sessions()
+
+    def _step(self, max_generations: Optional[int]) -> Optional[DerivationTree]:
+        """
+        Advance the current session by one message.
+        :param max_generations: The maximum number of generations for generating a packet.
+        :return: The final tree if the protocol run of the session is complete, else None.
+        """
+        self._packet_selector.compute(self._protocol_tree)
+        LOGGER.info(
+            f"Current coverage: {self._packet_selector.coverage_percent() * 100:.2f}%"
+        )
+
+        if self._is_failed_forecast():
+            raise FandangoFailedError("Could not forecast next packet")
+
+        if self._is_protocol_run_complete():
+            final_tree = random.choice(
+                list(self._packet_selector.forecasting_result.complete_trees)
+            )
+            # Coverage is shared across all sessions
+            for session in self._sessions:
+                session.packet_selector.add_completed_tree(final_tree)
+            self._packet_coverage_filter.add_completed_tree(final_tree)
+            return final_tree
+
+        if self._should_generate_next_packet():
+            self._packet_algorithm.reset()
+            self._configure_fuzzable_packets()
+            self._packet_coverage_filter.set_current_tree(self._protocol_tree)
+            next_history_tree = self._generate_packet(max_generations=max_generations)
+            if self._io_instance.received_msg():
+                return None
+            new_packet = next_history_tree.protocol_msgs()[-1]
+            if (
+                new_packet.recipient is None
+                or not self._io_instance.parties[
+                    new_packet.recipient
+                ].is_fuzzer_controlled()
+            ):
+                self._io_instance.transmit(
+                    new_packet.sender, new_packet.recipient, new_packet.msg
                 )
-                if self._io_instance.received_msg():
-                    continue
-                new_packet = next_history_tree.protocol_msgs()[-1]
-                if (
-                    new_packet.recipient is None
-                    or not self._io_instance.parties[
-                        new_packet.recipient
-                    ].is_fuzzer_controlled()
-                ):
-                    self._io_instance.transmit(
-                        new_packet.sender, new_packet.recipient, new_packet.msg
-                    )
-                    log_message_transfer(
-                        new_packet.sender,
-                        new_packet.recipient,
-                        new_packet.msg,
-                        True,
-                    )
-                self._protocol_tree = next_history_tree
-            else:
-                try:
-                    self._protocol_tree = self._handle_remote_response()
-                except (
-                    FandangoFailedError,
-                    FandangoParseError,
-                    FandangoValueError,
-                ) as exc:
-                    self._packet_selector.record_coverage(self._protocol_tree)
-                    self._packet_coverage_filter.add_completed_tree(self._protocol_tree)
-                    self.violations.append((self._protocol_tree, exc))
-                    if self.throw_on_violation:
-                        raise exc
-                    LOGGER.warning(
-                        f"Discarding remote response that could not be handled. "
-                        f"Recording violation and starting a new protocol run: {exc}"
-                    )
-                    self._io_instance.reset_parties()
-                    self._protocol_tree = DerivationTree(self._start_symbol, [])
-                    continue
-            self._protocol_tree.set_all_read_only(True)
+                log_message_transfer(
+                    new_packet.sender,
+                    new_packet.recipient,
+                    new_packet.msg,
+                    True,
+                )
+            self._protocol_tree = next_history_tree
+        else:
+            if self._is_remote_response_pending():
+                return None
+            try:
+                self._protocol_tree = self._handle_remote_response()
+            except (
+                FandangoFailedError,
+                FandangoParseError,
+                FandangoValueError,
+            ) as exc:
+                for session in self._sessions:
+                    session.packet_selector.record_coverage(self._protocol_tree)
+                self._packet_coverage_filter.add_completed_tree(self._protocol_tree)
+                self.violations.append((self._protocol_tree, exc))
+                if self.throw_on_violation:
+                    raise exc
+                LOGGER.warning(
+                    f"Discarding remote response that could not be handled. "
+                    f"Recording violation and starting a new protocol run: {exc}"
+                )
+                self._restart_session()
+                return None
+            finally:
+                self._session.waiting_since = None
+        self._protocol_tree.set_all_read_only(True)
+        return None
+
+    def _restart_session(self) -> None:
+        """Restart the parties of the current session and start a new protocol run."""
+        self._io_instance.reset_parties()
+        self._protocol_tree = DerivationTree(self._start_symbol, [])
+        self._session.waiting_since = None
 
     def _configure_fuzzable_packets(self) -> None:
         self._population_manager.fuzzable_packets = self._packet_selector.next_packets
@@ -309,6 +486,8 @@ class ProtocolAlgorithm(GeneticAlgorithm):
 
     def reset(self) -> None:
         self._packet_algorithm.reset()
-        self._packet_selector.reset_coverage()
+        for session in self._sessions:
+            session.packet_selector.reset_coverage()
+            session.protocol_tree = DerivationTree(self._start_symbol)
+            session.waiting_since = None
         self._packet_coverage_filter.reset()
-        self._protocol_tree = DerivationTree(self._start_symbol)
@@ -1,11 +1,13 @@
 # fandango/evolution/algorithm.py
 import itertools
+import os
 import random
 import time
 import warnings
 from collections.abc import Callable, Generator
 from typing import Iterable, Optional
 
+from fandango.cache_manager import CacheManager
 from fandango.constraints.constraint import Constraint
 from fandango.constraints.soft import SoftValue
 from fandango.errors import FandangoParseError, FandangoValueError
@@ -17,11 +19,18 @@ from fandango.evolution.algorithm.base import (
     GeneticAlgorithm,
     LoggerLevel,
 )
+from fandango.evolution.checkpoint import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    read_checkpoint,
+    write_checkpoint,
+)
 from fandango.evolution.crossover import CrossoverOperator
+from fandango.evolution.dedup import DEFAULT_ERROR_RATE, make_solution_set
 from fandango.evolution.evaluation import Evaluator
+from fandango.evolution.islands import Island, IslandModel
 from fandango.evolution.mutation import MutationOperator
 from fandango.evolution.population import PopulationManager
-from fandango.evolution.profiler import Profiler
+from fandango.evolution.profiler import Profiler, active_profiler
 from fandango.io.navigation.coverage.coverage_goal import CoverageGoal
 from fandango.language.grammar import FuzzingMode
 from fandango.language.grammar.grammar import Grammar
@@ -66,11 +75,26 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
         use_fcc: bool = False,
         put: Optional[str] = None,
         put_args: Optional[list[str]] = None,
+        workers: int = 1,
+        incremental: bool = False,
+        islands: int = 1,
+        migration_interval: int = 5,
+        migration_rate: float = 0.1,
+        dedup: str = "exact",
+        dedup_error_rate: float = DEFAULT_ERROR_RATE,
+        dedup_file: Optional[str] = None,
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        resume: Optional[str] = None,
     ):
         if tournament_size > 1:
             raise FandangoValueError(
                 f"Parameter tournament_size must be in range ]0, 1], but is {tournament_size}."
             )
+        if checkpoint_interval < 1:
+            raise FandangoValueError(
+                f"Parameter checkpoint_interval must be at least 1, but is {checkpoint_interval}."
+            )
         if random_seed is not None:
             random.seed(random_seed)
         if logger_level is not None:
@@ -92,6 +116,21 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
         self.coverage_goal = coverage_goal
         self.experiment_start_time = time.time()
         self.stop_after_seconds = stop_after_seconds
+        self.random_seed = random_seed
+        # Resuming from a directory keeps checkpointing to it
+        self.checkpoint_dir = checkpoint_dir if checkpoint_dir is not None else resume
+        self.checkpoint_interval = checkpoint_interval
+
+        if islands <= 0:
+            islands = os.cpu_count() or 1
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migration_rate = migration_rate
+        if islands > 1 and workers != 1:
+            LOGGER.warning(
+                "Parallel evaluation is not supported with islands; using a single process per island"
+            )
+            workers = 1
 
         # Instantiate managers
         self.population_manager = PopulationManager(
@@ -108,6 +147,9 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
             use_fcc,
             put,
             put_args,
+            workers,
+            incremental,
+            solution_set=make_solution_set(dedup, dedup_error_rate, dedup_file),
         )
         self.adaptive_tuner = AdaptiveTuner(
             mutation_rate,
@@ -119,21 +161,27 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
             max_nodes,
             max_nodes_rate,
         )
-        self.profiler = Profiler(enabled=profiling)
+        # Record into the active profiler, if any, such that its results include those of the evolution
+        self.profiler = active_profiler() or Profiler(enabled=profiling)
+        for name, cache in self.evaluator.fitness_caches().items():
+            self.profiler.track_cache(name, cache)
 
         self.crossover_operator = crossover_method
         self.mutation_method = mutation_method
 
-        self.population = self._parse_and_deduplicate(population=initial_population)
-        self._initial_solutions, self.evaluation = GeneratorWithReturn(
-            self.evaluator.evaluate_population(self.population)
-        ).collect()
-
         self.crossovers_made = 0
         self.fixes_made = 0
         self.mutations_made = 0
+        self.generations_made = 0
         self.time_taken = 0.0
 
+        self.population = self._parse_and_deduplicate(population=initial_population)
+        if resume is not None and not read_checkpoint(self, resume):
+            LOGGER.info(f"No checkpoint in {resume!r} yet; starting from scratch")
+        self._initial_solutions, self.evaluation = GeneratorWithReturn(
+            self.evaluator.evaluate_population(self.population)
+        ).collect()
+
     def _parse_and_deduplicate(
         self, population: Optional[list[DerivationTree | str]]
     ) -> list[DerivationTree]:
@@ -187,6 +235,7 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
                 eval_individual=self.evaluator.evaluate_individual,
                 max_nodes=self.adaptive_tuner.current_max_nodes,
                 target_population_size=self.population_size,
+                eval_batch=self.evaluator.evaluate_batch,
             )
 
             timer.increment(len(self.population))
@@ -368,14 +417,48 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
         """
         Generates solutions for the grammar.
 
-        :param max_generations: The maximum number of generations to generate. If None, the generation will run indefinitely.
+        If more than one island is configured, the population is evolved on each island in a separate process,
+        and the solutions of all islands are merged.
+
+        :param max_generations: The maximum number of generations to generate (per island). If None, the generation will run indefinitely.
         :return: A generator of DerivationTree objects, all of which are valid solutions to the grammar (or satisfy the minimum fitness threshold).
         """
         while self._initial_solutions:
             yield self._initial_solutions.pop(0)
 
+        if self.islands > 1:
+            if self.checkpoint_dir is not None:
+                LOGGER.warning("Checkpoints are not written when evolving islands")
+            try:
+                model = IslandModel(
+                    self, self.islands, self.migration_interval, self.migration_rate
+                )
+            except RuntimeError as e:
+                LOGGER.warning(f"{e}; using a single population")
+                self.islands = 1
+            else:
+                yield from model.generate(max_generations)
+                clear_visualization()
+                self._log_statistics()
+                return
+
+        yield from self._evolve_population(max_generations)
+        clear_visualization()
+        self._log_statistics()
+
+    def _evolve_population(
+        self, max_generations: Optional[int] = None, island: Optional[Island] = None
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Evolves the population for up to `max_generations` generations.
+
+        :param max_generations: The maximum number of generations. If None, the evolution runs indefinitely.
+        :param island: If set, the island this population lives on; used for migration between islands.
+        :return: A generator of the new solutions found.
+        """
         if len(self.population) < self.population_size:
             yield from self.generate_initial_population()
+            self._write_checkpoint(island)
         elif not self.evaluation:
             self.evaluation = yield from self.evaluator.evaluate_population(
                 self.population
@@ -396,7 +479,11 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
             if self._is_time_limit_reached() or self.evaluator.stop_criterion_met:
                 break
 
+            if island is not None and island.stopped():
+                break
+
             generation += 1
+            self.generations_made += 1
 
             avg_fitness = sum(e[1] for e in self.evaluation) / self.population_size
 
@@ -430,9 +517,11 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
                 self.evaluator.evaluate_individual,
                 self.adaptive_tuner.current_max_nodes,
                 self.population_size,
+                self.evaluator.evaluate_batch,
             )
 
             self.population = []
+            yield from self.evaluator.evaluate_batch(new_population)
             for ind in new_population:
                 (
                     _fitness,
@@ -477,10 +566,32 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
             self.adaptive_tuner.log_generation_statistics(
                 generation, self.evaluation, self.population, self.evaluator
             )
-            visualize_evaluation(generation, max_generations, self.evaluation)
+            if island is None or island.index == 0:
+                visualize_evaluation(generation, max_generations, self.evaluation)
 
-        clear_visualization()
-        self._log_statistics()
+            if island is not None:
+                yield from island.migrate(self, generation)
+
+            if self.generations_made % self.checkpoint_interval == 0:
+                self._write_checkpoint(island)
+
+        if self.generations_made % self.checkpoint_interval != 0:
+            self._write_checkpoint(island)
+
+    def _write_checkpoint(self, island: Optional[Island] = None) -> None:
+        """
+        Write a checkpoint to `checkpoint_dir`, if set.
+        Islands do not write checkpoints, as each of them holds only part of the state.
+
+        :param island: If set, the island this population lives on.
+        """
+        if self.checkpoint_dir is None or island is not None:
+            return
+        try:
+            with self.profiler.timer("checkpoint"):
+                write_checkpoint(self, self.checkpoint_dir)
+        except OSError as e:
+            print_exception(e, f"Cannot write checkpoint to {self.checkpoint_dir!r}")
 
     @property
     def average_population_fitness(self) -> float:
@@ -495,6 +606,13 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
         LOGGER.debug(f"Fitness checks: {self.evaluator.get_fitness_check_count()}")
         LOGGER.debug(f"Crossovers made: {self.crossovers_made}")
         LOGGER.debug(f"Mutations made: {self.mutations_made}")
+        cache_stats = CacheManager.instance().stats()
+        if cache_stats["hit_rate"] is not None:
+            LOGGER.debug(
+                f"Caches: {cache_stats['hit_rate']:.1%} hits, "
+                f"{cache_stats['bytes'] / 2**20:.1f} of {cache_stats['max_bytes'] / 2**20:.0f} MiB "
+                f"in {cache_stats['entries']} entries, {cache_stats['evictions']} evictions"
+            )
         self.profiler.log_results()
 
     def _evolve_single(
@@ -527,3 +645,4 @@ class SimpleGeneticAlgorithm(GeneticAlgorithm):
         self.evaluation.clear()
         self._initial_solutions.clear()
         self.adaptive_tuner.reset_parameters()
+        self.generations_made = 0
@@ -0,0 +1,440 @@
+import base64
+import json
+import os
+import random
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from fandango.constraints.soft import SoftValue
+from fandango.errors import FandangoValueError
+from fandango.language.symbols import NonTerminal, Slice, Terminal
+from fandango.language.tree import DerivationTree
+from fandango.language.tree_value import TreeValue
+from fandango.logger import LOGGER
+
+if TYPE_CHECKING:
+    import fandango
+
+# Version of the checkpoint format; checkpoints of other versions are not read
+CHECKPOINT_VERSION = 1
+
+# Default number of generations between two checkpoints
+DEFAULT_CHECKPOINT_INTERVAL = 10
+
+# The files making up a checkpoint directory
+STATE_FILE = "state.json"
+POPULATION_FILE = "population.bin"
+SOLUTIONS_FILE = "solutions.bin"
+
+_POPULATION_MAGIC = b"FDGP"
+
+# Flags of an encoded tree node, saying which optional fields follow
+_SENDER = 1
+_RECIPIENT = 2
+_READ_ONLY = 4
+_SOURCES = 8
+_ORIGIN_REPETITIONS = 16
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append the non-negative `value` to `out` as LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """:return: The varint at `offset` in `data`, and the offset after it."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+class _Table:
+    """Symbols and strings of the encoded trees, each stored once and referred to by index."""
+
+    def __init__(
+        self, symbols: Optional[list[Any]] = None, strings: Optional[list[str]] = None
+    ):
+        self.symbols: list[Any] = symbols or []
+        self.strings: list[str] = strings or []
+        self._symbol_ids: dict[Any, int] = {}
+        self._string_ids: dict[str, int] = {}
+        self._decoded: list[Optional[Terminal | NonTerminal | Slice]] = [None] * len(
+            self.symbols
+        )
+
+    def symbol_id(self, symbol: Terminal | NonTerminal | Slice) -> int:
+        entry = self._encode_symbol(symbol)
+        key = json.dumps(entry)
+        if key not in self._symbol_ids:
+            self._symbol_ids[key] = len(self.symbols)
+            self.symbols.append(entry)
+        return self._symbol_ids[key]
+
+    def string_id(self, string: str) -> int:
+        if string not in self._string_ids:
+            self._string_ids[string] = len(self.strings)
+            self.strings.append(string)
+        return self._string_ids[string]
+
+    @staticmethod
+    def _encode_symbol(symbol: Terminal | NonTerminal | Slice) -> list[Any]:
+        if isinstance(symbol, NonTerminal):
+            return ["n", symbol.name()]
+        if isinstance(symbol, Slice):
+            return ["s"]
+        value = symbol.value()
+        if isinstance(value._value, bytes):
+            encoded: list[Any] = ["b", base64.b64encode(value._value).decode("ascii")]
+        else:
+            encoded = ["t", value._value]
+        bits = "".join(str(bit) for bit in value._trailing_bits)
+        return encoded + [bits, symbol.is_regex]
+
+    def symbol(self, index: int) -> Terminal | NonTerminal | Slice:
+        symbol = self._decoded[index]
+        if symbol is None:
+            symbol = self._decode_symbol(self.symbols[index])
+            self._decoded[index] = symbol
+        return symbol
+
+    @staticmethod
+    def _decode_symbol(entry: list[Any]) -> Terminal | NonTerminal | Slice:
+        match entry:
+            case ["n", name]:
+                return NonTerminal(name)
+            case ["s"]:
+                return Slice()
+            case [kind, value, bits, is_regex] if kind in ("t", "b"):
+                if kind == "b":
+                    value = base64.b64decode(value)
+                terminal = Terminal(
+                    TreeValue(
+                        value,
+                        trailing_bits=[int(bit) for bit in bits],
+                        allow_empty=True,
+                    )
+                )
+                terminal._is_regex = is_regex
+                return terminal
+        raise FandangoValueError(f"Invalid symbol in checkpoint: {entry!r}")
+
+
+def _encode_tree(tree: DerivationTree, table: _Table) -> bytes:
+    """
+    Encode `tree` as a compact byte string: its nodes in preorder, each as varints
+    for the symbol, flags, and number of children, followed by the optional fields
+    set in the flags. Sources come right after the node they belong to.
+    """
+    out = bytearray()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        flags = (
+            (_SENDER if node.sender is not None else 0)
+            | (_RECIPIENT if node.recipient is not None else 0)
+            | (_READ_ONLY if node.read_only else 0)
+            | (_SOURCES if node.sources else 0)
+            | (_ORIGIN_REPETITIONS if node.origin_repetitions else 0)
+        )
+        _write_varint(out, table.symbol_id(node.symbol))
+        _write_varint(out, flags)
+        _write_varint(out, len(node.children))
+        if node.sender is not None:
+            _write_varint(out, table.string_id(node.sender))
+        if node.recipient is not None:
+            _write_varint(out, table.string_id(node.recipient))
+        if node.origin_repetitions:
+            _write_varint(out, len(node.origin_repetitions))
+            for repetition_id, iteration, repetition in node.origin_repetitions:
+                _write_varint(out, table.string_id(repetition_id))
+                _write_varint(out, _zigzag(iteration))
+                _write_varint(out, _zigzag(repetition))
+        if node.sources:
+            _write_varint(out, len(node.sources))
+        stack.extend(reversed(node.children))
+        stack.extend(reversed(node.sources))
+    return bytes(out)
+
+
+class _Frame:
+    """A node being decoded, whose sources and children are not complete yet."""
+
+    __slots__ = ("fields", "n_sources", "n_children", "sources", "children")
+
+    def __init__(self, fields: dict[str, Any], n_sources: int, n_children: int):
+        self.fields = fields
+        self.n_sources = n_sources
+        self.n_children = n_children
+        self.sources: list[DerivationTree] = []
+        self.children: list[DerivationTree] = []
+
+
+def _decode_tree(data: bytes, table: _Table) -> DerivationTree:
+    """Decode a tree encoded by `_encode_tree()`."""
+    offset = 0
+    stack: list[_Frame] = []
+    while True:
+        # Read the next node
+        symbol_id, offset = _read_varint(data, offset)
+        flags, offset = _read_varint(data, offset)
+        n_children, offset = _read_varint(data, offset)
+        fields: dict[str, Any] = {
+            "symbol": table.symbol(symbol_id),
+            "read_only": bool(flags & _READ_ONLY),
+        }
+        if flags & _SENDER:
+            index, offset = _read_varint(data, offset)
+            fields["sender"] = table.strings[index]
+        if flags & _RECIPIENT:
+            index, offset = _read_varint(data, offset)
+            fields["recipient"] = table.strings[index]
+        if flags & _ORIGIN_REPETITIONS:
+            count, offset = _read_varint(data, offset)
+            repetitions = []
+            for _ in range(count):
+                index, offset = _read_varint(data, offset)
+                iteration, offset = _read_varint(data, offset)
+                repetition, offset = _read_varint(data, offset)
+                repetitions.append(
+                    (table.strings[index], _unzigzag(iteration), _unzigzag(repetition))
+                )
+            fields["origin_repetitions"] = repetitions
+        n_sources = 0
+        if flags & _SOURCES:
+            n_sources, offset = _read_varint(data, offset)
+        stack.append(_Frame(fields, n_sources, n_children))
+
+        # Build all nodes whose sources and children are complete
+        while True:
+            frame = stack[-1]
+            if (
+                len(frame.sources) < frame.n_sources
+                or len(frame.children) < frame.n_children
+            ):
+                break
+            stack.pop()
+            tree = DerivationTree(
+                children=frame.children, sources=frame.sources, **frame.fields
+            )
+            if not stack:
+                if offset != len(data):
+                    raise FandangoValueError("Trailing data after tree in checkpoint")
+                return tree
+            parent = stack[-1]
+            if len(parent.sources) < parent.n_sources:
+                parent.sources.append(tree)
+            else:
+                parent.children.append(tree)
+
+
+def encode_population(population: list[DerivationTree]) -> bytes:
+    """
+    Encode `population` in a compact binary format: a table of the symbols and strings
+    used, followed by each tree as a byte string of its nodes in preorder,
+    i.e. the derivation that produces it.
+    Unlike pickles, the format only refers to symbol names and values, not to classes,
+    and it does not need the grammar to be decoded.
+
+    :param population: The trees to encode
+    :return: The encoded population
+    """
+    table = _Table()
+    trees = [_encode_tree(tree, table) for tree in population]
+    header = json.dumps({"symbols": table.symbols, "strings": table.strings}).encode(
+        "utf-8"
+    )
+
+    out = bytearray(_POPULATION_MAGIC)
+    _write_varint(out, len(header))
+    out += header
+    _write_varint(out, len(trees))
+    for tree in trees:
+        _write_varint(out, len(tree))
+        out += tree
+    return bytes(out)
+
+
+def decode_population(data: bytes) -> list[DerivationTree]:
+    """
+    Decode a population encoded by `encode_population()`.
+
+    :param data: The encoded population
+    :return: The trees of the population
+    :raises FandangoValueError: If `data` is not an encoded population
+    """
+    if not data.startswith(_POPULATION_MAGIC):
+        raise FandangoValueError("Not a Fandango population")
+    offset = len(_POPULATION_MAGIC)
+    size, offset = _read_varint(data, offset)
+    header = json.loads(data[offset : offset + size].decode("utf-8"))
+    offset += size
+    table = _Table(header["symbols"], header["strings"])
+
+    count, offset = _read_varint(data, offset)
+    population = []
+    for _ in range(count):
+        size, offset = _read_varint(data, offset)
+        population.append(_decode_tree(data[offset : offset + size], table))
+        offset += size
+    return population
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """Write `data` to `path`, such that `path` always holds either the old or the new data."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as fd:
+        fd.write(data)
+        fd.flush()
+        os.fsync(fd.fileno())
+    os.replace(temporary, path)
+
+
+def _soft_values(
+    algorithm: "fandango.evolution.algorithm.SimpleGeneticAlgorithm",
+) -> list[SoftValue]:
+    return [
+        constraint
+        for constraint in algorithm.constraints
+        if isinstance(constraint, SoftValue)
+    ]
+
+
+def write_checkpoint(
+    algorithm: "fandango.evolution.algorithm.SimpleGeneticAlgorithm", directory: str
+) -> None:
+    """
+    Save the state of `algorithm` to `directory`, from which `read_checkpoint()` restores it:
+    the population, the state of the adaptive tuner, the distributions of soft values,
+    the solutions produced so far, and the state of the random number generator.
+
+    :param algorithm: The algorithm to save
+    :param directory: The checkpoint directory; created if needed
+    """
+    start_time = time.time()
+    os.makedirs(directory, exist_ok=True)
+    tuner = algorithm.adaptive_tuner
+    solutions_metadata, solutions_data = algorithm.evaluator._solution_set.dump()
+    version, internal_state, gauss_next = random.getstate()
+    state = {
+        "version": CHECKPOINT_VERSION,
+        "start_symbol": algorithm.start_symbol,
+        "constraints": [
+            constraint.format_as_spec() for constraint in algorithm.constraints
+        ],
+        "generations": algorithm.generations_made,
+        "counters": {
+            "crossovers_made": algorithm.crossovers_made,
+            "fixes_made": algorithm.fixes_made,
+            "mutations_made": algorithm.mutations_made,
+        },
+        "tuner": {
+            "mutation_rate": tuner.mutation_rate,
+            "crossover_rate": tuner.crossover_rate,
+            "current_max_repetition": tuner.current_max_repetition,
+            "current_max_nodes": tuner.current_max_nodes,
+        },
+        "max_repetition": algorithm.grammar.get_max_repetition(),
+        "soft_values": {
+            value.format_as_spec(): value.tdigest.to_dict()
+            for value in _soft_values(algorithm)
+        },
+        "solutions": solutions_metadata,
+        "random_state": [version, list(internal_state), gauss_next],
+    }
+
+    # Write the state last, such that it never refers to a newer population
+    _write_atomically(
+        os.path.join(directory, POPULATION_FILE),
+        encode_population(algorithm.population),
+    )
+    _write_atomically(os.path.join(directory, SOLUTIONS_FILE), solutions_data)
+    _write_atomically(
+        os.path.join(directory, STATE_FILE),
+        json.dumps(state, indent=1).encode("utf-8"),
+    )
+    LOGGER.debug(
+        f"Checkpoint of generation {algorithm.generations_made} written to {directory!r} "
+        f"in {time.time() - start_time:.2f} seconds"
+    )
+
+
+def read_checkpoint(
+    algorithm: "fandango.evolution.algorithm.SimpleGeneticAlgorithm", directory: str
+) -> bool:
+    """
+    Restore the state saved by `write_checkpoint()` into `algorithm`.
+    The saved population is added to the current one; the population is not evaluated.
+
+    :param algorithm: The algorithm to restore; should be newly created with the same grammar and constraints
+    :param directory: The checkpoint directory
+    :return: False if `directory` holds no checkpoint, True otherwise
+    :raises FandangoValueError: If the checkpoint cannot be read
+    """
+    state_path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(state_path):
+        return False
+    with open(state_path, encoding="utf-8") as fd:
+        state = json.load(fd)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise FandangoValueError(
+            f"{state_path}: checkpoint version {state.get('version')} is not supported"
+        )
+    if state["start_symbol"] != algorithm.start_symbol or state["constraints"] != [
+        constraint.format_as_spec() for constraint in algorithm.constraints
+    ]:
+        LOGGER.warning(
+            f"{directory}: checkpoint was written with a different start symbol or constraints"
+        )
+
+    with open(os.path.join(directory, POPULATION_FILE), "rb") as fd:
+        population = decode_population(fd.read())
+    unique_hashes = {hash(individual) for individual in algorithm.population}
+    for individual in population:
+        algorithm.population_manager.add_unique_individual(
+            population=algorithm.population,
+            candidate=individual,
+            unique_set=unique_hashes,
+        )
+    del algorithm.population[algorithm.population_size :]
+
+    with open(os.path.join(directory, SOLUTIONS_FILE), "rb") as fd:
+        algorithm.evaluator._solution_set.load(state["solutions"], fd.read())
+
+    algorithm.generations_made = state["generations"]
+    for name, value in state["counters"].items():
+        setattr(algorithm, name, value)
+    for name, value in state["tuner"].items():
+        setattr(algorithm.adaptive_tuner, name, value)
+    if state["max_repetition"] > algorithm.grammar.get_max_repetition():
+        algorithm.grammar.set_max_repetition(state["max_repetition"])
+
+    for soft_value in _soft_values(algorithm):
+        saved = state["soft_values"].get(soft_value.format_as_spec())
+        if saved is not None:
+            soft_value.tdigest.update_from_dict(saved)
+
+    version, internal_state, gauss_next = state["random_state"]
+    random.setstate((version, tuple(internal_state), gauss_next))
+
+    LOGGER.info(
+        f"Resuming from generation {algorithm.generations_made} "
+        f"with {len(population)} individuals from {directory!r}"
+    )
+    return True
@@ -0,0 +1,414 @@
+import abc
+import array
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+import weakref
+from typing import Any, Optional
+
+from fandango.errors import FandangoValueError
+from fandango.language.tree import DerivationTree
+
+# The kinds of solution sets `make_solution_set()` creates
+DEDUP_KINDS = ("exact", "bloom", "disk")
+
+# Default probability that `BloomSolutionSet` mistakes a new solution for a duplicate
+DEFAULT_ERROR_RATE = 1e-6
+
+# Solution hashes the first filter of a `BloomSolutionSet` is sized for
+BLOOM_INITIAL_CAPACITY = 1 << 16
+# Each further filter holds this many times as many hashes as the previous one ...
+BLOOM_GROWTH = 2
+# ... with this many times the error rate, such that the overall error rate stays bounded
+BLOOM_TIGHTENING = 0.5
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(x: int) -> int:
+    """The SplitMix64 finalizer; spreads the bits of a 64-bit integer."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def solution_key(solution: DerivationTree) -> int:
+    """
+    Hash `solution` (within its root) by its structure and symbols, like `hash()`.
+    Unlike `hash()`, the result is the same in every process, such that sets of
+    solution hashes can be kept across runs.
+
+    :param solution: The solution to hash
+    :return: The hash, a signed 64-bit integer
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    root = solution.get_root()
+    for tree in (root,) if root is solution else (root, solution):
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            digest.update(
+                f"{node.symbol!r}\0{node.sender}\0{node.recipient}\0{len(node.children)}\0".encode(
+                    "utf-8", "surrogatepass"
+                )
+            )
+            stack.extend(reversed(node.children))
+    return int.from_bytes(digest.digest(), "little", signed=True)
+
+
+class SolutionSet(abc.ABC):
+    """
+    The hashes of the solutions produced so far (see `solution_key()`), such that each solution is produced only once.
+    Besides the exact `set` of all hashes, there are variants whose memory usage stays
+    (nearly) flat in long campaigns; see `make_solution_set()`.
+    """
+
+    @abc.abstractmethod
+    def __contains__(self, key: int) -> bool:
+        """:return: True if the solution hash `key` has (probably) been added."""
+
+    @abc.abstractmethod
+    def add(self, key: int) -> None:
+        """Add the solution hash `key`."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove all hashes."""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """:return: The number of hashes added."""
+
+    def close(self) -> None:  # noqa: B027 # only some sets hold resources
+        """Release any resources held."""
+
+    def dump(self) -> tuple[dict[str, Any], bytes]:
+        """
+        Save the set, e.g. for a checkpoint.
+
+        :return: JSON-serializable metadata and binary data, from which `load()` restores the set
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot be saved")
+
+    def load(self, metadata: dict[str, Any], data: bytes) -> None:
+        """
+        Add the hashes saved by `dump()`, possibly from a set of another kind.
+
+        :param metadata: The metadata returned by `dump()`
+        :param data: The data returned by `dump()`
+        :raises FandangoValueError: If the saved hashes cannot be added to this set
+        """
+        match metadata.get("format"):
+            case "keys":
+                keys = array.array("q")
+                keys.frombytes(data)
+                for key in keys:
+                    self.add(key)
+            case "file":
+                if not os.path.exists(metadata["path"]):
+                    raise FandangoValueError(
+                        f"Solution database {metadata['path']!r} does not exist"
+                    )
+                db = sqlite3.connect(metadata["path"])
+                try:
+                    for (key,) in db.execute("SELECT hash FROM solutions"):
+                        self.add(key)
+                finally:
+                    db.close()
+            case other:
+                raise FandangoValueError(
+                    f"Cannot add solutions saved as {other!r} to {type(self).__name__}"
+                )
+
+
+class ExactSolutionSet(SolutionSet):
+    """All solution hashes, in memory. The default."""
+
+    def __init__(self) -> None:
+        self._hashes: set[int] = set()
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._hashes
+
+    def add(self, key: int) -> None:
+        self._hashes.add(key)
+
+    def clear(self) -> None:
+        self._hashes.clear()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def dump(self) -> tuple[dict[str, Any], bytes]:
+        return {"format": "keys"}, array.array("q", self._hashes).tobytes()
+
+
+class _BloomFilter:
+    """A Bloom filter of 64-bit hashes with a fixed capacity and error rate."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.count = 0
+        self.bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hashes = max(1, math.ceil(-math.log2(error_rate)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: int) -> list[int]:
+        # Double hashing: the i-th position is h1 + i * h2
+        h1 = _mix(key & _MASK64)
+        h2 = _mix(h1) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: int) -> bool:
+        array = self._array
+        return all(
+            array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def add(self, key: int) -> None:
+        array = self._array
+        for position in self._positions(key):
+            array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+
+class BloomSolutionSet(SolutionSet):
+    """
+    A scalable Bloom filter of solution hashes (Almeida et al., 2007).
+    Needs about 1.5 bytes per hash for an error rate of 1e-3, and 3.5 bytes for 1e-8.
+    With probability `error_rate`, a new solution is mistaken for a duplicate and suppressed.
+    """
+
+    def __init__(
+        self,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        initial_capacity: int = BLOOM_INITIAL_CAPACITY,
+    ):
+        """
+        :param error_rate: The probability of mistaking a new solution for a duplicate
+        :param initial_capacity: The number of hashes the first filter is sized for
+        """
+        if not 0 < error_rate < 1:
+            raise FandangoValueError(
+                f"The error rate must be in range ]0, 1[, but is {error_rate}"
+            )
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self._filters: list[_BloomFilter] = []
+        self._count = 0
+
+    def __contains__(self, key: int) -> bool:
+        return any(key in bloom_filter for bloom_filter in self._filters)
+
+    def add(self, key: int) -> None:
+        if not self._filters or self._filters[-1].count >= self._filters[-1].capacity:
+            # The error rates of the filters add up to at most `error_rate`
+            index = len(self._filters)
+            self._filters.append(
+                _BloomFilter(
+                    self.initial_capacity * BLOOM_GROWTH**index,
+                    self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING**index,
+                )
+            )
+        self._filters[-1].add(key)
+        self._count += 1
+
+    def clear(self) -> None:
+        self._filters.clear()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the filters, in bytes."""
+        return sum(len(bloom_filter._array) for bloom_filter in self._filters)
+
+    def dump(self) -> tuple[dict[str, Any], bytes]:
+        filters = [
+            {
+                "capacity": bloom_filter.capacity,
+                "count": bloom_filter.count,
+                "bits": bloom_filter.bits,
+                "hashes": bloom_filter.hashes,
+            }
+            for bloom_filter in self._filters
+        ]
+        data = b"".join(bytes(bloom_filter._array) for bloom_filter in self._filters)
+        return {
+            "format": "bloom",
+            "error_rate": self.error_rate,
+            "initial_capacity": self.initial_capacity,
+            "filters": filters,
+        }, data
+
+    def load(self, metadata: dict[str, Any], data: bytes) -> None:
+        if metadata.get("format") != "bloom":
+            super().load(metadata, data)
+            return
+        if self._filters:
+            raise FandangoValueError("Can only load Bloom filters into an empty set")
+        # Keep adding with the parameters the filters were made with
+        self.error_rate = metadata["error_rate"]
+        self.initial_capacity = metadata["initial_capacity"]
+        offset = 0
+        for saved in metadata["filters"]:
+            bloom_filter = _BloomFilter.__new__(_BloomFilter)
+            bloom_filter.capacity = saved["capacity"]
+            bloom_filter.count = saved["count"]
+            bloom_filter.bits = saved["bits"]
+            bloom_filter.hashes = saved["hashes"]
+            size = (bloom_filter.bits + 7) // 8
+            bloom_filter._array = bytearray(data[offset : offset + size])
+            offset += size
+            self._filters.append(bloom_filter)
+            self._count += bloom_filter.count
+
+
+class DiskSolutionSet(SolutionSet):
+    """
+    All solution hashes, in an SQLite database on disk.
+    In processes forked from the one that created the set (such as islands), the database
+    is only read; hashes added there are kept in a `BloomSolutionSet`.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, error_rate: float = DEFAULT_ERROR_RATE
+    ):
+        """
+        :param path: The database file; hashes in an existing file count as added.
+            If not given, a temporary file is used, which is removed on `close()`.
+        :param error_rate: The error rate of the Bloom filter used in forked processes
+        """
+        self._pid = os.getpid()
+        self._finalizer = None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="fandango-solutions-", suffix=".db")
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove_database, path, self._pid)
+        self.path = path
+        self._forked_hashes = BloomSolutionSet(error_rate)
+        self._db_pid = self._pid
+        self._db = self._connect()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS solutions (hash INTEGER PRIMARY KEY)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Commit every addition, such that forked processes see it
+        db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        # Let readers in forked processes proceed while the creator writes
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=OFF")
+        return db
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not be shared across processes
+        if self._db_pid != os.getpid():
+            self._db = self._connect()
+            self._db_pid = os.getpid()
+        return self._db
+
+    @property
+    def _forked(self) -> bool:
+        return self._pid != os.getpid()
+
+    def __contains__(self, key: int) -> bool:
+        if self._forked and key in self._forked_hashes:
+            return True
+        cursor = self._connection().execute(
+            "SELECT 1 FROM solutions WHERE hash = ?", (key,)
+        )
+        return cursor.fetchone() is not None
+
+    def add(self, key: int) -> None:
+        if self._forked:
+            self._forked_hashes.add(key)
+            return
+        self._db.execute("INSERT OR IGNORE INTO solutions VALUES (?)", (key,))
+
+    def clear(self) -> None:
+        if self._forked:
+            self._forked_hashes.clear()
+            return
+        self._db.execute("DELETE FROM solutions")
+
+    def __len__(self) -> int:
+        cursor = self._connection().execute("SELECT COUNT(*) FROM solutions")
+        return int(cursor.fetchone()[0]) + len(self._forked_hashes)
+
+    def close(self) -> None:
+        self._connection().close()
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def dump(self) -> tuple[dict[str, Any], bytes]:
+        if self._finalizer is None:
+            # The database outlives the process; refer to it
+            return {"format": "file", "path": os.path.abspath(self.path)}, b""
+        keys = array.array("q")
+        for (key,) in self._connection().execute("SELECT hash FROM solutions"):
+            keys.append(key)
+        return {"format": "keys"}, keys.tobytes()
+
+    def load(self, metadata: dict[str, Any], data: bytes) -> None:
+        if (
+            metadata.get("format") == "file"
+            and os.path.exists(metadata["path"])
+            and os.path.samefile(metadata["path"], self.path)
+        ):
+            return
+        if metadata.get("format") == "keys" and not self._forked:
+            keys = array.array("q")
+            keys.frombytes(data)
+            self._db.executemany(
+                "INSERT OR IGNORE INTO solutions VALUES (?)", ((key,) for key in keys)
+            )
+            return
+        super().load(metadata, data)
+
+
+def _remove_database(path: str, pid: int) -> None:
+    """Remove the temporary database at `path`, unless in a process forked from `pid`."""
+    if os.getpid() != pid:
+        return
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def make_solution_set(
+    kind: str = "exact",
+    error_rate: float = DEFAULT_ERROR_RATE,
+    path: Optional[str] = None,
+) -> SolutionSet:
+    """
+    Create a set of solution hashes.
+
+    :param kind: "exact" to keep all hashes in memory;
+        "bloom" for a scalable Bloom filter, which needs only a few bytes per hash,
+        but suppresses a new solution with probability `error_rate`;
+        "disk" to keep all hashes in an SQLite database at `path`
+    :param error_rate: For "bloom", the probability of mistaking a new solution for a duplicate
+    :param path: For "disk", the database file; if not given, a temporary file is used
+    :return: The solution set
+    """
+    match kind:
+        case "exact":
+            return ExactSolutionSet()
+        case "bloom":
+            return BloomSolutionSet(error_rate)
+        case "disk":
+            return DiskSolutionSet(path, error_rate)
+    raise FandangoValueError(
+        f"Unknown deduplication method {kind!r}; use one of {', '.join(DEDUP_KINDS)}"
+    )
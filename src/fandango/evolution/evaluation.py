@@ -1,24 +1,44 @@
+import os
 import random
 from collections import Counter
 from collections.abc import Callable, Generator, Sequence
-from typing import Optional
+from typing import Any, NamedTuple, Optional
 
-from cachetools import LRUCache
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; compute diversity in pure Python then
+    np = None  # type: ignore[assignment]
 
+from fandango.cache_manager import ManagedCache
 from fandango.constraints.constraint import Constraint
 from fandango.constraints.failing_tree import (
     ApplyAllSuggestions,
     FailingTree,
+    FailingTreeRef,
     NopSuggestion,
     Suggestion,
 )
+from fandango.constraints.fitness import ValueFitness
 from fandango.constraints.repetition_bounds import RepetitionBoundsConstraint
 from fandango.constraints.soft import SoftValue
 from fandango.evolution import GeneratorWithReturn
+from fandango.evolution.dedup import ExactSolutionSet, SolutionSet, solution_key
+from fandango.evolution.parallel import EvaluationPool
+from fandango.evolution.profiler import span
 from fandango.language.grammar.grammar import Grammar
 from fandango.language.tree import DerivationTree
 from fandango.logger import LOGGER, print_exception
-from fandango.utils import cache_size
+
+
+class RawEvaluation(NamedTuple):
+    """
+    Constraint results for a single individual, before normalization.
+    """
+
+    hard: tuple[float, list[FailingTree], Suggestion]
+    repetition_bounds: Optional[tuple[float, list[FailingTree], Suggestion]]
+    soft: Optional[list[Optional[ValueFitness]]]
+    checks_made: int
 
 
 class Evaluator:
@@ -33,6 +53,9 @@ class Evaluator:
         use_fcc: bool = False,
         put: Optional[str] = None,
         put_args: Optional[list[str]] = None,
+        workers: int = 1,
+        incremental: bool = False,
+        solution_set: Optional[SolutionSet] = None,
     ):
         self._grammar = grammar
         self._soft_constraints: list[SoftValue] = []
@@ -41,10 +64,16 @@ class Evaluator:
         self._expected_fitness = expected_fitness
         self._diversity_k = diversity_k
         self._diversity_weight = diversity_weight
-        self._fitness_cache: LRUCache[
-            int, tuple[float, list[FailingTree], Suggestion]
-        ] = LRUCache(maxsize=cache_size())
-        self._solution_set: set[int] = set()
+        # Evaluations of individuals, with failing trees referenced by path
+        self._fitness_cache: ManagedCache[
+            int, tuple[float, tuple[FailingTreeRef, ...], Suggestion]
+        ] = ManagedCache()
+        # k-path IDs of individuals, by hash; NumPy arrays if available
+        self._k_path_id_cache: ManagedCache[int, Any] = ManagedCache()
+        # Hashes of the solutions produced so far
+        self._solution_set: SolutionSet = (
+            solution_set if solution_set is not None else ExactSolutionSet()
+        )
         self._checks_made = 0
         self._stop_criterion = stop_criterion
         self._stop_criterion_met = False
@@ -54,6 +83,16 @@ class Evaluator:
             from fandango.experimental.execution.fcc import FCC
 
             self.fcc = FCC(put, put_args)
+            if workers > 1:
+                LOGGER.warning(
+                    "Parallel evaluation is not supported with --fcc; using a single process"
+                )
+                workers = 1
+
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        self._workers = workers
+        self._pool: Optional[EvaluationPool] = None
 
         for constraint in constraints:
             if "DynamicAnalysis" in constraint.format_as_spec():
@@ -63,6 +102,8 @@ class Evaluator:
                 constraint.global_variables["DynamicAnalysis"] = (
                     self.fcc.dynamic_analysis.trace_input
                 )
+            # Reuse results for unchanged subtrees of mutated individuals
+            constraint.set_incremental(incremental)
             if isinstance(constraint, SoftValue):
                 self._soft_constraints.append(constraint)
             elif isinstance(constraint, RepetitionBoundsConstraint):
@@ -72,6 +113,12 @@ class Evaluator:
             else:
                 raise ValueError(f"Invalid constraint type: {type(constraint)}")
 
+        # Profiling span names, by constraint ID
+        self._span_names = {
+            id(constraint): f"fitness: {constraint.format_as_spec()}"
+            for constraint in constraints
+        }
+
     @property
     def stop_criterion_met(self) -> bool:
         return self._stop_criterion_met
@@ -125,34 +172,79 @@ class Evaluator:
         for soft in self._soft_constraints:
             soft.clear_cache()
 
+    def fitness_caches(self) -> dict[str, ManagedCache[Any, Any]]:
+        """
+        :return: The caches of the evaluator and of the top-level constraints, by name.
+        """
+        caches: dict[str, ManagedCache[Any, Any]] = {
+            "evaluator: fitness": self._fitness_cache,
+            "evaluator: k-paths": self._k_path_id_cache,
+        }
+        for constraint in (
+            self._hard_constraints
+            + self._repetition_bounds_constraints
+            + self._soft_constraints
+        ):
+            name = self._span_names[id(constraint)]
+            caches[name] = constraint.cache
+            if constraint._combination_cache is not None:
+                caches[f"{name} (combinations)"] = constraint._combination_cache
+        return caches
+
+    def _k_path_ids(self, individual: DerivationTree) -> Any:
+        key = hash(individual)
+        ids = self._k_path_id_cache.get(key)
+        if ids is None:
+            with span("k_paths"):
+                k_paths = self._grammar._extract_k_paths_from_tree(
+                    individual, self._diversity_k
+                )
+            ids = self._grammar.intern_k_paths(k_paths)
+            if np is not None:
+                ids = np.array(ids, dtype=np.intp)
+            self._k_path_id_cache[key] = ids
+        return ids
+
     def compute_diversity_bonus(
         self,
         individuals: list[DerivationTree],
         fill_up: Optional[list[DerivationTree]] = None,
     ) -> list[float]:
+        """
+        Return a diversity bonus for each of the `individuals`:
+        the average of 1 / frequency over its k-paths,
+        where frequencies are counted across `individuals` and `fill_up`.
+        """
         if fill_up is None:
             fill_up = []
-        ind_kpaths = [
-            self._grammar._extract_k_paths_from_tree(ind, self._diversity_k)
-            for ind in individuals
-        ]
-        fill_up_kpaths = [
-            self._grammar._extract_k_paths_from_tree(ind, self._diversity_k)
-            for ind in fill_up
-        ]
-        frequencies = Counter(
-            path for paths in ind_kpaths + fill_up_kpaths for path in paths
-        )
+        ind_ids = [self._k_path_ids(ind) for ind in individuals]
+        fill_up_ids = [self._k_path_ids(ind) for ind in fill_up]
 
-        bonus = [
-            (
-                sum(1.0 / frequencies[path] for path in paths) / len(paths)
-                if paths
-                else 0.0
+        if np is None:
+            frequencies = Counter(
+                path_id for ids in ind_ids + fill_up_ids for path_id in ids
             )
-            for paths in ind_kpaths
-        ]
-        return bonus
+            return [
+                (
+                    sum(1.0 / frequencies[path_id] for path_id in ids) / len(ids)
+                    if ids
+                    else 0.0
+                )
+                for ids in ind_ids
+            ]
+
+        if not individuals:
+            return []
+        # Individuals × k-paths incidence, as (row, path ID) pairs
+        lengths = np.array([len(ids) for ids in ind_ids], dtype=np.intp)
+        ind_paths = np.concatenate(ind_ids)
+        frequencies = np.bincount(np.concatenate([ind_paths, *fill_up_ids]))
+        rows = np.repeat(np.arange(len(ind_ids)), lengths)
+        sums = np.bincount(
+            rows, weights=1.0 / frequencies[ind_paths], minlength=len(ind_ids)
+        )
+        bonus = np.divide(sums, lengths, out=np.zeros(len(ind_ids)), where=lengths > 0)
+        return [float(b) for b in bonus]
 
     def evaluate_hard_constraints(
         self, individual: DerivationTree
@@ -178,7 +270,8 @@ class Evaluator:
         suggestions = []
         for constraint in constraints:
             try:
-                result = constraint.fitness(individual)
+                with span(self._span_names[id(constraint)]):
+                    result = constraint.fitness(individual)
                 fitness += result.fitness()
                 failing_trees.extend(result.failing_trees)
                 if result.suggestion is not None:
@@ -203,48 +296,102 @@ class Evaluator:
     ) -> tuple[float, list[FailingTree]]:
         if not self._soft_constraints:
             return 1.0, []
+        return self._score_soft_results(self._compute_soft_results(individual))
 
-        soft_fitness = 0.0
-        failing_trees: list[FailingTree] = []
+    def _compute_soft_results(
+        self, individual: DerivationTree
+    ) -> list[Optional[ValueFitness]]:
+        """
+        Compute the raw (unnormalized) fitness of every soft constraint.
+
+        :param individual: The individual to evaluate.
+        :return: One result per soft constraint; `None` if the evaluation failed.
+        """
+        results: list[Optional[ValueFitness]] = []
         for constraint in self._soft_constraints:
             try:
-                result = constraint.fitness(individual)
-
-                # failing_trees are required for mutations;
-                # with soft constraints, we never know when they are fully optimized.
-                failing_trees.extend(result.failing_trees)
-
-                constraint.tdigest.update(result.fitness())
-                normalized_fitness = constraint.tdigest.score(result.fitness())
-
-                if constraint.optimization_goal == "max":
-                    soft_fitness += normalized_fitness
-                else:  # "min"
-                    soft_fitness += 1 - normalized_fitness
+                with span(self._span_names[id(constraint)]):
+                    results.append(constraint.fitness(individual))
             except Exception as e:
                 LOGGER.error(
                     f"Error evaluating soft constraint {constraint.format_as_spec()}: {e}"
                 )
+                results.append(None)
+        return results
+
+    def _score_soft_results(
+        self, results: Sequence[Optional[ValueFitness]]
+    ) -> tuple[float, list[FailingTree]]:
+        """
+        Normalize raw soft constraint results against the observed distributions.
+
+        This updates the `TDigest` of each soft constraint and hence must run in
+        the process that owns the evaluator, in evaluation order.
+        """
+        soft_fitness = 0.0
+        failing_trees: list[FailingTree] = []
+        for constraint, result in zip(self._soft_constraints, results, strict=True):
+            if result is None:
                 soft_fitness += 0.0
+                continue
+
+            # failing_trees are required for mutations;
+            # with soft constraints, we never know when they are fully optimized.
+            failing_trees.extend(result.failing_trees)
+
+            constraint.tdigest.update(result.fitness())
+            normalized_fitness = constraint.tdigest.score(result.fitness())
+
+            if constraint.optimization_goal == "max":
+                soft_fitness += normalized_fitness
+            else:  # "min"
+                soft_fitness += 1 - normalized_fitness
 
         soft_fitness /= len(self._soft_constraints)
         return soft_fitness, failing_trees
 
-    def evaluate_individual(
-        self,
-        individual: DerivationTree,
-    ) -> Generator[DerivationTree, None, tuple[float, list[FailingTree], Suggestion]]:
-        key = hash((individual.get_root(), individual))
-        if key in self._fitness_cache:
-            return self._fitness_cache[key]
+    def compute_raw_evaluation(self, individual: DerivationTree) -> RawEvaluation:
+        """
+        Evaluate all constraints on `individual` without touching any state that
+        is shared across the population (fitness cache, solution set, soft
+        constraint distributions). This is the part of the evaluation that can
+        be run in a worker process.
+
+        :param individual: The individual to evaluate.
+        :return: The raw evaluation results.
+        """
+        checks_before = self._checks_made
+        hard = self.evaluate_hard_constraints(individual)
+        fully_solved_so_far = hard[0] == 1.0
+
+        repetition_bounds = None
+        if len(self._repetition_bounds_constraints) > 0:
+            repetition_bounds = self.evaluate_repetition_bounds_constraints(individual)
+            fully_solved_so_far = fully_solved_so_far and repetition_bounds[0] == 1.0
+
+        soft = None
+        if len(self._soft_constraints) > 0 and fully_solved_so_far:
+            soft = self._compute_soft_results(individual)
+
+        return RawEvaluation(
+            hard, repetition_bounds, soft, self._checks_made - checks_before
+        )
 
+    def _merge_raw_evaluation(
+        self, raw: RawEvaluation
+    ) -> tuple[float, list[FailingTree], Suggestion]:
+        """
+        Combine raw evaluation results into the normalized fitness, failing trees
+        and suggestion of an individual.
+        """
         total_constraint_count = (
             len(self._hard_constraints)
             + len(self._repetition_bounds_constraints)
             + len(self._soft_constraints)
         )
 
-        fitness, failing_trees, suggestion = self.evaluate_hard_constraints(individual)
+        fitness, failing_trees, suggestion = raw.hard
+        failing_trees = list(failing_trees)
 
         fully_solved_so_far = fitness == 1.0
 
@@ -252,11 +399,9 @@ class Evaluator:
             # normalize the fitness to the number of hard constraints
             fitness = fitness / (total_constraint_count) * len(self._hard_constraints)
 
-        if len(self._repetition_bounds_constraints) > 0:
+        if raw.repetition_bounds is not None:
             # all hard constraints are satisfied, so we can evaluate the repetition bounds constraints
-            rep_fitness, rep_failing_trees, rep_suggestion = (
-                self.evaluate_repetition_bounds_constraints(individual)
-            )
+            rep_fitness, rep_failing_trees, rep_suggestion = raw.repetition_bounds
             rep_suggestion.rec_set_allow_repetition_full_delete(fully_solved_so_far)
             suggestion = ApplyAllSuggestions([suggestion, rep_suggestion])
             failing_trees.extend(rep_failing_trees)
@@ -270,11 +415,9 @@ class Evaluator:
                 * len(self._repetition_bounds_constraints)
             )
 
-        if len(self._soft_constraints) > 0 and fully_solved_so_far:
+        if raw.soft is not None and fully_solved_so_far:
             # all hard and repetition bounds constraints are satisfied, so we can evaluate the soft constraints
-            soft_fitness, soft_failing_trees = self.evaluate_soft_constraints(
-                individual
-            )
+            soft_fitness, soft_failing_trees = self._score_soft_results(raw.soft)
 
             failing_trees.extend(soft_failing_trees)
 
@@ -282,15 +425,117 @@ class Evaluator:
                 soft_fitness / total_constraint_count * len(self._soft_constraints)
             )
 
-        if fitness >= self._expected_fitness and key not in self._solution_set:
-            if self._stop_criterion:
-                self._stop_criterion_met |= self._stop_criterion(individual)
-            self._solution_set.add(key)
-            yield individual
+        return fitness, failing_trees, suggestion
 
-        self._fitness_cache[key] = (fitness, failing_trees, suggestion)
+    def _record_evaluation(
+        self,
+        individual: DerivationTree,
+        key: int,
+        evaluation: tuple[float, list[FailingTree], Suggestion],
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Cache the evaluation of `individual` and yield it if it is a new solution.
+        """
+        if evaluation[0] >= self._expected_fitness:
+            solution = solution_key(individual)
+            if solution not in self._solution_set:
+                if self._stop_criterion:
+                    self._stop_criterion_met |= self._stop_criterion(individual)
+                self._solution_set.add(solution)
+                yield individual
+
+        fitness, failing_trees, suggestion = evaluation
+        root = individual.get_root()
+        self._fitness_cache[key] = (
+            fitness,
+            tuple(FailingTreeRef.of(ft, root) for ft in failing_trees),
+            suggestion,
+        )
+
+    def _cached_evaluation(
+        self, individual: DerivationTree, key: int
+    ) -> Optional[tuple[float, list[FailingTree], Suggestion]]:
+        """
+        Look up the evaluation of `individual` cached under `key`.
+        :return: The evaluation, with failing trees within the root of `individual`; None if there is none.
+        """
+        cached = self._fitness_cache.get(key)
+        if cached is None:
+            return None
+        fitness, refs, suggestion = cached
+        root = individual.get_root()
+        failing_trees = []
+        for ref in refs:
+            failing_tree = ref.resolve(root)
+            if failing_tree is None:
+                return None
+            failing_trees.append(failing_tree)
         return fitness, failing_trees, suggestion
 
+    def evaluate_individual(
+        self,
+        individual: DerivationTree,
+    ) -> Generator[DerivationTree, None, tuple[float, list[FailingTree], Suggestion]]:
+        key = hash((individual.get_root(), individual))
+        cached = self._cached_evaluation(individual, key)
+        if cached is not None:
+            return cached
+
+        evaluation = self._merge_raw_evaluation(self.compute_raw_evaluation(individual))
+        yield from self._record_evaluation(individual, key, evaluation)
+        return evaluation
+
+    def evaluate_batch(
+        self, population: list[DerivationTree]
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Evaluate all individuals of `population` and cache the results.
+
+        If multiple workers are configured, the uncached individuals are
+        evaluated in the worker pool. Results are recorded in population order,
+        so solutions are yielded in the same order as when calling
+        `evaluate_individual()` on each individual in turn.
+
+        :param population: The individuals to evaluate.
+        :return: A generator of the new solutions found.
+        """
+        if self._workers > 1:
+            keys = [hash((ind.get_root(), ind)) for ind in population]
+            pending: dict[int, DerivationTree] = {}
+            for key, ind in zip(keys, population, strict=True):
+                if key not in self._fitness_cache and key not in pending:
+                    pending[key] = ind
+            pool = self._get_pool() if len(pending) > 1 else None
+            if pool is not None:
+                raw_results = pool.evaluate(list(pending.values()))
+                for (key, ind), raw in zip(pending.items(), raw_results, strict=True):
+                    if raw is None:
+                        # Could not be evaluated remotely; fall back to local evaluation
+                        raw = self.compute_raw_evaluation(ind)
+                    else:
+                        self._checks_made += raw.checks_made
+                    yield from self._record_evaluation(
+                        ind, key, self._merge_raw_evaluation(raw)
+                    )
+
+        for ind in population:
+            yield from self.evaluate_individual(ind)
+
+    def _get_pool(self) -> Optional[EvaluationPool]:
+        if self._pool is None:
+            try:
+                self._pool = EvaluationPool(self, self._workers)
+            except RuntimeError as e:
+                LOGGER.warning(f"{e}; using a single process")
+                self._workers = 1
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Terminate the worker pool, if any. It is restarted on demand."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def evaluate_population(
         self, population: list[DerivationTree]
     ) -> Generator[
@@ -298,6 +543,8 @@ class Evaluator:
         None,
         list[tuple[DerivationTree, float, list[FailingTree], Suggestion]],
     ]:
+        yield from self.evaluate_batch(population)
+
         evaluation = []
         for ind in population:
             ind_eval = yield from self.evaluate_individual(ind)
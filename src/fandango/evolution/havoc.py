@@ -3,6 +3,12 @@ import struct
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
 from enum import Enum, auto
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; mutate one input at a time then
+    np = None  # type: ignore[assignment]
 
 from fandango import DerivationTree
 
@@ -566,10 +572,208 @@ def havoc_mutate(
     """
     if random.random() < nop_probability:
         return input_.to_bytes()
+    return havoc_mutate_bytes(input_.to_bytes(), mutations, max_stack_pow)
+
+
+def havoc_mutate_bytes(
+    input_: bytes,
+    mutations: Sequence[ByteLevelMutationOperator] = HAVOC_MUTATIONS,
+    max_stack_pow: int = 7,
+) -> bytes:
+    """
+    Mutates the bytes of an input using the given mutations.
 
-    inp = bytearray(input_.to_bytes())
+    :param input_: The input to mutate.
+    :param mutations: The mutations to use.
+    :param max_stack_pow: The maximum power of 2 for the stack size.
+    :return: The mutated input.
+    """
+    inp = bytearray(input_)
     for _ in range(1 << random.randint(0, max_stack_pow)):
         mutation = random.choice(mutations)
         mutation.mutate(inp)
-    fixed = bytes(inp)
-    return fixed
+    return bytes(inp)
+
+
+def _is_vectorized(mutation: ByteLevelMutationOperator) -> bool:
+    """Return True if `_apply_vectorized()` can apply `mutation`; these mutations keep the input size."""
+    return isinstance(
+        mutation,
+        (
+            BitFlipMutation,
+            ByteFlipMutation,
+            ByteIncMutation,
+            ByteDecMutation,
+            ByteNegMutation,
+            ByteRandMutation,
+            MultiByteArithmeticMutation,
+            MultiByteInterestingMutation,
+        ),
+    )
+
+
+def _apply_vectorized(
+    mutation: ByteLevelMutationOperator,
+    inputs: Any,
+    lengths: Any,
+    rows: Any,
+    rng: Any,
+) -> None:
+    """
+    Apply `mutation` once to each of the `rows` of `inputs` (which may repeat).
+
+    :param mutation: The mutation to apply; `_is_vectorized(mutation)` must hold.
+    :param inputs: A 2D uint8 array holding one (zero-padded) input per row.
+    :param lengths: The lengths of the inputs.
+    :param rows: The rows to mutate.
+    """
+    num_bytes = getattr(mutation, "num_bytes", 1)
+    rows = rows[lengths[rows] >= num_bytes]
+    if len(rows) == 0:
+        return
+    offsets = (rng.random(len(rows)) * (lengths[rows] - num_bytes + 1)).astype(np.intp)
+
+    if isinstance(mutation, BitFlipMutation):
+        bits = np.left_shift(1, rng.integers(0, 8, len(rows))).astype(np.uint8)
+        inputs[rows, offsets] ^= bits
+    elif isinstance(mutation, ByteFlipMutation):
+        inputs[rows, offsets] ^= np.uint8(0xFF)
+    elif isinstance(mutation, ByteIncMutation):
+        inputs[rows, offsets] += np.uint8(1)
+    elif isinstance(mutation, ByteDecMutation):
+        inputs[rows, offsets] -= np.uint8(1)
+    elif isinstance(mutation, ByteNegMutation):
+        inputs[rows, offsets] = np.negative(inputs[rows, offsets])
+    elif isinstance(mutation, ByteRandMutation):
+        inputs[rows, offsets] = rng.integers(0, 256, len(rows), dtype=np.uint8)
+    else:
+        # Multi-byte mutations operate on integers of `num_bytes` bytes
+        little_endian = getattr(mutation, "little_endian", False)
+        shifts = [
+            np.uint64(8 * (i if little_endian else num_bytes - 1 - i))
+            for i in range(num_bytes)
+        ]
+        if isinstance(mutation, MultiByteArithmeticMutation):
+            values = np.zeros(len(rows), dtype=np.uint64)
+            for i, shift in enumerate(shifts):
+                values |= inputs[rows, offsets + i].astype(np.uint64) << shift
+            deltas = rng.integers(2, ARITH_MAX + 2, len(rows), dtype=np.uint64)
+            if mutation.operation == ArithmeticOperation.ADD:
+                values += deltas
+            else:
+                values -= deltas
+        else:
+            assert isinstance(mutation, MultiByteInterestingMutation)
+            interesting = np.array(
+                [v % 256**num_bytes for v in INTERESTING_VALUES[num_bytes]],
+                dtype=np.uint64,
+            )
+            values = interesting[rng.integers(0, len(interesting), len(rows))]
+        for i, shift in enumerate(shifts):
+            inputs[rows, offsets + i] = (values >> shift).astype(np.uint8)
+
+
+def havoc_batch(
+    inputs: Sequence[bytes],
+    mutations: Sequence[ByteLevelMutationOperator] = HAVOC_MUTATIONS,
+    max_stack_pow: int = 7,
+) -> list[bytes]:
+    """
+    Mutates each of the inputs like `havoc_mutate_bytes()`.
+    With NumPy, the mutations that keep the input size are applied to all inputs at once;
+    only the mutations that change the size are applied to one input at a time.
+    Mutations are still chosen uniformly from `mutations`, but are not applied in the order chosen.
+
+    :param inputs: The inputs to mutate.
+    :param mutations: The mutations to use.
+    :param max_stack_pow: The maximum power of 2 for the stack size.
+    :return: The mutated inputs, in the order of `inputs`.
+    """
+    if np is None or not inputs:
+        return [havoc_mutate_bytes(inp, mutations, max_stack_pow) for inp in inputs]
+
+    rng = np.random.default_rng(random.getrandbits(64))
+    stack_sizes = np.left_shift(1, rng.integers(0, max_stack_pow + 1, len(inputs)))
+    # How often to apply each mutation to each input
+    counts = rng.multinomial(stack_sizes, [1 / len(mutations)] * len(mutations))
+
+    vectorized = [_is_vectorized(mutation) for mutation in mutations]
+    scalar = [idx for idx, is_vectorized in enumerate(vectorized) if not is_vectorized]
+    buffers: list[bytes | bytearray] = list(inputs)
+    if scalar:
+        for row in np.flatnonzero(counts[:, scalar].sum(axis=1)):
+            inp = bytearray(buffers[row])
+            chosen = [idx for idx in scalar for _ in range(counts[row, idx])]
+            random.shuffle(chosen)
+            for idx in chosen:
+                mutations[idx].mutate(inp)
+            buffers[row] = inp
+
+    lengths = np.array([len(buf) for buf in buffers], dtype=np.intp)
+    padded = np.zeros((len(buffers), max(1, int(lengths.max()))), dtype=np.uint8)
+    padded[np.arange(padded.shape[1]) < lengths[:, None]] = np.frombuffer(
+        b"".join(buffers), dtype=np.uint8
+    )
+    for idx, mutation in enumerate(mutations):
+        if vectorized[idx]:
+            rows = np.repeat(np.arange(len(buffers)), counts[:, idx])
+            _apply_vectorized(mutation, padded, lengths, rows, rng)
+
+    return [padded[row, : lengths[row]].tobytes() for row in range(len(buffers))]
+
+
+class HavocStage:
+    """
+    Produces havoc mutants of solutions: about `ratio` mutants per solution.
+    Mutants are produced in batches of (at least) `batch_size`, using `havoc_batch()`.
+    """
+
+    def __init__(
+        self,
+        ratio: float,
+        batch_size: int = 1024,
+        mutations: Sequence[ByteLevelMutationOperator] = HAVOC_MUTATIONS,
+        max_stack_pow: int = 7,
+    ):
+        """
+        :param ratio: The number of mutants per solution; fractions accumulate over solutions.
+        :param batch_size: The number of mutants to produce at once.
+        :param mutations: The mutations to use.
+        :param max_stack_pow: The maximum power of 2 for the stack size.
+        """
+        if ratio < 0:
+            raise ValueError("The havoc ratio must not be negative")
+        self.ratio = ratio
+        self.batch_size = batch_size
+        self.mutations = mutations
+        self.max_stack_pow = max_stack_pow
+        self._credit = 0.0
+        self._pending: list[bytes] = []
+        self.mutants_made = 0
+
+    def add(self, solution: DerivationTree | bytes) -> list[bytes]:
+        """
+        Schedule mutants of `solution`.
+
+        :param solution: The solution to mutate.
+        :return: The mutants of a full batch, or an empty list if the batch is not full yet.
+        """
+        self._credit += self.ratio
+        count = int(self._credit)
+        if count == 0:
+            return []
+        self._credit -= count
+        data = solution.to_bytes() if isinstance(solution, DerivationTree) else solution
+        self._pending.extend([data] * count)
+        if len(self._pending) < self.batch_size:
+            return []
+        return self.flush()
+
+    def flush(self) -> list[bytes]:
+        """
+        :return: The mutants of all scheduled solutions not returned yet.
+        """
+        pending, self._pending = self._pending, []
+        mutants = havoc_batch(pending, self.mutations, self.max_stack_pow)
+        self.mutants_made += len(mutants)
+        return mutants
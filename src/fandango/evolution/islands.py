@@ -0,0 +1,317 @@
+import multiprocessing
+import queue
+import random
+from collections.abc import Generator
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+from fandango.evolution.dedup import solution_key
+from fandango.evolution.parallel import (
+    collect_shared_objects,
+    dumps_shared,
+    loads_shared,
+)
+from fandango.language.tree import DerivationTree
+from fandango.logger import LOGGER, print_exception
+
+if TYPE_CHECKING:
+    import fandango
+
+# How long to wait for messages from the islands before checking whether they are still alive
+POLL_INTERVAL = 1.0
+# How long to wait for islands to exit before terminating them
+JOIN_TIMEOUT = 5.0
+
+
+class IslandResult(NamedTuple):
+    """Final state of an island, as sent to the parent process."""
+
+    evaluation: Optional[bytes]
+    crossovers_made: int
+    mutations_made: int
+    fixes_made: int
+    checks_made: int
+    stop_criterion_met: bool
+
+
+class Island:
+    """
+    The state of an island within its own process.
+
+    Passed to `SimpleGeneticAlgorithm._evolve_population()`, which calls
+    `migrate()` after each generation and stops once `stopped()` holds.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        inbox: Any,
+        outbox: Any,
+        stop_event: Any,
+        shared: dict[int, Any],
+        migration_interval: int,
+        migration_size: int,
+    ):
+        self.index = index
+        self._inbox = inbox
+        self._outbox = outbox
+        self._stop_event = stop_event
+        self._shared = shared
+        self._migration_interval = migration_interval
+        self._migration_size = migration_size
+
+    def stopped(self) -> bool:
+        """Return True if the parent process asked all islands to stop."""
+        return bool(self._stop_event.is_set())
+
+    def migrate(
+        self,
+        algorithm: "fandango.evolution.algorithm.SimpleGeneticAlgorithm",
+        generation: int,
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Every `migration_interval` generations, send the elites of `algorithm` to the next island
+        and replace the weakest individuals by the elites received from the previous island.
+
+        :param algorithm: The algorithm evolving the population of this island.
+        :param generation: The generation just completed.
+        :return: A generator of the new solutions found among the immigrants.
+        """
+        if self._migration_interval <= 0 or generation % self._migration_interval:
+            return
+
+        ranked = sorted(algorithm.evaluation, key=lambda x: x[1], reverse=True)
+        emigrants = [ind for ind, *_ in ranked[: self._migration_size]]
+        try:
+            self._outbox.put(dumps_shared(emigrants, self._shared))
+        except Exception as e:
+            LOGGER.debug(f"Island {self.index}: cannot send emigrants: {e}")
+
+        immigrants: list[DerivationTree] = []
+        while True:
+            try:
+                data = self._inbox.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                immigrants.extend(loads_shared(data, self._shared))
+            except Exception as e:
+                LOGGER.debug(f"Island {self.index}: cannot receive immigrants: {e}")
+        if not immigrants:
+            return
+
+        unique_hashes = {hash(ind) for ind in algorithm.population}
+        newcomers: list[DerivationTree] = []
+        for individual in immigrants:
+            algorithm.population_manager.add_unique_individual(
+                newcomers, individual, unique_hashes
+            )
+        newcomers = newcomers[: algorithm.population_size]
+        if not newcomers:
+            return
+        LOGGER.debug(f"Island {self.index}: {len(newcomers)} immigrants arrived")
+
+        survivors = ranked[: max(0, algorithm.population_size - len(newcomers))]
+        algorithm.population = [ind for ind, *_ in survivors] + newcomers
+        evaluation = yield from algorithm.evaluator.evaluate_population(
+            algorithm.population
+        )
+        algorithm.evaluation = sorted(evaluation, key=lambda x: x[1], reverse=True)
+
+    def close(self) -> None:
+        # Do not wait for emigrants to be picked up by islands that have already finished
+        self._outbox.cancel_join_thread()
+
+
+def _run_island(
+    algorithm: "fandango.evolution.algorithm.SimpleGeneticAlgorithm",
+    island: Island,
+    max_generations: Optional[int],
+    results: Any,
+    random_seed: Optional[int],
+) -> None:
+    """Evolve the population of `island` in a forked process, sending solutions and the final state to `results`."""
+    random.seed(random_seed)
+    evaluation: Optional[bytes] = None
+    try:
+        for solution in algorithm._evolve_population(max_generations, island=island):
+            try:
+                results.put(
+                    ("solution", island.index, dumps_shared(solution, island._shared))
+                )
+            except Exception as e:
+                print_exception(e, f"Island {island.index}: cannot send solution")
+        evaluation = dumps_shared(algorithm.evaluation, island._shared)
+    except Exception as e:
+        print_exception(e, f"Error in island {island.index}")
+    finally:
+        island.close()
+        results.put(
+            (
+                "done",
+                island.index,
+                IslandResult(
+                    evaluation,
+                    algorithm.crossovers_made,
+                    algorithm.mutations_made,
+                    algorithm.fixes_made,
+                    algorithm.evaluator.get_fitness_check_count(),
+                    algorithm.evaluator.stop_criterion_met,
+                ),
+            )
+        )
+
+
+class IslandModel:
+    """
+    Evolves the population of a `SimpleGeneticAlgorithm` as a number of independent islands.
+
+    Each island runs in a process forked from the current one, evolving its own
+    copy of the population with its own `Evaluator` and `AdaptiveTuner`.
+    Every `migration_interval` generations, each island sends its elites to
+    the next island (in a ring) and replaces its weakest individuals by the
+    elites it has received.
+
+    Solutions found by the islands are sent back to the parent process and merged
+    into a single stream; the solution set of the parent's evaluator ensures each
+    solution is produced only once across all islands. When all islands are done,
+    the fittest individuals of all islands form the new population of the algorithm.
+    """
+
+    def __init__(
+        self,
+        algorithm: "fandango.evolution.algorithm.SimpleGeneticAlgorithm",
+        islands: int,
+        migration_interval: int,
+        migration_rate: float,
+    ):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError(
+                "Islands require the 'fork' start method, which is not available on this platform"
+            )
+        self._algorithm = algorithm
+        self._islands = islands
+        self._migration_interval = migration_interval
+        self._migration_size = max(1, int(migration_rate * algorithm.population_size))
+        evaluator = algorithm.evaluator
+        self._shared = collect_shared_objects(
+            [evaluator._grammar]
+            + evaluator._hard_constraints
+            + evaluator._repetition_bounds_constraints
+            + evaluator._soft_constraints
+        )
+
+    @property
+    def islands(self) -> int:
+        return self._islands
+
+    def generate(
+        self, max_generations: Optional[int] = None
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Evolve all islands for `max_generations` generations each.
+
+        :param max_generations: The maximum number of generations per island. If None, the islands run indefinitely.
+        :return: A generator of the solutions found by any island, without duplicates.
+        """
+        algorithm = self._algorithm
+        evaluator = algorithm.evaluator
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        inboxes = [context.Queue() for _ in range(self._islands)]
+        stop_event = context.Event()
+
+        LOGGER.info(f"Starting {self._islands} islands")
+        processes = []
+        for index in range(self._islands):
+            island = Island(
+                index,
+                inbox=inboxes[index],
+                outbox=inboxes[(index + 1) % self._islands],
+                stop_event=stop_event,
+                shared=self._shared,
+                migration_interval=self._migration_interval,
+                migration_size=self._migration_size,
+            )
+            seed = (
+                None
+                if algorithm.random_seed is None
+                else algorithm.random_seed + index + 1
+            )
+            process = context.Process(
+                target=_run_island,
+                args=(algorithm, island, max_generations, results, seed),
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+
+        running = set(range(self._islands))
+        final: list[IslandResult] = []
+        try:
+            while running:
+                try:
+                    kind, index, payload = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    for index in list(running):
+                        # Islands that exit normally always report back first
+                        exitcode = processes[index].exitcode
+                        if exitcode is not None and exitcode != 0:
+                            LOGGER.warning(
+                                f"Island {index} terminated unexpectedly (exit code {exitcode})"
+                            )
+                            running.discard(index)
+                    continue
+
+                if kind == "solution":
+                    try:
+                        solution = loads_shared(payload, self._shared)
+                    except Exception as e:
+                        print_exception(
+                            e, f"Cannot receive solution from island {index}"
+                        )
+                        continue
+                    key = solution_key(solution)
+                    if key in evaluator._solution_set:
+                        continue
+                    evaluator._solution_set.add(key)
+                    yield solution
+                else:
+                    running.discard(index)
+                    final.append(payload)
+                    if payload.stop_criterion_met:
+                        evaluator._stop_criterion_met = True
+                        stop_event.set()
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join(JOIN_TIMEOUT if not running else 0)
+                if process.is_alive():
+                    process.terminate()
+
+        self._merge_results(final)
+
+    def _merge_results(self, final: list[IslandResult]) -> None:
+        """Make the fittest individuals of all islands the population of the algorithm."""
+        algorithm = self._algorithm
+        evaluation = []
+        for result in final:
+            algorithm.crossovers_made += result.crossovers_made
+            algorithm.mutations_made += result.mutations_made
+            algorithm.fixes_made += result.fixes_made
+            algorithm.evaluator._checks_made += result.checks_made
+            if result.evaluation is None:
+                continue
+            try:
+                evaluation.extend(loads_shared(result.evaluation, self._shared))
+            except Exception as e:
+                LOGGER.debug(f"Cannot receive population from island: {e}")
+
+        merged = []
+        unique_hashes: set[int] = set()
+        for entry in sorted(evaluation, key=lambda x: x[1], reverse=True):
+            if hash(entry[0]) not in unique_hashes:
+                unique_hashes.add(hash(entry[0]))
+                merged.append(entry)
+        if merged:
+            algorithm.evaluation = merged[: algorithm.population_size]
+            algorithm.population = [ind for ind, *_ in algorithm.evaluation]
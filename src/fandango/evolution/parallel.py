@@ -0,0 +1,207 @@
+import io
+import multiprocessing
+import pickle
+import warnings
+import weakref
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Optional
+
+from fandango.constraints.base import GeneticBase
+from fandango.language.grammar.grammar import Grammar
+from fandango.language.grammar.nodes.node import Node
+from fandango.language.tree import DerivationTree
+from fandango.logger import LOGGER, print_exception
+
+if TYPE_CHECKING:
+    import fandango
+
+# Objects owned by the parsed spec; these are never copied between processes,
+# but referenced by their identity in the (forked) address space.
+_SHARED_TYPES = (GeneticBase, Grammar, Node)
+
+# State of a worker process, set up by `_init_worker()`
+_worker_evaluator: Optional["fandango.evolution.evaluation.Evaluator"] = None
+_worker_shared: dict[int, Any] = {}
+
+
+def collect_shared_objects(roots: Iterable[Any]) -> dict[int, Any]:
+    """
+    Collect all constraints, values, grammars and grammar nodes reachable from `roots`.
+
+    :param roots: The objects to start from (typically, the grammar and the constraints).
+    :return: A mapping from object ids to the objects found.
+    """
+    shared: dict[int, Any] = {}
+    seen: set[int] = set()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, Grammar):
+            # Do not descend into parser tables and other caches
+            shared[id(obj)] = obj
+            stack.extend(obj.rules.values())
+        elif isinstance(obj, _SHARED_TYPES):
+            shared[id(obj)] = obj
+            stack.extend(getattr(obj, "__dict__", {}).values())
+    return shared
+
+
+class _SharedPickler(pickle.Pickler):
+    """Pickler that replaces spec-owned objects by a reference to their identity."""
+
+    def __init__(self, file: io.BytesIO, shared: dict[int, Any]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared = shared
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        if isinstance(obj, _SHARED_TYPES) and id(obj) in self._shared:
+            return id(obj)
+        return None
+
+
+class _SharedUnpickler(pickle.Unpickler):
+    """Unpickler that resolves references created by `_SharedPickler`."""
+
+    def __init__(self, file: io.BytesIO, shared: dict[int, Any]):
+        super().__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid: Any) -> Any:
+        try:
+            return self._shared[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Unknown shared object {pid}") from None
+
+
+def dumps_shared(obj: Any, shared: dict[int, Any]) -> bytes:
+    buffer = io.BytesIO()
+    _SharedPickler(buffer, shared).dump(obj)
+    return buffer.getvalue()
+
+
+def loads_shared(data: bytes, shared: dict[int, Any]) -> Any:
+    with warnings.catch_warnings():
+        # unpickling triggers the deprecation warnings in __getattr__ of DerivationTree and TreeValue
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return _SharedUnpickler(io.BytesIO(data), shared).load()
+
+
+def _init_worker(
+    evaluator: "fandango.evolution.evaluation.Evaluator", shared: dict[int, Any]
+) -> None:
+    global _worker_evaluator, _worker_shared
+    _worker_evaluator = evaluator
+    _worker_shared = shared
+
+
+def _evaluate_in_worker(data: bytes) -> Optional[bytes]:
+    """
+    Evaluate a pickled individual in a worker process.
+
+    The individual is pickled back together with its evaluation,
+    such that failing trees and suggestions refer to nodes of the returned individual.
+
+    :return: The pickled `(individual, raw_evaluation)` pair, or `None` if it could not be evaluated or pickled.
+    """
+    assert _worker_evaluator is not None, "worker has not been initialized"
+    try:
+        individual = loads_shared(data, _worker_shared)
+        raw = _worker_evaluator.compute_raw_evaluation(individual)
+        return dumps_shared((individual, raw), _worker_shared)
+    except Exception as e:
+        print_exception(e, "Error during parallel evaluation")
+        return None
+
+
+class EvaluationPool:
+    """
+    A pool of worker processes that evaluate individuals for an `Evaluator`.
+
+    Workers are forked from the current process, so each holds its own copy of
+    the parsed spec, including the Python code of the .fan file. Individuals are
+    sent to the workers in pickled form; constraints, grammars, and grammar
+    nodes are never pickled, but passed as references into the shared spec.
+
+    Only the state-free part of the evaluation (`Evaluator.compute_raw_evaluation()`)
+    runs in the workers; caching, soft constraint normalization and solution
+    bookkeeping remain with the evaluator.
+    """
+
+    def __init__(
+        self, evaluator: "fandango.evolution.evaluation.Evaluator", workers: int
+    ):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError(
+                "Parallel evaluation requires the 'fork' start method, which is not available on this platform"
+            )
+        self._workers = workers
+        self._shared = collect_shared_objects(
+            [evaluator._grammar]
+            + evaluator._hard_constraints
+            + evaluator._repetition_bounds_constraints
+            + evaluator._soft_constraints
+        )
+        LOGGER.info(f"Starting {workers} evaluation workers")
+        context = multiprocessing.get_context("fork")
+        self._pool = context.Pool(
+            workers, initializer=_init_worker, initargs=(evaluator, self._shared)
+        )
+        self._finalizer = weakref.finalize(self, self._pool.terminate)
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def evaluate(
+        self, individuals: list[DerivationTree]
+    ) -> list[Optional["fandango.evolution.evaluation.RawEvaluation"]]:
+        """
+        Evaluate `individuals` in the worker processes.
+
+        :param individuals: The individuals to evaluate.
+        :return: The raw evaluations, in the order of `individuals`.
+            Failing trees and suggestions refer to nodes of a copy of the individual;
+            as all tree operations on these go by path, they apply to the original as well.
+            An entry is `None` if the individual could not be evaluated remotely.
+        """
+        payloads: list[Optional[bytes]] = []
+        for individual in individuals:
+            try:
+                payloads.append(dumps_shared(individual, self._shared))
+            except Exception as e:
+                LOGGER.debug(f"Cannot send individual to worker: {e}")
+                payloads.append(None)
+
+        to_send = [payload for payload in payloads if payload is not None]
+        chunksize = max(1, len(to_send) // (self._workers * 4))
+        received = iter(
+            self._pool.imap(_evaluate_in_worker, to_send, chunksize=chunksize)
+        )
+
+        results: list[Optional["fandango.evolution.evaluation.RawEvaluation"]] = []
+        for payload in payloads:
+            if payload is None:
+                results.append(None)
+                continue
+            data = next(received)
+            if data is None:
+                results.append(None)
+                continue
+            try:
+                _individual, raw = loads_shared(data, self._shared)
+                results.append(raw)
+            except Exception as e:
+                LOGGER.debug(f"Cannot receive evaluation from worker: {e}")
+                results.append(None)
+        return results
+
+    def shutdown(self) -> None:
+        """Terminate all workers."""
+        self._finalizer()
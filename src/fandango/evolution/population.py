@@ -4,13 +4,18 @@ from typing import Optional
 
 from fandango.constraints.failing_tree import FailingTree, Suggestion
 from fandango.errors import FandangoValueError
-from fandango.evolution import GeneratorWithReturn
+from fandango.evolution.profiler import span
 from fandango.io.navigation.graph.packetforecaster import ForecastingPacket
 from fandango.language.grammar.grammar import Grammar
 from fandango.language.symbols import NonTerminal
 from fandango.language.tree import DerivationTree
 from fandango.logger import LOGGER
 
+# Stop refilling if at least this fraction of a block of generated individuals are duplicates ...
+SATURATION_DUPLICATE_RATE = 0.95
+# ... provided the block has at least this many individuals
+SATURATION_MIN_BLOCK_SIZE = 20
+
 
 class PopulationManager:
     def __init__(
@@ -60,19 +65,30 @@ class PopulationManager:
         ],
         max_nodes: int,
         target_population_size: int,
+        eval_batch: Optional[
+            Callable[[list[DerivationTree]], Generator[DerivationTree, None, None]]
+        ] = None,
     ) -> Generator[DerivationTree, None, None]:
         """
         Refills the population with unique individuals in place.
 
         Does not deduplicate the current population.
 
-        If after 10 times the difference between the current population size and the target population size
-        the required population size is still not met, a warning is logged and the incomplete population is returned.
+        Candidates are generated in blocks of the missing population size. Duplicates are dropped
+        before any evaluation; the remaining candidates are evaluated as a batch, fixed according to
+        the suggestions of their evaluation, and the fixed candidates are evaluated as a batch again.
+
+        Refilling stops early if (almost) all candidates of a large block are duplicates, as the grammar
+        then cannot produce enough unique individuals. If after 10 times the difference between the
+        current population size and the target population size the required population size is still
+        not met, a warning is logged and the incomplete population is returned.
 
         :param current_population: The current population of individuals.
         :param eval_individual: The function to evaluate the fitness of an individual.
         :param max_nodes: The maximum number of nodes in an individual.
         :param target_population_size: The target size of the population.
+        :param eval_batch: The function to evaluate a batch of individuals, caching the results for `eval_individual`
+            (typically, `Evaluator.evaluate_batch`). If not given, individuals are evaluated one by one.
         :return: A generator that yields solutions. The population is modified in place.
         """
         unique_hashes = PopulationManager._generate_population_hashes(
@@ -85,31 +101,79 @@ class PopulationManager:
             not self._is_population_complete(current_population, target_population_size)
             and attempts < max_attempts
         ):
-            individual = self._generate_population_entry(max_nodes)
-            found_solution, (_fitness, failing_trees, suggestion) = GeneratorWithReturn(
-                eval_individual(individual)
-            ).collect()
-            candidate, _fixes_made = self.fix_individual(
-                individual,
-                suggestion,
+            block_size = target_population_size - len(current_population)
+
+            # Generate and drop duplicates before evaluating anything
+            candidates: list[DerivationTree] = []
+            candidate_hashes = set(unique_hashes)
+            for _ in range(block_size):
+                PopulationManager.add_unique_individual(
+                    candidates,
+                    self._generate_population_entry(max_nodes),
+                    candidate_hashes,
+                )
+
+            # Evaluate and fix the remaining candidates
+            suggestions = yield from self._evaluate_candidates(
+                candidates, eval_individual, eval_batch
             )
-            new_found_solution, (_new_fitness, _new_failing_trees, suggestion) = (
-                GeneratorWithReturn(eval_individual(candidate)).collect()
+            fixed_candidates = [
+                self.fix_individual(candidate, suggestion)[0]
+                for candidate, suggestion in zip(candidates, suggestions, strict=True)
+            ]
+            yield from self._evaluate_candidates(
+                fixed_candidates, eval_individual, eval_batch
             )
-            if attempts < max_attempts:
+
+            added = 0
+            for candidate in fixed_candidates:
                 if PopulationManager.add_unique_individual(
                     current_population, candidate, unique_hashes
                 ):
-                    yield from found_solution
-                    yield from new_found_solution
-                else:
-                    attempts += 1
+                    added += 1
+            duplicates = block_size - added
+            attempts += duplicates
+
+            if (
+                block_size >= SATURATION_MIN_BLOCK_SIZE
+                and duplicates >= block_size * SATURATION_DUPLICATE_RATE
+            ):
+                LOGGER.info(
+                    f"{duplicates} of {block_size} generated individuals are duplicates; the grammar seems saturated"
+                )
+                break
 
         if not self._is_population_complete(current_population, target_population_size):
             LOGGER.warning(
                 f"Could not generate a full population of unique individuals. Population size reduced to {len(current_population)}."
             )
 
+    @staticmethod
+    def _evaluate_candidates(
+        candidates: list[DerivationTree],
+        eval_individual: Callable[
+            [DerivationTree],
+            Generator[
+                DerivationTree, None, tuple[float, list[FailingTree], Suggestion]
+            ],
+        ],
+        eval_batch: Optional[
+            Callable[[list[DerivationTree]], Generator[DerivationTree, None, None]]
+        ],
+    ) -> Generator[DerivationTree, None, list[Suggestion]]:
+        """
+        Evaluate `candidates`, as a batch if possible.
+
+        :return: A generator that yields solutions, returning the suggestions for each candidate.
+        """
+        if eval_batch is not None:
+            yield from eval_batch(candidates)
+        suggestions = []
+        for candidate in candidates:
+            _fitness, _failing_trees, suggestion = yield from eval_individual(candidate)
+            suggestions.append(suggestion)
+        return suggestions
+
     def fix_individual(
         self,
         individual: DerivationTree,
@@ -117,12 +181,13 @@ class PopulationManager:
     ) -> tuple[DerivationTree, int]:
         fixes_made = 0
         if suggestion:
-            suggested_replacements = suggestion.get_replacements(
-                individual, self._grammar
-            )
-            individual = individual.replace_multiple(
-                self._grammar, suggested_replacements
-            )
+            with span("apply_suggestions"):
+                suggested_replacements = suggestion.get_replacements(
+                    individual, self._grammar
+                )
+                individual = individual.replace_multiple(
+                    self._grammar, suggested_replacements
+                )
             fixes_made += len(suggested_replacements)
 
         return individual, fixes_made
@@ -1,109 +1,312 @@
+import contextlib
+import json
+import os
+import threading
 import time
-from abc import ABC, abstractmethod
 from collections.abc import Generator
 from contextlib import contextmanager
-from typing import Any, Optional
+from typing import Any, ContextManager, Optional
 
+# Stop recording individual spans for the trace after this many; their time is still summed up
+MAX_TRACE_EVENTS = 1_000_000
 
-class Timer(ABC):
-    """Abstract base class for timing operations."""
+# The profiler recording spans, if any; see `Profiler.__enter__()`
+_active: Optional["Profiler"] = None
 
-    def __init__(self, profiler: "Profiler", key: str):
-        self.profiler = profiler
-        self.key = key
-        self._start_time = time.time()
+# Returned by `span()` if no profiler is recording; reusable, as it keeps no state
+_NO_SPAN = contextlib.nullcontext()
 
-    @abstractmethod
-    def increment(self, count: int = 1) -> None:
-        """Increment the count for this metric."""
-        pass
 
-    @abstractmethod
-    def _stop(self) -> None:
-        """Stop the timer and record the elapsed time."""
-        pass
+class SpanStats:
+    """Accumulated statistics of all spans with the same name and the same parent span."""
 
+    __slots__ = ("name", "calls", "items", "total_ns", "children")
 
-class EnabledTimer(Timer):
-    """Timer implementation for when profiling is enabled."""
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.items = 0
+        self.total_ns = 0
+        self.children: dict[str, "SpanStats"] = {}
 
-    def _stop(self) -> None:
-        elapsed = time.time() - self._start_time
-        if "time" not in self.profiler.metrics[self.key]:
-            self.profiler.metrics[self.key]["time"] = 0
-        self.profiler.metrics[self.key]["time"] += elapsed
+    def child(self, name: str) -> "SpanStats":
+        """Return the statistics of the child span `name`, creating them if needed."""
+        stats = self.children.get(name)
+        if stats is None:
+            stats = self.children.setdefault(name, SpanStats(name))
+        return stats
 
-    def increment(self, count: int = 1) -> None:
-        if not self.profiler.enabled:
-            return
+    @property
+    def self_ns(self) -> int:
+        """The time spent in this span, but not in any of its child spans."""
+        return self.total_ns - sum(child.total_ns for child in self.children.values())
 
-        if "count" not in self.profiler.metrics[self.key]:
-            self.profiler.metrics[self.key]["count"] = 0
-        self.profiler.metrics[self.key]["count"] += count
+    def sorted_children(self) -> list["SpanStats"]:
+        """The child spans, the most expensive first."""
+        return sorted(self.children.values(), key=lambda c: c.total_ns, reverse=True)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "items": self.items,
+            "total_s": self.total_ns / 1e9,
+            "self_s": self.self_ns / 1e9,
+            "children": [child.to_dict() for child in self.sorted_children()],
+        }
 
-class DisabledTimer(Timer):
-    """No-op timer implementation for when profiling is disabled."""
 
-    def __init__(self, profiler: "Profiler", key: str):
-        pass
+class Timer:
+    """
+    A span being recorded; returned by `Profiler.span()`.
+    Spans nest: a span entered while another span is active in the same thread becomes its child.
+    """
+
+    __slots__ = ("_profiler", "_name", "_stack", "_depth", "_stats", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self) -> "Timer":
+        stack = self._profiler._stack()
+        self._stack = stack
+        self._depth = len(stack)
+        self._stats = stack[-1].child(self._name)
+        stack.append(self._stats)
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = time.perf_counter_ns()
+        # Also drop spans of generators that were suspended within this span and never resumed
+        del self._stack[self._depth :]
+        self._stats.calls += 1
+        self._stats.total_ns += end - self._start
+        self._profiler._record(self._name, self._start, end)
 
     def increment(self, count: int = 1) -> None:
-        pass
+        """Increment the number of items processed in this span."""
+        self._stats.items += count
+
 
-    def _stop(self) -> None:
+class DisabledTimer:
+    """No-op timer for when profiling is disabled."""
+
+    def increment(self, count: int = 1) -> None:
         pass
 
 
 class Profiler:
-    """A profiling utility for tracking execution times and counts."""
+    """
+    A profiling utility for tracking execution times and counts in nested spans.
+
+    Code throughout Fandango records spans with `span()`, which only costs time
+    while a profiler is active. To profile everything, activate a profiler with
+    `with Profiler(enabled=True) as profiler: ...` and `write()` the results afterwards.
+    """
 
     def __init__(self, enabled: bool):
         self.enabled = enabled
-        self.metrics: dict[str, dict[str, int | float]] = {
-            "initial_population": {"count": 0, "time": 0.0},
-            "evaluate_population": {"count": 0, "time": 0.0},
-            "select_elites": {"count": 0, "time": 0.0},
-            "tournament_selection": {"count": 0, "time": 0.0},
-            "filling": {"count": 0, "time": 0.0},
-            "crossover": {"count": 0, "time": 0.0},
-            "mutation": {"count": 0, "time": 0.0},
-        }
+        self.root = SpanStats("")
+        self.caches: dict[str, Any] = {}
+        self.dropped_events = 0
+        self._events: list[tuple[str, int, int, int]] = []
+        self._threads: dict[int, str] = {}
+        self._local = threading.local()
+        self._start_ns = time.perf_counter_ns()
+        self._previous: Optional[Profiler] = None
+
+    def __enter__(self) -> "Profiler":
+        """Make this profiler record all spans, until the `with` block is left."""
+        global _active
+        self._previous = _active
+        if self.enabled:
+            _active = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active
+        _active = self._previous
+        self._previous = None
+
+    def _stack(self) -> list[SpanStats]:
+        """The spans currently active in the calling thread; the first is the root."""
+        try:
+            return self._local.stack  # type: ignore[no-any-return] # set below
+        except AttributeError:
+            thread = threading.current_thread()
+            self._threads[thread.ident or 0] = thread.name
+            self._local.stack = [self.root]
+            return self._local.stack  # type: ignore[no-any-return] # set above
+
+    def _record(self, name: str, start: int, end: int) -> None:
+        if len(self._events) < MAX_TRACE_EVENTS:
+            self._events.append((name, start, end, threading.get_ident()))
+        else:
+            self.dropped_events += 1
+
+    def span(self, name: str) -> ContextManager[Timer | DisabledTimer]:
+        """
+        Record the time spent in a `with` block.
+
+        :param name: The name of the span
+        :return: A context manager yielding a timer that counts the items processed
+        """
+        if not self.enabled:
+            return contextlib.nullcontext(DisabledTimer())
+        return Timer(self, name)
 
     @contextmanager
     def timer(
         self, key: str, increment: Optional[int | list[Any]] = None
-    ) -> Generator[Timer, None, None]:
+    ) -> Generator[Timer | DisabledTimer, None, None]:
         """Context manager for profiling operations.
 
-        :param key: The metric key to track
+        :param key: The name of the span to record
         :param increment: Either an integer, a list the length which will be used as the increment value.
         :yields: A timer object that can be used to increment the metric if it has to be calculated manually.
         """
-        timer = EnabledTimer(self, key) if self.enabled else DisabledTimer(self, key)
-        try:
+        with self.span(key) as timer:
             yield timer
-        finally:
-            if self.enabled:
-                timer._stop()
-                # Calculate increment value after operation completes
-                if isinstance(increment, list):
-                    timer.increment(len(increment))
-                elif isinstance(increment, int):
-                    timer.increment(increment)
-                elif increment is not None:
-                    raise ValueError(f"Invalid increment value: {increment}")
+            # Calculate increment value after operation completes
+            if isinstance(increment, list):
+                timer.increment(len(increment))
+            elif isinstance(increment, int):
+                timer.increment(increment)
+            elif increment is not None:
+                raise ValueError(f"Invalid increment value: {increment}")
+
+    def track_cache(self, name: str, cache: Any) -> None:
+        """
+        Report the hits and misses of `cache` (a `ManagedCache`) with the results.
+
+        :param name: The name to report the cache under; a number is added if already taken
+        :param cache: The cache
+        """
+        if not self.enabled:
+            return
+        unique_name = name
+        suffix = 2
+        while unique_name in self.caches and self.caches[unique_name] is not cache:
+            unique_name = f"{name} #{suffix}"
+            suffix += 1
+        self.caches[unique_name] = cache
+
+    def cache_stats(self) -> list[dict[str, Any]]:
+        """:return: The statistics of the tracked caches."""
+        stats = []
+        for name, cache in self.caches.items():
+            hits = getattr(cache, "hits", 0)
+            misses = getattr(cache, "misses", 0)
+            stats.append(
+                {
+                    "name": name,
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else None,
+                    "size": len(cache),
+                    "bytes": getattr(cache, "bytes", None),
+                }
+            )
+        return stats
+
+    def to_dict(self) -> dict[str, Any]:
+        """:return: The span statistics (as a tree) and cache statistics."""
+        return {
+            "spans": [child.to_dict() for child in self.root.sorted_children()],
+            "caches": self.cache_stats(),
+            "dropped_events": self.dropped_events,
+        }
+
+    def trace_events(self) -> list[dict[str, Any]]:
+        """:return: The recorded spans as events in Chrome trace event format."""
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self._threads.items()
+        ]
+        for name, start, end, tid in self._events:
+            events.append(
+                {
+                    "name": name,
+                    "cat": name.split(":", 1)[0],
+                    "ph": "X",
+                    "ts": (start - self._start_ns) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                }
+            )
+        return events
+
+    def write(self, filename: str) -> None:
+        """
+        Write the results to `filename` as JSON.
+        The file is in Chrome trace event format, such that it can be loaded
+        into `chrome://tracing` or https://ui.perfetto.dev; its `profile` entry
+        holds the results of `to_dict()`.
+
+        :param filename: The file to write
+        """
+        data = {
+            "traceEvents": self.trace_events(),
+            "displayTimeUnit": "ms",
+            "profile": self.to_dict(),
+        }
+        with open(filename, "w") as fd:
+            json.dump(data, fd)
+        # Imported here, as the logger depends on the language modules recording spans
+        from fandango.logger import LOGGER
+
+        LOGGER.info(f"Wrote profile to {filename!r}")
 
     def log_results(self) -> None:
         """Log the profiling results."""
         if not self.enabled:
             return
+        from fandango.logger import LOGGER
 
-        for key, value in self.metrics.items():
-            if isinstance(value, dict) and "time" in value and "count" in value:
-                avg_time = value["time"] / value["count"] if value["count"] > 0 else 0
-                print(
-                    f"{key}: {avg_time:.6f}s per execution ({value['count']} runs, total {value['time']:.6f}s)"
+        def log_span(stats: SpanStats, depth: int) -> None:
+            avg_time = stats.total_ns / stats.calls / 1e9 if stats.calls > 0 else 0
+            items = f", {stats.items} items" if stats.items else ""
+            LOGGER.info(
+                f"{'  ' * depth}{stats.name}: {avg_time:.6f}s per execution "
+                f"({stats.calls} runs{items}, total {stats.total_ns / 1e9:.6f}s, "
+                f"self {stats.self_ns / 1e9:.6f}s)"
+            )
+            for child in stats.sorted_children():
+                log_span(child, depth + 1)
+
+        for child in self.root.sorted_children():
+            log_span(child, 0)
+        for stats in self.cache_stats():
+            if stats["hit_rate"] is not None:
+                LOGGER.info(
+                    f"Cache {stats['name']}: {stats['hit_rate']:.1%} hits "
+                    f"({stats['hits']} hits, {stats['misses']} misses)"
                 )
-            else:
-                print(f"Warning: '{key}' does not have valid time/count data.")
+
+
+def active_profiler() -> Optional[Profiler]:
+    """:return: The profiler recording spans, if any."""
+    return _active
+
+
+def span(name: str) -> ContextManager[Any]:
+    """
+    Record the time spent in a `with` block with the active profiler, if any.
+    Nearly free if no profiler is active.
+
+    :param name: The name of the span; the text before a `:` is its category
+    """
+    profiler = _active
+    if profiler is None:
+        return _NO_SPAN
+    return Timer(profiler, name)
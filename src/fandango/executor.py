@@ -0,0 +1,282 @@
+import os
+import queue
+import struct
+import subprocess
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Optional
+
+from fandango.errors import FandangoValueError
+from fandango.evolution.profiler import span
+from fandango.logger import LOGGER, print_exception
+
+# Where to keep input files. Being a tmpfs, writing them does not touch the disk.
+SHM_DIR = "/dev/shm"
+
+INPUT_METHODS = ["filename", "stdin", "persistent"]
+
+
+def _input_dir() -> Optional[str]:
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return None  # the default temporary directory
+
+
+def _remove_file(file: IO[bytes], name: str) -> None:
+    try:
+        file.close()
+        os.unlink(name)
+    except OSError:
+        pass
+
+
+class InputFile:
+    """
+    A file holding the current input for the command under test.
+    Instead of creating a new file for each input, the file is created once
+    (in shared memory, where available) and overwritten with each input.
+    The file is removed when the object is closed or garbage collected.
+    """
+
+    def __init__(self, *, prefix: str = "fandango-", suffix: str = ""):
+        fd, self.name = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=_input_dir())
+        self._file = os.fdopen(fd, "wb")
+        self._finalizer = weakref.finalize(self, _remove_file, self._file, self.name)
+
+    def write(self, data: str | bytes) -> None:
+        """
+        Replace the contents of the file by `data`.
+        :param data: The new contents. Strings are encoded as UTF-8.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(data)
+        self._file.flush()
+
+    def clear(self) -> None:
+        """Make the file empty."""
+        self.write(b"")
+
+    def close(self) -> None:
+        """Remove the file."""
+        self._finalizer()
+
+
+class Executor:
+    """
+    Runs the command under test on one input at a time.
+
+    The input is passed according to `input_method`:
+    * `filename` - as the last argument, naming a file holding the input
+    * `stdin` - as the standard input of the command
+    * `persistent` - to a command that keeps running and processes one input after the other.
+      For each input, Fandango writes the length of the input (as 4-byte big-endian integer),
+      followed by the input, to the standard input of the command.
+      Once done, the command writes a line with its status (an integer; 0 for success)
+      to its standard output. If the command exits or does not respond within
+      the timeout, it is restarted for the next input.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        *,
+        input_method: str = "filename",
+        timeout: Optional[float | int] = None,
+        suffix: str = "",
+    ):
+        """
+        :param command: The command to run, with its arguments.
+        :param input_method: How to pass the input to the command; see above.
+        :param timeout: The maximum time for processing one input, in seconds. If None, wait indefinitely.
+        :param suffix: The suffix of input files (for `input_method="filename"`).
+        """
+        if input_method not in INPUT_METHODS:
+            raise FandangoValueError(f"Unsupported input method: {input_method!r}")
+        self.command = command
+        self.input_method = input_method
+        self.timeout = timeout
+        self._input_file = (
+            InputFile(suffix=suffix) if input_method == "filename" else None
+        )
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self._responses: queue.Queue[Optional[bytes]] = queue.Queue()
+
+    def run(self, data: str | bytes) -> Optional[int]:
+        """
+        Run the command on `data`.
+        :param data: The input. Strings are encoded as UTF-8.
+        :return: The exit status of the command, or None if it timed out.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self.input_method == "persistent":
+            return self._run_persistent(data)
+
+        cmd = self.command
+        stdin: Optional[bytes] = data
+        if self._input_file is not None:
+            self._input_file.write(data)
+            cmd = cmd + [self._input_file.name]
+            stdin = None
+        LOGGER.debug(f"Running {cmd}")
+        try:
+            return subprocess.run(cmd, input=stdin, timeout=self.timeout).returncode
+        except subprocess.TimeoutExpired:
+            LOGGER.warning(f"{self.command[0]}: timed out after {self.timeout} seconds")
+            return None
+
+    def _start_process(self) -> subprocess.Popen[bytes]:
+        LOGGER.debug(f"Starting {self.command}")
+        process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        responses: queue.Queue[Optional[bytes]] = queue.Queue()
+
+        def read_responses() -> None:
+            assert process.stdout is not None
+            for line in process.stdout:
+                responses.put(line)
+            responses.put(None)
+
+        threading.Thread(target=read_responses, daemon=True).start()
+        self._process = process
+        self._responses = responses
+        return process
+
+    def _stop_process(self) -> Optional[int]:
+        process = self._process
+        self._process = None
+        if process is None:
+            return None
+        if process.poll() is None:
+            process.kill()
+        return process.wait()
+
+    def _run_persistent(self, data: bytes) -> Optional[int]:
+        process = self._process
+        if process is None or process.poll() is not None:
+            process = self._start_process()
+        assert process.stdin is not None
+        try:
+            process.stdin.write(struct.pack(">I", len(data)) + data)
+            process.stdin.flush()
+            response = self._responses.get(timeout=self.timeout)
+        except OSError:
+            # The command exited before reading the input
+            response = None
+        except queue.Empty:
+            LOGGER.warning(f"{self.command[0]}: timed out after {self.timeout} seconds")
+            self._stop_process()
+            return None
+
+        if response is None:
+            # The command exited while processing the input
+            return self._stop_process()
+        try:
+            return int(response)
+        except ValueError:
+            LOGGER.warning(
+                f"{self.command[0]}: expected status, got {response!r}; restarting"
+            )
+            self._stop_process()
+            return None
+
+    def close(self) -> None:
+        """Stop the command (if persistent) and remove the input file."""
+        if self._process is not None:
+            assert self._process.stdin is not None
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=self.timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self._stop_process()
+        if self._input_file is not None:
+            self._input_file.close()
+
+
+class ExecutorPool:
+    """
+    Runs the command under test on inputs using up to `executors` concurrent `Executor`s.
+    `submit()` returns as soon as the input is handed to an executor,
+    such that Fandango can generate the next inputs meanwhile.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        *,
+        executors: int = 1,
+        input_method: str = "filename",
+        timeout: Optional[float | int] = None,
+        suffix: str = "",
+    ):
+        """
+        :param command: The command to run, with its arguments.
+        :param executors: The number of inputs to process concurrently.
+        See `Executor` for the other parameters.
+        """
+        if executors < 1:
+            raise FandangoValueError("The number of executors must be at least 1")
+        self._idle: queue.SimpleQueue[Executor] = queue.SimpleQueue()
+        self._executors = [
+            Executor(command, input_method=input_method, timeout=timeout, suffix=suffix)
+            for _ in range(executors)
+        ]
+        for executor in self._executors:
+            self._idle.put(executor)
+        # Block submit() while all executors are busy, rather than queueing inputs
+        self._free = threading.Semaphore(executors)
+        self._pool = ThreadPoolExecutor(
+            max_workers=executors, thread_name_prefix="fandango-executor"
+        )
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def submit(self, data: str | bytes) -> None:
+        """
+        Run the command on `data` as soon as an executor is free.
+        :param data: The input. Strings are encoded as UTF-8.
+        """
+        with span("exec_wait"):
+            self._free.acquire()
+        self._pool.submit(self._run, data)
+
+    def _run(self, data: str | bytes) -> None:
+        executor = self._idle.get()
+        try:
+            status = executor.run(data)
+        except Exception as e:
+            print_exception(e, f"Cannot run {executor.command[0]}")
+            status = -1
+        finally:
+            self._idle.put(executor)
+            self._free.release()
+        with self._lock:
+            self.executions += 1
+            if status is None:
+                self.timeouts += 1
+            elif status != 0:
+                self.failures += 1
+
+    def close(self) -> None:
+        """Wait for all submitted inputs to be processed, then stop all executors."""
+        self._pool.shutdown(wait=True)
+        for executor in self._executors:
+            executor.close()
+        LOGGER.info(
+            f"{self.executions} executions, {self.failures} failed, {self.timeouts} timed out"
+        )
+
+    def __enter__(self) -> "ExecutorPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -1,11 +1,11 @@
 import json
 import os
 import subprocess
-import tempfile
 from typing import Optional, Union
 
 from cachetools import LRUCache
 
+from fandango.executor import InputFile
 from fandango.experimental.execution.static_analysis import StaticAnalysis
 from fandango.experimental.execution.trace_types import (
     BasicBlockID,
@@ -148,41 +148,38 @@ class DynamicAnalysis:
         root_dir: str,
         put: str,
         put_args: Optional[list[str]] = None,
+        timeout: float | int = 10,
     ):
         self.sa = sa
         self.root_dir = root_dir
         self.put = put
         self.put_args = put_args if put_args is not None else []
+        self.timeout = timeout
         self.cache: LRUCache[str, Trace] = LRUCache(maxsize=1000)
+        # Reused for all inputs, rather than creating two new files per input
+        self._input_file = InputFile(suffix=".txt")
+        self._trace_file = InputFile(prefix="execution-trace-", suffix=".json")
 
     # TODO: Implement this similarly to the Fandango "run with cmd" feature.
     def trace_input(self, inp: str) -> Trace:
         if inp in self.cache:
             return self.cache[inp]
         env = os.environ.copy()
-        with tempfile.NamedTemporaryFile(
-            mode="w", prefix="fandango-", suffix=".txt"
-        ) as inp_fd:
-            inp_fd.write(inp)
-            inp_fd.flush()
-
-            with tempfile.NamedTemporaryFile(
-                mode="w", prefix="execution-trace-", suffix=".json"
-            ) as trace_fd:
-                execution_trace_json = trace_fd.name
-                env["EXECUTION_TRACE_JSON"] = execution_trace_json
-                LOGGER.info(f"Running input: (len: {len(inp)})")
-                LOGGER.info(inp)
-                subprocess.run(
-                    [self.put] + self.put_args + [inp_fd.name],
-                    cwd=self.root_dir,
-                    env=env,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    timeout=10,  # kill after 10 seconds
-                )
-
-                with open(execution_trace_json, mode="r", encoding="utf-8") as jsonf:
-                    trace = Trace(self.sa, json.load(jsonf))
-                    self.cache[inp] = trace
-                    return trace
+        self._input_file.write(inp)
+        self._trace_file.clear()
+        env["EXECUTION_TRACE_JSON"] = self._trace_file.name
+        LOGGER.info(f"Running input: (len: {len(inp)})")
+        LOGGER.info(inp)
+        subprocess.run(
+            [self.put] + self.put_args + [self._input_file.name],
+            cwd=self.root_dir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=self.timeout,
+        )
+
+        with open(self._trace_file.name, mode="r", encoding="utf-8") as jsonf:
+            trace = Trace(self.sa, json.load(jsonf))
+            self.cache[inp] = trace
+            return trace
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import contextlib
 import enum
 import io
 import logging
@@ -11,18 +12,28 @@ import subprocess
 import sys
 import threading
 import time
+import uuid
 from _contextvars import ContextVar
 from abc import ABC, abstractmethod
-from typing import IO, Hashable, Optional
+from collections.abc import Iterator
+from typing import IO, TYPE_CHECKING, Callable, Hashable, Optional
 from uuid import UUID
 
 from fandango.errors import FandangoError, FandangoValueError
+from fandango.evolution.profiler import span
 from fandango.language.symbols.non_terminal import NonTerminal
 from fandango.language.tree import DerivationTree
 from fandango.logger import LOGGER
 
+if TYPE_CHECKING:
+    from fandango.io.transport import AsyncioProtocolImplementation
+
 EnvKey = Hashable
 
+# How long to block in select() before checking whether a party has been stopped.
+# Incoming data and connections are handled as soon as they arrive.
+SELECT_TIMEOUT = 0.1
+
 
 class EnvContext:
     contextVar: Optional[ContextVar[Optional[UUID]]] = ContextVar(
@@ -212,6 +223,23 @@ class FandangoParty(  # noqa: B024 # this is an abstract base class without any
         raise NotImplementedError("stop() method not implemented")
 
 
+def encode_message(message: DerivationTree | str | bytes) -> bytes:
+    """
+    Convert a message to the bytes to be sent.
+    :param message: The message to convert.
+    :return: The message as bytes; strings and trees are encoded as UTF-8.
+    """
+    if isinstance(message, DerivationTree):
+        return message.to_bytes(encoding="utf-8")
+    elif isinstance(message, str):
+        return message.encode("utf-8")
+    elif isinstance(message, bytes):
+        return message
+    raise FandangoValueError(
+        f"Invalid message type: {type(message)}. Must be DerivationTree, str, or bytes."
+    )
+
+
 class ProtocolImplementation(ABC):
     """
     Base class for all protocol implementations.
@@ -418,7 +446,7 @@ class UdpTcpProtocolImplementation(ProtocolImplementation):
                         assert self._sock is not None
                         while self._running:
                             rlist, _, _ = select.select(
-                                [self._sock], [], [], 0.0000000001
+                                [self._sock], [], [], SELECT_TIMEOUT
                             )
                             if rlist:
                                 self._connection, _ = self._sock.accept()
@@ -431,7 +459,9 @@ class UdpTcpProtocolImplementation(ProtocolImplementation):
                         except BlockingIOError:
                             pass
                         while self._running:
-                            _, wlist, _ = select.select([], [self._sock], [], 0.00001)
+                            _, wlist, _ = select.select(
+                                [], [self._sock], [], SELECT_TIMEOUT
+                            )
                             if wlist:
                                 self._connection = self._sock
                                 break
@@ -453,7 +483,7 @@ class UdpTcpProtocolImplementation(ProtocolImplementation):
         while self._running:
             try:
                 assert self._connection is not None
-                rlist, _, _ = select.select([self._connection], [], [], 0.01)
+                rlist, _, _ = select.select([self._connection], [], [], SELECT_TIMEOUT)
                 if rlist and self._running:
                     if self.protocol_type == Protocol.TCP:
                         data = self._connection.recv(self._buffer_size)
@@ -487,16 +517,7 @@ class UdpTcpProtocolImplementation(ProtocolImplementation):
         self._wait_accept()
 
         assert self._connection is not None
-        if isinstance(message, DerivationTree):
-            send_data = message.to_bytes(encoding="utf-8")
-        elif isinstance(message, str):
-            send_data = message.encode("utf-8")
-        elif isinstance(message, bytes):
-            send_data = message
-        else:
-            raise FandangoValueError(
-                f"Invalid message type: {type(message)}. Must be DerivationTree, str, or bytes."
-            )
+        send_data = encode_message(message)
         if self.protocol_type == Protocol.TCP:
             self._connection.sendall(send_data)
         else:
@@ -536,7 +557,7 @@ class NetworkParty(FandangoParty):
         """
         party_name, prot, host, port = split_party_spec(uri)
         super().__init__(connection_mode=connection_mode, party_name=party_name)
-        self.protocol_impl = None
+        self.protocol_impl: Optional[ProtocolImplementation] = None
 
         if prot is None:
             prot = self.DEFAULT_PROTOCOL.value
@@ -559,7 +580,16 @@ class NetworkParty(FandangoParty):
             protocol = self.DEFAULT_PORT
 
         if protocol == Protocol.TCP or protocol == Protocol.UDP:
-            self.protocol_impl = UdpTcpProtocolImplementation(
+            impl_class: (
+                "type[UdpTcpProtocolImplementation | AsyncioProtocolImplementation]"
+            )
+            if self.io_instance.use_asyncio:
+                from fandango.io.transport import AsyncioProtocolImplementation
+
+                impl_class = AsyncioProtocolImplementation
+            else:
+                impl_class = UdpTcpProtocolImplementation
+            self.protocol_impl = impl_class(
                 connection_mode=connection_mode,
                 protocol_type=protocol,
                 ip_type=ip_type,
@@ -666,15 +696,13 @@ class StdIn(FandangoParty):
 
     def _listen_loop(self) -> None:
         while self.running:
-            rlist, _, _ = select.select([self.stream], [], [], 0.1)
+            rlist, _, _ = select.select([self.stream], [], [], SELECT_TIMEOUT)
             if rlist:
                 read = sys.stdin.readline()
                 if read == "":
                     self.running = False
                     break
                 self.receive(read, self.party_name)
-            else:
-                time.sleep(0.1)
 
 
 class Out(FandangoParty):
@@ -747,7 +775,8 @@ class In(FandangoParty):
 class TimerControl(FandangoParty):
     def __init__(self) -> None:
         super().__init__(connection_mode=ConnectionMode.CONNECT)
-        self.timers: dict[str, tuple[int, bool, threading.Thread]] = {}
+        # Maps timer names to their start time, cancellation event and thread
+        self.timers: dict[str, tuple[int, threading.Event, threading.Thread]] = {}
         self.lock = threading.Lock()
 
     def start(self) -> None:
@@ -757,19 +786,15 @@ class TimerControl(FandangoParty):
         self.stop_timers()
 
     def start_timer(self, name: str, time_s: int) -> None:
+        cancelled = threading.Event()
+
         def timer_sleep() -> None:
-            timer_start_time = time.time()
-            while (time.time() - timer_start_time) < time_s:
-                with self.lock:
-                    entry = self.timers.get(name)
-                    if entry is None or not entry[1]:
-                        return
-                time.sleep(0.1)
-            self._on_timer_expire(name)
+            if not cancelled.wait(time_s):
+                self._on_timer_expire(name, cancelled)
 
         timer_thread = threading.Thread(target=timer_sleep, daemon=True)
         with self.lock:
-            self.timers[name] = (time.time_ns(), True, timer_thread)
+            self.timers[name] = (time.time_ns(), cancelled, timer_thread)
             timer_thread.start()
 
     def stop_timers(self, name: Optional[str] = None) -> None:
@@ -782,8 +807,8 @@ class TimerControl(FandangoParty):
             for timer_name in timers_to_stop:
                 if timer_name not in self.timers:
                     continue
-                timeout, _, timer_thread = self.timers[timer_name]
-                self.timers[timer_name] = (timeout, False, timer_thread)
+                _, cancelled, timer_thread = self.timers[timer_name]
+                cancelled.set()
                 to_join.append((timer_name, timer_thread))
         with self.lock:
             for timer_name, _ in to_join:
@@ -819,9 +844,11 @@ class TimerControl(FandangoParty):
 
         pass
 
-    def _on_timer_expire(self, name: str) -> None:
+    def _on_timer_expire(self, name: str, cancelled: threading.Event) -> None:
         with self.lock:
-            if name in self.timers:
+            entry = self.timers.get(name)
+            # A restarted timer of the same name has its own event
+            if entry is not None and entry[1] is cancelled:
                 del self.timers[name]
         self.receive(f"expired: {name}\n", "TimerEvent")
 
@@ -863,16 +890,42 @@ class FandangoIO(object):
 
         with cls._lock:
             if env_key not in cls._instances:
-                cls._instances[env_key] = cls()
+                cls._instances[env_key] = cls(env_key)
             return cls._instances[env_key]
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        env_key: Optional[UUID] = None,
+        receive_lock: Optional[threading.Condition] = None,
+    ) -> None:
         """
         Constructor for the FandangoIO class. Singleton! Do not call this method directly. Call instance() instead.
+        :param env_key: The environment this instance belongs to.
+        :param receive_lock: The condition to notify when a message is received. If None, a new one is created.
         """
+        self.env_key = env_key
         self.receive: list[tuple[str, str, str | bytes]] = []
         self.parties: dict[str, FandangoParty] = {}
-        self.receive_lock = threading.Lock()
+        # Notified whenever a message is received; see wait_for_receive()
+        self.receive_lock = (
+            receive_lock if receive_lock is not None else threading.Condition()
+        )
+        # If True, network parties created from now on share one asyncio event loop
+        # (see `fandango.io.transport`) instead of using a thread each
+        self.use_asyncio = False
+
+    @contextlib.contextmanager
+    def active(self) -> Iterator[None]:
+        """
+        Make this the instance returned by `FandangoIO.instance()` within the context,
+        such that parties created within the context register with it.
+        """
+        assert CURRENT_ENV_KEY.contextVar is not None
+        token = CURRENT_ENV_KEY.contextVar.set(self.env_key)
+        try:
+            yield
+        finally:
+            CURRENT_ENV_KEY.contextVar.reset(token)
 
     def reset_parties(self) -> None:
         """
@@ -882,13 +935,57 @@ class FandangoIO(object):
         for party in self.parties.values():
             party.stop()
         self.parties.clear()
-        with self.receive_lock:
+        with self.receive_lock, self.active():
             self.receive.clear()
             for party in party_instances:
                 cls = party.__class__
                 # Guaranteed to not have an argument
                 cls()  # type: ignore[call-arg]
 
+    def spawn(self) -> "FandangoIO":
+        """
+        Create an independent instance with a new instance of each party,
+        such that another protocol session can run concurrently with the one of this instance.
+        The new instance shares the receive lock of this instance, such that
+        `wait_for_receive()` on either instance is notified of messages received by both.
+        :return: The new instance. Call `close()` when done.
+        :raises FandangoValueError: If a party cannot be instantiated more than once.
+        """
+        for party in self.parties.values():
+            if isinstance(party, (StdIn, In, Out)) or (
+                isinstance(party, NetworkParty)
+                and party.connection_mode == ConnectionMode.OPEN
+            ):
+                raise FandangoValueError(
+                    f"Party {party.party_name}: {type(party).__name__} parties in {party.connection_mode.value} mode do not support concurrent sessions"
+                )
+
+        env_key = uuid.uuid4()
+        spawned = FandangoIO(env_key, receive_lock=self.receive_lock)
+        spawned.use_asyncio = self.use_asyncio
+        with FandangoIO._lock:
+            FandangoIO._instances[env_key] = spawned
+        with spawned.active():
+            for party in set(self.parties.values()):
+                # Guaranteed to not have an argument
+                party.__class__()  # type: ignore[call-arg]
+        return spawned
+
+    def close(self) -> None:
+        """
+        Stop all parties and discard this instance.
+        """
+        for party in self.parties.values():
+            try:
+                party.stop()
+            except NotImplementedError:
+                # The party has nothing to stop
+                pass
+        self.parties.clear()
+        with FandangoIO._lock:
+            if FandangoIO._instances.get(self.env_key) is self:
+                del FandangoIO._instances[self.env_key]
+
     def get_fuzzer_parties(self) -> set[FandangoParty]:
         """
         Returns the set of all parties controlled by Fandango.
@@ -909,6 +1006,7 @@ class FandangoIO(object):
             else:
                 for fragment_str in message:
                     self.receive.append((sender, receiver, fragment_str))
+            self.receive_lock.notify_all()
 
     def received_msg(self) -> bool:
         """
@@ -917,6 +1015,26 @@ class FandangoIO(object):
         with self.receive_lock:
             return len(self.receive) != 0
 
+    def wait_for_receive(
+        self,
+        predicate: Optional[
+            Callable[[list[tuple[str, str, str | bytes]]], bool]
+        ] = None,
+        timeout: Optional[float | int] = None,
+    ) -> bool:
+        """
+        Block until messages have been received from external parties.
+        :param predicate: If given, block until `predicate` returns True for the list of received messages. Called with the receive lock held; must not block.
+        :param timeout: The maximum time to wait, in seconds. If None, wait indefinitely.
+        :return: True if the messages have been received, False if the timeout expired.
+        """
+        if predicate is None:
+            predicate = bool
+        with span("io_wait"), self.receive_lock:
+            return self.receive_lock.wait_for(
+                lambda: predicate(self.receive), timeout=timeout
+            )
+
     def get_full_fragments(
         self,
     ) -> list[tuple[str, str, str | bytes]]:
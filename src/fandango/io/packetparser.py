@@ -1,6 +1,6 @@
 import random
-import time
 from collections.abc import Generator
+from functools import partial
 from typing import Optional
 
 from fandango.errors import FandangoFailedError, FandangoParseError, FandangoValueError
@@ -28,6 +28,15 @@ def _find_next_fragment(
     return -1, None
 
 
+def _has_next_fragment(
+    role_sender: str, messages: list[tuple[str, str, str | bytes]], start_idx: int = 0
+) -> bool:
+    """
+    Return True if the list of messages has a fragment sent by the specified sender at or after `start_idx`.
+    """
+    return _find_next_fragment(role_sender, messages, start_idx)[1] is not None
+
+
 def parse_next_remote_packet(
     grammar: Grammar,
     forecast: ForecastingResult,
@@ -37,24 +46,23 @@ def parse_next_remote_packet(
         return None
 
     # Wait till we receive a message from one of the parties in the forecast
-    received_parties = list(map(lambda x: x[0], io_instance.get_received_msgs()))
     wait_for_msg_time = 10
-    start_time = time.time()
-    while not forecast.contains_any_party(received_parties):
-        if time.time() - start_time > wait_for_msg_time:
-            if len(received_parties) == 0:
-                raise FandangoFailedError(
-                    "Timeout while waiting for message. No message has been received."
-                )
-            else:
-                raise FandangoValueError(
-                    "Unexpected party sent message. Expected: "
-                    + " | ".join(forecast.get_msg_parties())
-                    + f". Received: {set(received_parties)}."
-                    + f" Messages: {io_instance.get_full_fragments()}"
-                )
-        time.sleep(0.025)
+    if not io_instance.wait_for_receive(
+        lambda messages: forecast.contains_any_party([msg[0] for msg in messages]),
+        timeout=wait_for_msg_time,
+    ):
         received_parties = list(map(lambda x: x[0], io_instance.get_received_msgs()))
+        if len(received_parties) == 0:
+            raise FandangoFailedError(
+                "Timeout while waiting for message. No message has been received."
+            )
+        else:
+            raise FandangoValueError(
+                "Unexpected party sent message. Expected: "
+                + " | ".join(forecast.get_msg_parties())
+                + f". Received: {set(received_parties)}."
+                + f" Messages: {io_instance.get_full_fragments()}"
+            )
 
     msg_sender = None
     # We might have received messages from different parties. Select a party that sent a message and is
@@ -88,40 +96,33 @@ def parse_next_remote_packet(
     parameter_parsing_exception_tuple = None
     wait_for_completion_time = 1
     while continue_parse:
-        # Find the next message fragment sent by the selected sender
-        start_time = time.time()
+        # Wait for the next message fragment sent by the selected sender
+        if not io_instance.wait_for_receive(
+            partial(_has_next_fragment, msg_sender, start_idx=current_fragment_idx + 1),
+            timeout=wait_for_completion_time,
+        ):
+            if len(complete_parses) == 0:
+                current_parse_str = "Incompletely parsed NonTerminals:"
+                for incomplete_nt in available_non_terminals:
+                    nt_parser = nt_parsers[incomplete_nt]
+                    current_parse = nt_parser.collapse(nt_parser.current_tree())
+                    current_parse_str += f"\n{str(incomplete_nt)}: {str(current_parse)}"
+
+                raise FandangoFailedError(
+                    f"Timeout while waiting for next message fragment from {msg_sender}. \n"
+                    + generate_parsing_error_msg_information(
+                        forecast_non_terminals.get_non_terminals(),
+                        available_non_terminals,
+                        nt_parsers,
+                        io_instance.get_full_fragments(),
+                    )
+                )
+            else:
+                continue_parse = False
+                break
         next_fragment_idx, next_fragment = _find_next_fragment(
             msg_sender, io_instance.get_received_msgs(), current_fragment_idx + 1
         )
-        while next_fragment is None:
-            next_fragment_idx, next_fragment = _find_next_fragment(
-                msg_sender, io_instance.get_received_msgs(), current_fragment_idx + 1
-            )
-            if time.time() - start_time > wait_for_completion_time:
-                if len(complete_parses) == 0:
-                    current_parse_str = "Incompletely parsed NonTerminals:"
-                    for incomplete_nt in available_non_terminals:
-                        nt_parser = nt_parsers[incomplete_nt]
-                        current_parse = nt_parser.collapse(nt_parser.current_tree())
-                        current_parse_str += (
-                            f"\n{str(incomplete_nt)}: {str(current_parse)}"
-                        )
-
-                    raise FandangoFailedError(
-                        f"Timeout while waiting for next message fragment from {msg_sender}. \n"
-                        + generate_parsing_error_msg_information(
-                            forecast_non_terminals.get_non_terminals(),
-                            available_non_terminals,
-                            nt_parsers,
-                            io_instance.get_full_fragments(),
-                        )
-                    )
-                else:
-                    continue_parse = False
-                    break
-            time.sleep(0.025)
-        if not continue_parse:
-            break
 
         assert next_fragment is not None
         current_fragment_idx = next_fragment_idx
@@ -0,0 +1,295 @@
+import asyncio
+import socket
+import threading
+from collections.abc import Callable, Coroutine
+from typing import Any, Optional, TypeVar
+
+from fandango.errors import FandangoError, FandangoValueError
+from fandango.io import (
+    SELECT_TIMEOUT,
+    ConnectionMode,
+    FandangoParty,
+    IpType,
+    Protocol,
+    ProtocolImplementation,
+    encode_message,
+)
+from fandango.language.tree import DerivationTree
+from fandango.logger import LOGGER
+
+T = TypeVar("T")
+
+# How long to wait for connections to be established or closed
+CONNECT_TIMEOUT = 10.0
+
+
+class EventLoopThread(object):
+    """
+    Singleton running an asyncio event loop in a daemon thread.
+    All `AsyncioProtocolImplementation` instances share this loop, such that
+    any number of connections is served by a single thread.
+    Used internally by Fandango; do not use directly.
+    """
+
+    _instance: Optional["EventLoopThread"] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> "EventLoopThread":
+        """
+        Returns the singleton instance of EventLoopThread. If it does not exist, it creates one.
+        """
+        with cls._lock:
+            # After a fork, the thread of the parent process does not exist any more
+            if cls._instance is None or not cls._instance._thread.is_alive():
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self) -> None:
+        """
+        Constructor for the EventLoopThread class. Singleton! Do not call this method directly. Call instance() instead.
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="fandango-asyncio", daemon=True
+        )
+        self._thread.start()
+
+    def run(
+        self, coroutine: Coroutine[Any, Any, T], timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run `coroutine` in the event loop and wait for its result.
+        :param coroutine: The coroutine to run.
+        :param timeout: The maximum time to wait, in seconds. If None, wait indefinitely.
+        :return: The result of the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def call_soon(self, callback: Callable[..., object], *args: Any) -> None:
+        """
+        Schedule `callback(*args)` to be called in the event loop.
+        Callbacks are called in the order they are scheduled.
+        """
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+class _PartyProtocol(asyncio.Protocol, asyncio.DatagramProtocol):
+    """Forwards the events of an asyncio transport to an `AsyncioProtocolImplementation`."""
+
+    def __init__(self, protocol_impl: "AsyncioProtocolImplementation"):
+        self._protocol_impl = protocol_impl
+        self._transport: Optional[asyncio.BaseTransport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport
+        self._protocol_impl._connection_made(transport)
+
+    def data_received(self, data: bytes) -> None:
+        self._protocol_impl._data_received(data, None)
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self._protocol_impl._data_received(data, addr)
+
+    def eof_received(self) -> Optional[bool]:
+        if self._transport is not None:
+            self._protocol_impl._connection_lost(self._transport)
+        return None
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._transport is not None:
+            self._protocol_impl._connection_lost(self._transport)
+
+    def error_received(self, exc: Exception) -> None:
+        LOGGER.debug(f"Party {self._protocol_impl.party_name!r}: {exc}")
+
+
+class AsyncioProtocolImplementation(ProtocolImplementation):
+    """
+    The implementation of TCP/UDP protocols on top of asyncio.
+    Behaves like `UdpTcpProtocolImplementation`, but instead of a thread per party,
+    all parties share the event loop of the `EventLoopThread`.
+    Used for network parties of `FandangoIO` instances with `use_asyncio` set.
+    """
+
+    def __init__(
+        self,
+        *,
+        connection_mode: ConnectionMode = ConnectionMode.CONNECT,
+        protocol_type: Protocol,
+        ip_type: IpType = IpType.IPV4,
+        ip: Optional[str] = None,
+        port: Optional[int] = None,
+        party_instance: Optional[FandangoParty] = None,
+    ):
+        """
+        Initialize an asyncio UDP/TCP protocol implementation.
+        See `ProtocolImplementation.__init__()` for parameter documentation.
+        """
+        if party_instance is None:
+            raise FandangoValueError("party_instance must not be None")
+        super().__init__(
+            connection_mode=connection_mode,
+            ip_type=ip_type,
+            ip=ip,
+            port=port,
+            party_instance=party_instance,
+        )
+        assert protocol_type == Protocol.TCP or protocol_type == Protocol.UDP
+        self._protocol_type = protocol_type
+        self._running = False
+        self._server: Optional[asyncio.Server] = None
+        self._transport: Optional[asyncio.BaseTransport] = None
+        # Set once the connection is established (or, for OPEN TCP, accepted)
+        self._connected = threading.Event()
+        self.current_remote_addr: Any = None
+
+    @property
+    def protocol_type(self) -> Protocol:
+        """
+        :return: the protocol type of this party.
+        """
+        return self._protocol_type
+
+    def start(self) -> None:
+        """
+        Starts the UDP/TCP party according to the given configuration.
+        If the party is already running or is not controlled by Fandango,
+        it does nothing.
+        :raises FandangoError: If the connection cannot be established.
+        """
+        if self._running:
+            return
+        if not self._party_instance.is_fuzzer_controlled():
+            return
+        self._running = True
+        try:
+            EventLoopThread.instance().run(self._open(), CONNECT_TIMEOUT)
+        except Exception as e:
+            self._running = False
+            raise FandangoError(
+                f"Party {self.party_name!r}: cannot connect to {self.ip}:{self.port}: {e}"
+            ) from e
+
+    async def _open(self) -> None:
+        """
+        Helper method; Connects or binds according to the protocol type (TCP/UDP) and endpoint type (Open/Connect).
+        """
+        assert self.connection_mode != ConnectionMode.EXTERNAL
+        assert self.ip is not None and self.port is not None
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET if self.ip_type == IpType.IPV4 else socket.AF_INET6
+        if self.protocol_type == Protocol.TCP:
+            if self.connection_mode == ConnectionMode.OPEN:
+                self._server = await loop.create_server(
+                    lambda: _PartyProtocol(self),
+                    self.ip,
+                    self.port,
+                    family=family,
+                    reuse_address=True,
+                    backlog=1,
+                )
+            else:
+                await loop.create_connection(
+                    lambda: _PartyProtocol(self), self.ip, self.port, family=family
+                )
+        elif self.connection_mode == ConnectionMode.OPEN:
+            await loop.create_datagram_endpoint(
+                lambda: _PartyProtocol(self),
+                local_addr=(self.ip, self.port),
+                family=family,
+            )
+        else:
+            await loop.create_datagram_endpoint(
+                lambda: _PartyProtocol(self),
+                remote_addr=(self.ip, self.port),
+                family=family,
+            )
+
+    def _connection_made(self, transport: asyncio.BaseTransport) -> None:
+        if self._transport is not None or not self._running:
+            # Like the listening socket of `UdpTcpProtocolImplementation`, serve only one connection
+            transport.close()
+            return
+        self._transport = transport
+        self._connected.set()
+
+    def _data_received(self, data: bytes, addr: Any) -> None:
+        if not self._running:
+            return
+        if addr is not None:
+            self.current_remote_addr = addr
+        try:
+            self._party_instance.receive(data, None)
+        except Exception as e:
+            LOGGER.debug(f"Party {self.party_name!r}: {e}")
+            self._running = False
+
+    def _connection_lost(self, transport: asyncio.BaseTransport) -> None:
+        if transport is not self._transport or not self._running:
+            return
+        self._running = False
+        try:
+            self._party_instance.receive(None, None)
+        except Exception as e:
+            LOGGER.debug(f"Party {self.party_name!r}: {e}")
+
+    def stop(self) -> None:
+        """Stops the current party."""
+        self._running = False
+        if self._transport is None and self._server is None:
+            return
+        try:
+            EventLoopThread.instance().run(self._close(), CONNECT_TIMEOUT)
+        except Exception as e:
+            LOGGER.debug(f"Party {self.party_name!r}: cannot close connection: {e}")
+
+    async def _close(self) -> None:
+        """
+        Helper method; Closes the connection after sending all pending data.
+        """
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._connected.clear()
+
+    def send(
+        self, message: DerivationTree | str | bytes, recipient: Optional[str]
+    ) -> None:
+        """
+        Called when Fandango wants to send a message as this party.
+        Returns as soon as the message is scheduled for sending.
+        :param message: The message to send.
+        :param recipient: The recipient of the message. Only present if the grammar specifies a recipient.
+        :raises FandangoError: If the party is not running.
+        """
+        assert self.connection_mode != ConnectionMode.EXTERNAL
+        while not self._connected.wait(SELECT_TIMEOUT):
+            if not self._running:
+                break
+        if not self._running:
+            raise FandangoError(
+                f"Party {self.party_name!r} not running. Invoke start() first."
+            )
+
+        send_data = encode_message(message)
+        transport = self._transport
+        assert transport is not None
+        loop = EventLoopThread.instance()
+        if self.protocol_type == Protocol.TCP:
+            assert isinstance(transport, asyncio.WriteTransport)
+            loop.call_soon(transport.write, send_data)
+        else:
+            assert isinstance(transport, asyncio.DatagramTransport)
+            if self.connection_mode == ConnectionMode.OPEN:
+                if self.current_remote_addr is None:
+                    raise FandangoValueError(
+                        f"Party {self.party_name!r} received no data yet. No address to send to."
+                    )
+                loop.call_soon(transport.sendto, send_data, self.current_remote_addr)
+            else:
+                loop.call_soon(transport.sendto, send_data)
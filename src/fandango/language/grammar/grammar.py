@@ -1,14 +1,14 @@
 import itertools
-import random
 import warnings
 from collections import defaultdict
-from collections.abc import Generator, Iterator, Sequence
+from collections.abc import Generator, Iterable, Iterator, Sequence
 from typing import Any, Optional, cast
 
 from cachetools import LRUCache
 
 import fandango.language.grammar.nodes as nodes
 from fandango.errors import FandangoParseError, FandangoValueError
+from fandango.evolution.profiler import span
 from fandango.io.navigation.coverage.coverage_goal import CoverageGoal
 from fandango.io.navigation.PacketNonTerminal import PacketNonTerminal
 from fandango.language.grammar import FuzzingMode, ParsingMode, closest_match
@@ -17,6 +17,7 @@ from fandango.language.grammar.literal_generator import LiteralGenerator
 from fandango.language.grammar.node_visitors.disambiguator import Disambiguator
 from fandango.language.grammar.node_visitors.node_visitor import NodeVisitor
 from fandango.language.grammar.node_visitors.primer import PrimerVisitor
+from fandango.language.grammar.node_visitors.size_estimator import SizeEstimator
 from fandango.language.grammar.nodes.alternative import Alternative
 from fandango.language.grammar.nodes.char_set import CharSet
 from fandango.language.grammar.nodes.concatenation import Concatenation
@@ -29,7 +30,7 @@ from fandango.language.symbols import NonTerminal, Symbol, Terminal
 from fandango.language.tree import DerivationTree, TreeTuple
 from fandango.language.tree_value import TreeValueType
 from fandango.logger import LOGGER
-from fandango.utils import cache_size
+from fandango.utils import cache_size, compile_expression
 
 KPath = tuple[Symbol, ...]
 
@@ -58,6 +59,21 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
         self._tree_k_path_cache: LRUCache[int, set[tuple[Symbol, ...]]] = LRUCache(
             maxsize=cache_size()
         )
+        # Expected sizes of fuzzed trees, and the maximum number of repetitions they are computed for
+        self._expected_sizes: dict[NonTerminal, float] = {}
+        self._expected_sizes_max_repetitions: Optional[int] = None
+        # Integer IDs of k-paths, for counting them across populations
+        self._k_path_ids: dict[tuple[Symbol, ...], int] = {}
+        # Terminal symbols in the rules of nonterminals, and the ones matching tree terminals
+        self._rule_terminals: dict[NonTerminal, tuple[Terminal, ...]] = {}
+        self._terminal_classes: LRUCache[
+            tuple[NonTerminal, Symbol], tuple[Terminal, ...]
+        ] = LRUCache(maxsize=cache_size())
+        # k-paths of subtrees, by subtree hash, length, and parties to skip
+        self._subtree_k_path_cache: LRUCache[
+            tuple[int, Optional[NonTerminal], int, Optional[frozenset[str]]],
+            frozenset[tuple[Symbol, ...]],
+        ] = LRUCache(maxsize=cache_size())
 
     @property
     def grammar_settings(self) -> Sequence[HasSettings]:
@@ -205,7 +221,9 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
             local_variables[id] = sources_[nonterminal.symbol]
 
         return list(sources_.values()), eval(
-            generator.call, self._global_variables, local_variables
+            compile_expression(generator.call),
+            self._global_variables,
+            local_variables,
         )
 
     def generator_dependencies(
@@ -255,18 +273,35 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
     ) -> DerivationTree:
         if isinstance(start, str):
             start = NonTerminal(start)
+        self.expected_sizes()
         if prefix_node is None:
             root = DerivationTree(start)
         else:
             root = prefix_node
         fuzzed_idx = len(root.children)
-        NonTerminalNode(start, self._grammar_settings).fuzz(
-            root, self, max_nodes=max_nodes
-        )
+        with span("fuzz"):
+            NonTerminalNode(start, self._grammar_settings).fuzz(
+                root, self, max_nodes=max_nodes
+            )
         root = root.children[fuzzed_idx]
         root._parent = None
         return root
 
+    def expected_sizes(self) -> dict[NonTerminal, float]:
+        """
+        Return the expected number of nodes in a tree fuzzed from each nonterminal,
+        if alternatives and numbers of repetitions are chosen uniformly at random;
+        `float("inf")` if unbounded.
+
+        This also sets the `expected_size` of all grammar nodes, which `fuzz()` uses to
+        plan repetitions within its budget of nodes. The sizes are recomputed whenever
+        the rules or the maximum number of repetitions change.
+        """
+        if self._expected_sizes_max_repetitions != nodes.MAX_REPETITIONS:
+            self._expected_sizes = SizeEstimator(self.rules).estimate()
+            self._expected_sizes_max_repetitions = nodes.MAX_REPETITIONS
+        return self._expected_sizes
+
     def update(
         self, grammar: "Grammar | dict[NonTerminal, Node]", prime: bool = True
     ) -> None:
@@ -297,6 +332,10 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
                 del self.generators[symbol]
 
         self._parser = Parser(self.rules)
+        self._expected_sizes_max_repetitions = None
+        self._rule_terminals.clear()
+        self._terminal_classes.clear()
+        self._subtree_k_path_cache.clear()
         self._local_variables.update(local_variables)
         self._global_variables.update(global_variables)
         if prime:
@@ -339,13 +378,14 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
         hookin_parent: Optional[DerivationTree] = None,
         include_controlflow: bool = False,
     ) -> Optional[DerivationTree]:
-        return self._parser.parse(
-            word,
-            start,
-            mode=mode,
-            hookin_parent=hookin_parent,
-            include_controlflow=include_controlflow,
-        )
+        with span("parse"):
+            return self._parser.parse(
+                word,
+                start,
+                mode=mode,
+                hookin_parent=hookin_parent,
+                include_controlflow=include_controlflow,
+            )
 
     def parse_forest(
         self,
@@ -369,6 +409,42 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
             word, start, mode=mode, include_controlflow=include_controlflow
         )
 
+    def stream_element(self, start: str | NonTerminal = "<start>") -> NonTerminal:
+        """
+        Return the symbol whose instances `parse_stream()` yields for `start`:
+        `<element>` if `start` is defined as a repetition `<element>*`, `<element>+`, or `<element>{m,n}`;
+        otherwise, `start` itself.
+        """
+        if isinstance(start, str):
+            start = NonTerminal(start)
+        rule = self.rules.get(start)
+        if (
+            isinstance(rule, Repetition)
+            and not isinstance(rule, Option)
+            and isinstance(rule.node, NonTerminalNode)
+        ):
+            return rule.node.symbol
+        return start
+
+    def parse_stream(
+        self,
+        chunks: Iterable[str | bytes],
+        start: str | NonTerminal = "<start>",
+        include_controlflow: bool = False,
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Parse the concatenation of `chunks`, yielding trees as soon as they are complete.
+        If `start` is a repetition of some `<element>`, yield one tree per `<element>`;
+        otherwise, yield one tree per (consecutive) instance of `start`.
+        Repetition bounds are not checked.
+        See `stream_element()` and `Parser.parse_stream()` for details.
+        """
+        return self._parser.parse_stream(
+            chunks,
+            self.stream_element(start),
+            include_controlflow=include_controlflow,
+        )
+
     def max_position(self) -> int:
         """Return the maximum position reached during last parsing."""
         return self._parser._iter_parser.max_position()
@@ -819,83 +895,30 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
             k_paths = self._tree_k_path_cache[hash_key]
             return k_paths
 
-        start_nodes: list[tuple[Optional[NonTerminal], DerivationTree]] = []
-
-        def collect_start_nodes(tree_root: DerivationTree) -> None:
-            if not isinstance(tree_root.symbol, NonTerminal):
-                return
-            for child in tree_root.children:
-                if coverage_goal == CoverageGoal.INPUTS:
-                    if child.sender is not None and child.sender not in input_parties:
-                        continue
-                start_nodes.append((tree_root.symbol, child))
-                collect_start_nodes(child)
-
-        collect_start_nodes(tree)
-        start_nodes.append((None, tree))
+        # Only descend into children sent by these parties (or no party)
+        senders: Optional[frozenset[str]] = None
+        if coverage_goal == CoverageGoal.STATE_INPUTS:
+            senders = frozenset(input_parties)
 
+        k_paths = set()
         if coverage_goal == CoverageGoal.INPUTS:
-            input_symbol_starters = [
-                (parent, child)
-                for parent, child in start_nodes
-                if isinstance(child.symbol, NonTerminal)
-                and child.sender in input_parties
-            ]
-            start_nodes.clear()
-            for parent, child in input_symbol_starters:
-                collect_start_nodes(child)
-                start_nodes.append((parent, child))
-
-        paths: list[set[tuple[Symbol, ...]]] = [set() for _ in range(k)]
-
-        def traverse(
-            parent_symbol: Optional[NonTerminal],
-            tree_node: DerivationTree,
-            path: tuple[Symbol, ...],
-        ) -> None:
-            tree_symbol = tree_node.symbol
-            assert isinstance(tree_symbol, (Terminal, NonTerminal))
-            if isinstance(tree_symbol, Terminal):
-                if parent_symbol is None:
-                    raise RuntimeError(
-                        "Received a Terminal with no parent symbol when computing k-path!"
-                    )
-                symbol_value: str | bytes | int
-                if tree_symbol.value().is_type(TreeValueType.STRING):
-                    symbol_value = tree_symbol.value().to_string()
-                elif tree_symbol.value().is_type(TreeValueType.BYTES):
-                    symbol_value = tree_symbol.value().to_bytes()
-                else:
-                    symbol_value = tree_symbol.value().to_int()
-
-                parent_rule_nodes = NonTerminalNode(
-                    parent_symbol, self.grammar_settings
-                ).descendents(self, filter_controlflow=True)
-                parent_rule_terminals = [
-                    x for x in parent_rule_nodes if isinstance(x, TerminalNode)
-                ]
-                random.shuffle(parent_rule_terminals)
-                for rule_node in parent_rule_terminals:
-                    if rule_node.symbol.check(symbol_value, False)[0]:
-                        paths[len(path)].add(path + (rule_node.symbol,))
-                return
-            new_path = path + (tree_symbol,)
-            if len(new_path) <= k:
-                paths[len(new_path) - 1].add(new_path)
-                if len(new_path) == k:
-                    return
-            for child in tree_node.children:
-                if coverage_goal == CoverageGoal.STATE_INPUTS:
+            # Only consider subtrees of input messages
+            stack = [tree]
+            while stack:
+                node = stack.pop()
+                if not isinstance(node.symbol, NonTerminal):
+                    continue
+                for child in node.children:
                     if child.sender is not None and child.sender not in input_parties:
                         continue
-                traverse(tree_symbol, child, new_path)
-
-        for parent, node in start_nodes:
-            traverse(parent, node, tuple())
-
-        k_paths = set()
-        for path_set in paths:
-            k_paths.update(path_set)
+                    if isinstance(child.symbol, NonTerminal) and (
+                        child.sender in input_parties
+                    ):
+                        k_paths |= self._subtree_k_paths(node.symbol, child, k, senders)
+                    else:
+                        stack.append(child)
+        else:
+            k_paths |= self._subtree_k_paths(None, tree, k, senders)
 
         if overlap_to_root:
             for path in self._extract_k_paths_from_tree(
@@ -911,6 +934,137 @@ class Grammar(NodeVisitor[list[Node], list[Node]]):
         self._tree_k_path_cache[hash_key] = k_paths
         return k_paths
 
+    def _subtree_k_paths(
+        self,
+        parent_symbol: Optional[NonTerminal],
+        tree: DerivationTree,
+        k: int,
+        senders: Optional[frozenset[str]],
+    ) -> frozenset[tuple[Symbol, ...]]:
+        """
+        Return the k-paths starting at any node of `tree` (whose parent has `parent_symbol`),
+        only descending into children sent by `senders` (if given) or by no party.
+        Results are cached by subtree hash, so equal subtrees across individuals share the work.
+        """
+        key_symbol = None if isinstance(tree.symbol, NonTerminal) else parent_symbol
+        key = (hash(tree), key_symbol, k, senders)
+        k_paths = self._subtree_k_path_cache.get(key)
+        if k_paths is not None:
+            return k_paths
+
+        # Post-order traversal, so the k-paths of all children are cached
+        work: list[tuple[Optional[NonTerminal], DerivationTree, bool]] = [
+            (parent_symbol, tree, False)
+        ]
+        while work:
+            parent, node, children_done = work.pop()
+            if isinstance(node.symbol, NonTerminal):
+                key = (hash(node), None, k, senders)
+            else:
+                key = (hash(node), parent, k, senders)
+            if key in self._subtree_k_path_cache:
+                continue
+            if not children_done and isinstance(node.symbol, NonTerminal):
+                work.append((parent, node, True))
+                work.extend(
+                    (node.symbol, child, False) for child in reversed(node.children)
+                )
+                continue
+            node_paths = set(self._downward_k_paths(parent, node, k, senders))
+            if isinstance(node.symbol, NonTerminal):
+                for child in node.children:
+                    node_paths |= self._subtree_k_path_cache[
+                        (
+                            hash(child),
+                            None
+                            if isinstance(child.symbol, NonTerminal)
+                            else node.symbol,
+                            k,
+                            senders,
+                        )
+                    ]
+            self._subtree_k_path_cache[key] = frozenset(node_paths)
+
+        return self._subtree_k_path_cache[(hash(tree), key_symbol, k, senders)]
+
+    def _downward_k_paths(
+        self,
+        parent_symbol: Optional[NonTerminal],
+        node: DerivationTree,
+        k: int,
+        senders: Optional[frozenset[str]],
+    ) -> list[tuple[Symbol, ...]]:
+        """Return the paths of length up to `k` that start at `node` and lead downwards"""
+        symbol = node.symbol
+        if not isinstance(symbol, NonTerminal):
+            if parent_symbol is None:
+                raise RuntimeError(
+                    "Received a Terminal with no parent symbol when computing k-path!"
+                )
+            return [
+                (terminal,)
+                for terminal in self._matching_rule_terminals(parent_symbol, node)
+            ]
+
+        paths: list[tuple[Symbol, ...]] = [(symbol,)]
+        if k > 1:
+            for child in node.children:
+                if (
+                    senders is not None
+                    and child.sender is not None
+                    and child.sender not in senders
+                ):
+                    continue
+                paths.extend(
+                    (symbol, *path)
+                    for path in self._downward_k_paths(symbol, child, k - 1, senders)
+                )
+        return paths
+
+    def _matching_rule_terminals(
+        self, parent_symbol: NonTerminal, node: DerivationTree
+    ) -> tuple[Terminal, ...]:
+        """Return the terminals in the rule of `parent_symbol` that match the terminal `node`"""
+        key = (parent_symbol, node.symbol)
+        matches = self._terminal_classes.get(key)
+        if matches is not None:
+            return matches
+
+        rule_terminals = self._rule_terminals.get(parent_symbol)
+        if rule_terminals is None:
+            rule_terminals = tuple(
+                rule_node.symbol
+                for rule_node in NonTerminalNode(
+                    parent_symbol, self.grammar_settings
+                ).descendents(self, filter_controlflow=True)
+                if isinstance(rule_node, TerminalNode)
+            )
+            self._rule_terminals[parent_symbol] = rule_terminals
+
+        tree_value = node.symbol.value()
+        symbol_value: str | bytes | int
+        if tree_value.is_type(TreeValueType.STRING):
+            symbol_value = tree_value.to_string()
+        elif tree_value.is_type(TreeValueType.BYTES):
+            symbol_value = tree_value.to_bytes()
+        else:
+            symbol_value = tree_value.to_int()
+        matches = tuple(
+            terminal
+            for terminal in rule_terminals
+            if terminal.check(symbol_value, False)[0]
+        )
+        self._terminal_classes[key] = matches
+        return matches
+
+    def intern_k_paths(self, k_paths: Iterable[tuple[Symbol, ...]]) -> list[int]:
+        """
+        Return an integer ID for each of the given k-paths.
+        Equal k-paths get the same ID; IDs are allocated consecutively from 0.
+        """
+        ids = self._k_path_ids
+        return [ids.setdefault(path, len(ids)) for path in k_paths]
+
     def prime(self) -> None:
         LOGGER.debug("Priming grammar")
         primer = PrimerVisitor(self.rules)
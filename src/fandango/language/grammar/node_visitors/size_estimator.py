@@ -0,0 +1,96 @@
+from fandango.language.grammar.node_visitors.node_visitor import NodeVisitor
+from fandango.language.grammar.nodes.alternative import Alternative
+from fandango.language.grammar.nodes.char_set import CharSet
+from fandango.language.grammar.nodes.concatenation import Concatenation
+from fandango.language.grammar.nodes.node import Node
+from fandango.language.grammar.nodes.non_terminal import NonTerminalNode
+from fandango.language.grammar.nodes.repetition import Option, Plus, Repetition, Star
+from fandango.language.grammar.nodes.terminal import TerminalNode
+from fandango.language.symbols.non_terminal import NonTerminal
+
+# Rules whose expected size exceeds this are considered unbounded
+MAX_EXPECTED_SIZE = 1e6
+# Iterate until the expected sizes change by less than this fraction ...
+TOLERANCE = 1e-3
+# ... but at most this many times; rules that still grow are considered unbounded
+MAX_ITERATIONS = 100
+
+
+class SizeEstimator(NodeVisitor[float, float]):
+    """
+    Computes the `expected_size` of every node reachable from a set of grammar rules:
+    the expected number of derivation tree nodes that fuzzing the node creates,
+    if alternatives and numbers of repetitions are chosen uniformly at random.
+
+    Nodes whose expected size is unbounded (because the grammar recurses faster
+    than it terminates) get an expected size of `float("inf")`.
+    """
+
+    def __init__(self, rules: dict[NonTerminal, Node]):
+        self._rules = rules
+        self._rule_sizes: dict[NonTerminal, float] = {}
+
+    def estimate(self) -> dict[NonTerminal, float]:
+        """
+        Set the `expected_size` attribute of every node reachable from the rules.
+
+        :return: The expected size of a subtree derived from each rule's nonterminal.
+        """
+        self._rule_sizes = dict.fromkeys(self._rules, 0.0)
+        iterations = 0
+        while True:
+            changed = set()
+            for symbol, rule in self._rules.items():
+                size = self.visit(rule)
+                if size > MAX_EXPECTED_SIZE:
+                    size = float("inf")
+                previous = self._rule_sizes[symbol]
+                if size != previous and (
+                    size == float("inf") or size - previous > TOLERANCE * max(1.0, size)
+                ):
+                    changed.add(symbol)
+                self._rule_sizes[symbol] = size
+            if not changed:
+                break
+            iterations += 1
+            if iterations >= MAX_ITERATIONS:
+                # Rules that still grow are unbounded; the next passes propagate this
+                for symbol in changed:
+                    self._rule_sizes[symbol] = float("inf")
+
+        return {symbol: 1 + rule_size for symbol, rule_size in self._rule_sizes.items()}
+
+    def visit(self, node: Node) -> float:
+        size = super().visit(node)
+        node.expected_size = size
+        return size
+
+    def visitAlternative(self, node: Alternative) -> float:
+        return sum(self.visit(child) for child in node.children()) / len(node)
+
+    def visitConcatenation(self, node: Concatenation) -> float:
+        return sum(self.visit(child) for child in node.children())
+
+    def visitRepetition(self, node: Repetition) -> float:
+        child_size = self.visit(node.node)
+        if child_size == 0:
+            return 0.0
+        return (node.min + node.max) / 2 * child_size
+
+    def visitStar(self, node: Star) -> float:
+        return self.visitRepetition(node)
+
+    def visitPlus(self, node: Plus) -> float:
+        return self.visitRepetition(node)
+
+    def visitOption(self, node: Option) -> float:
+        return self.visitRepetition(node)
+
+    def visitNonTerminalNode(self, node: NonTerminalNode) -> float:
+        return 1 + self._rule_sizes.get(node.symbol, 0.0)
+
+    def visitTerminalNode(self, node: TerminalNode) -> float:
+        return 1.0
+
+    def visitCharSet(self, node: CharSet) -> float:
+        return 1.0
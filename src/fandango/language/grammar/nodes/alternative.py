@@ -40,7 +40,7 @@ class Alternative(Node):
         grammar: "fandango.language.grammar.grammar.Grammar",
         max_nodes: int = 100,
         in_message: bool = False,
-    ) -> None:
+    ) -> int:
         in_range_nodes: Sequence[Node] = list(
             filter(lambda x: x.distance_to_completion < max_nodes, self.alternatives)
         )
@@ -72,7 +72,9 @@ class Alternative(Node):
                     )
                 in_range_nodes = concats
 
-        random.choice(in_range_nodes).fuzz(parent, grammar, max_nodes, in_message)
+        return random.choice(in_range_nodes).fuzz(
+            parent, grammar, max_nodes, in_message
+        )
 
     def accept(
         self,
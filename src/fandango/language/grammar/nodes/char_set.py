@@ -26,7 +26,7 @@ class CharSet(Node):
         grammar: "fandango.language.grammar.grammar.Grammar",
         max_nodes: int = 100,
         in_message: bool = False,
-    ) -> None:
+    ) -> int:
         raise NotImplementedError("CharSet fuzzing not implemented")
 
     def accept(
@@ -31,22 +31,23 @@ class Concatenation(Node):
         grammar: "fandango.language.grammar.grammar.Grammar",
         max_nodes: int = 100,
         in_message: bool = False,
-    ) -> None:
-        prev_parent_size = parent.size()
+    ) -> int:
+        added = 0
         for node in self.nodes:
             if node.distance_to_completion >= max_nodes:
-                node.fuzz(parent, grammar, 0, in_message)
+                count = node.fuzz(parent, grammar, 0, in_message)
             else:
                 reserved_distance = self.distance_to_completion
                 for dist_node in self.nodes:
                     reserved_distance -= dist_node.distance_to_completion
                     if dist_node == node:
                         break
-                node.fuzz(
+                count = node.fuzz(
                     parent, grammar, int(max_nodes - reserved_distance), in_message
                 )
-            max_nodes -= parent.size() - prev_parent_size
-            prev_parent_size = parent.size()
+            max_nodes -= count
+            added += count
+        return added
 
     def accept(
         self,
@@ -43,6 +43,8 @@ class Node(abc.ABC):
         self._grammar_settings = grammar_settings
         self._node_type = node_type
         self.distance_to_completion = distance_to_completion
+        # Expected number of tree nodes created by `fuzz()`; set by `Grammar.fuzz()`, 0 if unknown
+        self.expected_size = 0.0
         self._settings = NodeSettings({})
         for setting in grammar_settings:
             self._settings.update(setting.settings_for(self))
@@ -92,8 +94,17 @@ class Node(abc.ABC):
         grammar: "fandango.language.grammar.grammar.Grammar",
         max_nodes: int = 100,
         in_message: bool = False,
-    ) -> None:
-        return
+    ) -> int:
+        """
+        Fuzz a subtree for this node and append it to the children of `parent`.
+
+        :param parent: The tree to append the fuzzed subtree to.
+        :param grammar: The grammar to fuzz from.
+        :param max_nodes: The budget of tree nodes to create.
+        :param in_message: Whether the subtree is part of a message.
+        :return: The number of tree nodes appended to `parent`, including all descendants.
+        """
+        return 0
 
     @abc.abstractmethod
     def accept(
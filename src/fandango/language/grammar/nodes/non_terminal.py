@@ -35,7 +35,7 @@ class NonTerminalNode(Node):
         grammar: "fandango.language.grammar.grammar.Grammar",
         max_nodes: int = 100,
         in_message: bool = False,
-    ) -> None:
+    ) -> int:
         if self.symbol not in grammar:
             raise FandangoValueError(f"Symbol {self.symbol} not found in grammar")
 
@@ -71,7 +71,7 @@ class NonTerminalNode(Node):
             generated.recipient = self.recipient
             parent.set_children(parent.children[:-1])
             parent.add_child(generated)
-            return
+            return generated.size()
         parent.set_children(parent.children[:-1])
 
         assign_sender = None
@@ -89,7 +89,9 @@ class NonTerminalNode(Node):
             read_only=False,
         )
         parent.add_child(current_tree)
-        grammar[self.symbol].fuzz(current_tree, grammar, max_nodes - 1, in_message)
+        return 1 + grammar[self.symbol].fuzz(
+            current_tree, grammar, max_nodes - 1, in_message
+        )
 
     def accept(
         self,
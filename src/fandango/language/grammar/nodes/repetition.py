@@ -76,8 +76,8 @@ class Repetition(Node):
         override_current_iteration: Optional[int] = None,
         override_starting_repetition: int = 0,
         override_iterations_to_perform: Optional[int] = None,
-    ) -> None:
-        prev_parent_size = parent.size()
+    ) -> int:
+        added = 0
         prev_children_len = len(parent.children)
         if override_current_iteration is None:
             self.iteration += 1
@@ -88,6 +88,11 @@ class Repetition(Node):
         rep_goal = random.randint(self.min, self.max)
         if override_iterations_to_perform is not None:
             rep_goal = override_iterations_to_perform - override_starting_repetition
+        elif rep_goal > self.min and 0 < self.node.expected_size < float("inf"):
+            # Do not plan more repetitions than fit into the budget on average
+            rep_goal = max(
+                self.min, min(rep_goal, int(max_nodes / self.node.expected_size))
+            )
 
         reserved_max_nodes = self.distance_to_completion
 
@@ -96,19 +101,21 @@ class Repetition(Node):
             if self.node.distance_to_completion >= max_nodes:
                 if rep >= self.min and override_iterations_to_perform is None:
                     break
-                self.node.fuzz(parent, grammar, 0, in_message)
+                count = self.node.fuzz(parent, grammar, 0, in_message)
             else:
                 reserved_max_nodes -= self.node.distance_to_completion
-                self.node.fuzz(
+                count = self.node.fuzz(
                     parent, grammar, int(max_nodes - reserved_max_nodes), in_message
                 )
             for child in parent.children[prev_children_len:]:
-                child.origin_repetitions.insert(
-                    0, (self.id, current_iteration, current_rep)
-                )
-            max_nodes -= parent.size() - prev_parent_size
-            prev_parent_size = parent.size()
+                child.origin_repetitions = [
+                    (self.id, current_iteration, current_rep),
+                    *child.origin_repetitions,
+                ]
+            max_nodes -= count
+            added += count
             prev_children_len = len(parent.children)
+        return added
 
     def format_as_spec(self) -> str:
         if self.min == self.max:
@@ -191,10 +198,10 @@ class Plus(Repetition):
         override_current_iteration: Optional[int] = None,
         override_starting_repetition: int = 0,
         override_iterations_to_perform: Optional[int] = None,
-    ) -> None:
+    ) -> int:
         # Gmutator mutation (1b)
         if random.random() < self.settings.get("plus_should_return_nothing"):
-            return  # nop, don't add a node
+            return 0  # nop, don't add a node
         else:
             return super().fuzz(
                 parent,
@@ -239,7 +246,7 @@ class Option(Repetition):
         override_current_iteration: Optional[int] = None,
         override_starting_repetition: int = 0,
         override_iterations_to_perform: Optional[int] = None,
-    ) -> None:
+    ) -> int:
         # Gmutator mutation (1c)
         should_return_multiple = random.random() < self.settings.get(
             "option_should_return_multiple"
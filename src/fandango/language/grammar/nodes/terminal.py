@@ -38,13 +38,13 @@ class TerminalNode(Node):
         grammar: "fandango.language.grammar.grammar.Grammar",
         max_nodes: int = 100,
         in_message: bool = False,
-    ) -> None:
+    ) -> int:
         repetitions = 1
         # Gmutator mutation (1a)
         if random.random() < self.settings.get("terminal_should_repeat"):
             if random.random() < 0.5:
                 repetitions = 0
-                return  # nop, don't add a node
+                return 0  # nop, don't add a node
             else:
                 repetitions = nodes.MAX_REPETITIONS
         for _ in range(repetitions):
@@ -82,6 +82,7 @@ class TerminalNode(Node):
                         f"Unsupported type: {self.symbol.value().type_}"
                     )
                 parent.add_child(DerivationTree(Terminal(instance)))
+        return repetitions
 
     def accept(
         self,
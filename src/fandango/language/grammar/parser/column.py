@@ -6,12 +6,18 @@ from fandango.language.symbols.symbol import Symbol
 
 
 class Column:
+    """
+    The parse states at one position of the Earley table, in insertion order.
+    States can be added while iterating over the column.
+    """
+
     def __init__(self, states: Optional[list[ParseState]] = None):
-        self.states: list[ParseState] = states or []
+        self.states: list[ParseState] = []
+        # Maps each state to its index in `states`
+        self.unique: dict[ParseState, int] = {}
         self.dot_map = dict[Symbol, list[ParseState]]()
-        self.unique = set(self.states)
-        for state in self.states:
-            self.dot_map[state.nonterminal].append(state)
+        for state in states or []:
+            self.add(state)
 
     def __iter__(self) -> Iterator[ParseState]:
         yield from self.states
@@ -25,8 +31,10 @@ class Column:
     def remove(self, state: ParseState) -> Optional[bool]:
         if state not in self.unique:
             return False
-        self.unique.remove(state)
-        self.states.remove(state)
+        index = self.unique.pop(state)
+        del self.states[index]
+        for i in range(index, len(self.states)):
+            self.unique[self.states[i]] = i
         symbol = state.dot
         assert symbol is not None
         default_list: list[ParseState] = []
@@ -34,11 +42,10 @@ class Column:
         return None
 
     def replace(self, old: ParseState, new: ParseState) -> None:
-        self.unique.remove(old)
-        self.unique.add(new)
-        i_old = self.states.index(old)
-        del self.states[i_old]
-        self.states.insert(i_old, new)
+        """Replace `old` by `new`, keeping its position in the column."""
+        index = self.unique.pop(old)
+        self.states[index] = new
+        self.unique.setdefault(new, index)
 
         old_symbol = old.dot
         if old_symbol is not None:
@@ -60,8 +67,8 @@ class Column:
 
     def add(self, state: ParseState) -> bool:
         if state not in self.unique:
+            self.unique[state] = len(self.states)
             self.states.append(state)
-            self.unique.add(state)
             symbol = state.dot
             if symbol is not None:
                 state_list = self.dot_map.get(symbol, [])
@@ -24,6 +24,13 @@ from fandango.language.tree_value import TreeValue, TreeValueType
 
 IterativeParserVisitorReturnType = list[list[ParserStateSymbolContent]]
 
+# For each rule alternative, the characters (code points or byte values) it can start with;
+# `None` if unknown, or if the alternative can derive the empty string.
+FirstSets = dict[
+    NonTerminal,
+    list[tuple[tuple[ParserStateSymbolContent, ...], Optional[frozenset[int]]]],
+]
+
 
 class IterativeParser(
     NodeVisitor[
@@ -45,6 +52,11 @@ class IterativeParser(
         self._tmp_rules: dict[NonTerminal, set[ParserStateSymbolContent]] = {}
         self._incomplete: set[DerivationTree] = set()
         self._nodes: dict[str, Node] = {}
+        self._first_sets: dict[bool, FirstSets] = {}
+        # Maps id(rule) to the rule and the hash of (nonterminal, rule) for new parse states
+        self._rule_hashes: dict[int, tuple[tuple[Any, ...], int]] = {}
+        # Maps nonterminals to whether they start a repetition
+        self._repetition_starts: dict[NonTerminal, bool] = {}
         self._max_position = -1
         self.elapsed_time: float = 0.0
         self._process()
@@ -56,11 +68,18 @@ class IterativeParser(
         self._first_consume = True
         self._hookin_parent: Optional[DerivationTree] = None
         self._prefix_word = None
+        # Number of table columns per input byte: 8 if bits may be parsed, 1 otherwise
+        self._columns_per_byte = 8
+        self._uses_bits: dict[NonTerminal, bool] = {}
+        # The next input character, if predictions can be filtered by it
+        self._lookahead: Optional[int] = None
+        self._lookahead_is_bytes = False
 
     def _process(self) -> None:
         self._rules.clear()
         self._implicit_rules.clear()
         self._context_rules.clear()
+        self._first_sets.clear()
         for nonterminal in self.grammar_rules:
             self.set_rule(nonterminal, self.visit(self.grammar_rules[nonterminal]))
 
@@ -103,6 +122,136 @@ class IterativeParser(
     def _clear_tmp(self) -> None:
         self._tmp_rules.clear()
 
+    def first_sets(self, word_is_bytes: bool) -> FirstSets:
+        """
+        Return the FIRST sets of all rule alternatives (including implicit ones).
+        The sets are computed on first use and cached.
+        :param word_is_bytes: If True, compute the sets for parsing bytes; otherwise, for parsing strings
+        """
+        if word_is_bytes in self._first_sets:
+            return self._first_sets[word_is_bytes]
+
+        # Same precedence as in `predict()`
+        rules = {**self._implicit_rules, **self._rules}
+        first: dict[NonTerminal, Optional[set[int]]] = {nt: set() for nt in rules}
+        nullable: dict[NonTerminal, bool] = {nt: False for nt in rules}
+
+        def sequence_first(
+            rule: tuple[ParserStateSymbolContent, ...],
+        ) -> tuple[Optional[set[int]], bool]:
+            result: set[int] = set()
+            for symbol, _params in rule:
+                symbol_first: Optional[set[int] | frozenset[int]]
+                if isinstance(symbol, NonTerminal):
+                    if symbol not in rules:
+                        # Context or temporary rule
+                        return None, False
+                    symbol_first = first[symbol]
+                    symbol_nullable = nullable[symbol]
+                elif isinstance(symbol, Terminal):
+                    if symbol.is_type(TreeValueType.TRAILING_BITS_ONLY):
+                        return None, False
+                    if not symbol.is_regex and len(symbol) == 0:
+                        continue
+                    symbol_first = symbol.first_chars(
+                        word_is_bytes and symbol.is_type(TreeValueType.BYTES)
+                    )
+                    symbol_nullable = False
+                else:
+                    return None, False
+                if symbol_first is None:
+                    return None, False
+                result |= symbol_first
+                if not symbol_nullable:
+                    return result, False
+            return result, True
+
+        changed = True
+        while changed:
+            changed = False
+            for nt, alternatives in rules.items():
+                for rule in alternatives:
+                    rule_first, rule_nullable = sequence_first(rule)  # type: ignore[arg-type] # see predict()
+                    if rule_nullable and not nullable[nt]:
+                        nullable[nt] = True
+                        changed = True
+                    nt_first = first[nt]
+                    if nt_first is None:
+                        continue
+                    if rule_first is None:
+                        first[nt] = None
+                        changed = True
+                    elif not rule_first <= nt_first:
+                        nt_first |= rule_first
+                        changed = True
+
+        first_sets: FirstSets = {}
+        for nt, alternatives in rules.items():
+            first_sets[nt] = []
+            for rule in alternatives:
+                rule_first, rule_nullable = sequence_first(rule)  # type: ignore[arg-type] # see predict()
+                first_sets[nt].append(
+                    (
+                        rule,  # type: ignore[arg-type] # see predict()
+                        None
+                        if rule_first is None or rule_nullable
+                        else frozenset(rule_first),
+                    )
+                )
+        self._first_sets[word_is_bytes] = first_sets
+        return first_sets
+
+    def predicted_rules(
+        self, symbol: NonTerminal
+    ) -> list[tuple[ParserStateSymbolContent, ...]]:
+        """
+        Return the alternatives of `symbol` to predict.
+        If the next input character is known, leave out alternatives that cannot start with it.
+        """
+        lookahead = self._lookahead
+        if lookahead is None:
+            rules = (
+                self._rules[symbol]
+                if symbol in self._rules
+                else self._implicit_rules[symbol]
+            )
+            return list(rules)  # type: ignore[arg-type] # see predict()
+        return [
+            rule
+            for rule, first in self.first_sets(self._lookahead_is_bytes)[symbol]
+            if first is None or lookahead in first
+        ]
+
+    def uses_bits(self, start: NonTerminal) -> bool:
+        """
+        Return True if parsing `start` may involve bit terminals.
+        Only then does the parse table need one column per bit;
+        otherwise, one column per byte suffices.
+        """
+        if start not in self._uses_bits:
+            if start not in self.grammar_rules:
+                # Cannot tell; be on the safe side
+                self._uses_bits[start] = True
+                return True
+
+            seen: set[int] = set()
+            stack: list[Node] = [self.grammar_rules[start]]
+            uses_bits = False
+            while stack and not uses_bits:
+                node = stack.pop()
+                if id(node) in seen:
+                    continue
+                seen.add(id(node))
+                if isinstance(node, TerminalNode):
+                    uses_bits = node.symbol.is_type(TreeValueType.TRAILING_BITS_ONLY)
+                elif isinstance(node, NonTerminalNode):
+                    if node.symbol in self.grammar_rules:
+                        stack.append(self.grammar_rules[node.symbol])
+                else:
+                    stack.extend(node.children())
+            self._uses_bits[start] = uses_bits
+        return self._uses_bits[start]
+
     def default_result(self) -> IterativeParserVisitorReturnType:
         return []
 
@@ -279,6 +428,32 @@ class IterativeParser(
             )
         )
 
+    def longest_match(self) -> tuple[int, list[DerivationTree]]:
+        """
+        Return the length (in bytes or characters) of the longest non-empty prefix
+        of the input consumed so far that parses as the start symbol,
+        together with its parse trees; or `(-1, [])` if there is no such prefix.
+        """
+        table: list[Column] = list(self._table)
+        last_idx = len(table) - 1
+        table[last_idx] = deepcopy(table[last_idx])
+        for state in table[last_idx]:
+            if state.finished():
+                self.complete(state, table, last_idx)
+
+        for k in range(last_idx, 0, -1):
+            if k % self._columns_per_byte != 0:
+                continue
+            trees = [
+                self.to_derivation_tree(child)
+                for state in table[k]
+                if state.finished() and state.nonterminal == self.implicit_start
+                for child in state.children
+            ]
+            if trees:
+                return k // self._columns_per_byte, trees
+        return -1, []
+
     def predict(
         self,
         state: ParseState,
@@ -289,15 +464,13 @@ class IterativeParser(
         symbol = state.dot
         assert symbol is not None
         assert isinstance(symbol, NonTerminal)
-        if state.dot in self._rules:
-            table[k].update(
-                {ParseState(symbol, k, rule, 0) for rule in self._rules[symbol]}  # type: ignore[arg-type] # TODO:  this is a bug!
-            )
-        elif state.dot in self._implicit_rules:
+        if state.dot in self._rules or state.dot in self._implicit_rules:
             table[k].update(
                 {
-                    ParseState(symbol, k, rule, 0)  # type: ignore[arg-type] # TODO:  this is a bug!
-                    for rule in self._implicit_rules[symbol]
+                    ParseState(
+                        symbol, k, rule, 0, rule_hash=self._rule_hash(symbol, rule)
+                    )
+                    for rule in self.predicted_rules(symbol)
                 }
             )
         elif state.dot in self._tmp_rules:
@@ -308,6 +481,17 @@ class IterativeParser(
             node, nt = self._context_rules[symbol]
             self.predict_ctx_rule(state, table, k, node, nt, hookin_parent)
 
+    def _rule_hash(
+        self, nonterminal: NonTerminal, rule: tuple[ParserStateSymbolContent, ...]
+    ) -> int:
+        """Return the hash of `(nonterminal, rule)`, computing it only once per rule."""
+        entry = self._rule_hashes.get(id(rule))
+        # The entry keeps `rule` alive, so its id cannot be reused for another rule
+        if entry is None or entry[0] is not rule:
+            entry = (rule, hash((nonterminal, rule)))
+            self._rule_hashes[id(rule)] = entry
+        return entry[1]
+
     def current_tree(self) -> Optional[DerivationTree]:
         if len(self._table[self._table_idx]) == 0:
             return None
@@ -320,7 +504,7 @@ class IterativeParser(
     def construct_incomplete_tree(
         self, state: ParseState, table: list[Column]
     ) -> DerivationTree:
-        current_tree = ParserDerivationTree(state.nonterminal, state.children)
+        current_tree = ParserDerivationTree(state.nonterminal, list(state.children))
         current_state = state
         found_next_state = True
         while found_next_state:
@@ -393,6 +577,18 @@ class IterativeParser(
             table[k].replace(state, new_state)
         self.predict(new_state, table, k)
 
+    @staticmethod
+    def _with_scanned(
+        state: ParseState, tree: DerivationTree
+    ) -> tuple[DerivationTree, ...]:
+        """
+        Return the children of `state` after scanning `tree`.
+        If `state` holds an incomplete match, `tree` replaces it.
+        """
+        if state.is_incomplete:
+            return (*state.children[:-1], tree)
+        return (*state.children, tree)
+
     def scan_bit(
         self,
         state: ParseState,
@@ -429,9 +625,8 @@ class IterativeParser(
 
         # Found a match
         # LOGGER.debug(f"Found bit {bit}")
-        next_state = state.next()
         tree = ParserDerivationTree(Terminal(bit))
-        next_state.append_child(tree)
+        next_state = state.next(tree)
         # LOGGER.debug(f"Added tree {tree.to_string()!r} to state {next_state!r}")
         # Insert a new table entry with next state
         # This is necessary, as our initial table holds one entry
@@ -474,7 +669,16 @@ class IterativeParser(
 
         # LOGGER.debug(f"Checking byte(s) {state.dot!r} at position {w:#06x} ({w}) {word[w:]!r}")
 
-        check_word = word[w:]
+        if not state.is_incomplete and not state.dot.can_start_with(word, w):
+            return False
+
+        if state.dot.is_type(TreeValueType.BYTES):
+            dot_len = len(bytes(state.dot.value()))
+        else:
+            dot_len = len(str(state.dot.value()))
+
+        # No need to look further than the terminal is long
+        check_word = word[w : w + dot_len]
         if state.is_incomplete:
             prev_terminal = state.children[-1]
             prev_val = prev_terminal.symbol.value()
@@ -487,13 +691,8 @@ class IterativeParser(
             else:
                 prev_val_raw = str(prev_val)
                 check_word = str(TreeValue(prev_val_raw).append(TreeValue(check_word)))
-        if state.dot.is_type(TreeValueType.BYTES):
-            dot_len = len(bytes(state.dot.value()))
-        else:
-            dot_len = len(str(state.dot.value()))
-
         match, match_length = state.dot.check(check_word)
-        table_idx_multiplier = 8
+        table_idx_multiplier = self._columns_per_byte
 
         if not match:
             if (w + dot_len - state.incomplete_idx) < len(word):
@@ -502,23 +701,20 @@ class IterativeParser(
             if not match or match_length == 0:
                 return False
 
-            next_state = state.copy()
-            next_state.incomplete_idx = match_length
-            next_state.is_incomplete = True
             tree = ParserDerivationTree(Terminal(check_word[:match_length]))
-            if state.is_incomplete:
-                next_state.children[-1] = tree
-            else:
-                next_state.append_child(tree)
+            next_state = state.copy(
+                children=self._with_scanned(state, tree),
+                is_incomplete=True,
+                incomplete_idx=match_length,
+            )
         else:
-            next_state = state.next()
-            next_state.is_incomplete = False
-            next_state.incomplete_idx = 0
             tree = ParserDerivationTree(Terminal(check_word[:match_length]))
-            if state.is_incomplete:
-                next_state.children[-1] = tree
-            else:
-                next_state.append_child(tree)
+            next_state = state.copy(
+                dot=state._dot + 1,
+                children=self._with_scanned(state, tree),
+                is_incomplete=False,
+                incomplete_idx=0,
+            )
         table[k + ((match_length - state.incomplete_idx) * table_idx_multiplier)].add(
             next_state
         )
@@ -552,6 +748,9 @@ class IterativeParser(
         )
         assert state.dot.is_regex
 
+        if not state.is_incomplete and not state.dot.can_start_with(word, w):
+            return False
+
         check_word = word[w:]
         prev_match_length = 0
         if state.is_incomplete:
@@ -568,7 +767,7 @@ class IterativeParser(
                 check_word = str(TreeValue(prev_val_raw).append(TreeValue(check_word)))
             prev_match_length = len(prev_val_raw)
 
-        table_idx_multiplier = 8
+        table_idx_multiplier = self._columns_per_byte
         match, match_length = state.dot.check(check_word)
         table_offset = match_length
         if match and match_length <= prev_match_length:
@@ -583,26 +782,23 @@ class IterativeParser(
                 return False
 
         if match:
-            next_state = state.next()
-            next_state.is_incomplete = False
-            next_state.incomplete_idx = 0
             tree = ParserDerivationTree(Terminal(check_word[:match_length]))
-            if state.is_incomplete:
-                next_state.children[-1] = tree
-            else:
-                next_state.append_child(tree)
+            next_state = state.copy(
+                dot=state._dot + 1,
+                children=self._with_scanned(state, tree),
+                is_incomplete=False,
+                incomplete_idx=0,
+            )
             table[
                 k + ((table_offset - state.incomplete_idx) * table_idx_multiplier)
             ].add(next_state)
         if incomplete_match:
-            next_state = state.copy()
-            next_state.is_incomplete = True
-            next_state.incomplete_idx = incomplete_match_length
             tree = ParserDerivationTree(Terminal(check_word[:incomplete_match_length]))
-            if state.is_incomplete:
-                next_state.children[-1] = tree
-            else:
-                next_state.append_child(tree)
+            next_state = state.copy(
+                children=self._with_scanned(state, tree),
+                is_incomplete=True,
+                incomplete_idx=incomplete_match_length,
+            )
             table[
                 k
                 + (
@@ -673,39 +869,46 @@ class IterativeParser(
     ) -> None:
         for s in table[state.position].find_dot(state.nonterminal):
             dot_params = dict(s.dot_params or [])
-            s = s.next()
             if state.nonterminal in self._rules:
-                s.append_child(
+                s = s.next(
                     ParserDerivationTree(
-                        state.nonterminal, state.children, **dot_params
+                        state.nonterminal, list(state.children), **dot_params
                     )
                 )
             else:
                 if use_implicit and state.nonterminal in self._implicit_rules:
-                    s.append_child(
-                        ParserDerivationTree(
-                            NonTerminal(state.nonterminal.name()),
-                            state.children,
-                            **dict(s.dot_params or []),
+                    s = s.next()
+                    s = s.copy(
+                        children=(
+                            *s.children,
+                            ParserDerivationTree(
+                                NonTerminal(state.nonterminal.name()),
+                                list(state.children),
+                                **dict(s.dot_params or []),
+                            ),
                         )
                     )
                 else:
-                    s.extend_children(state.children)
+                    s = s.next(*state.children)
             table[k].add(s)
 
+    def _is_repetition_start(self, nonterminal: NonTerminal) -> bool:
+        """Return True if `nonterminal` starts a `+` or `*` repetition."""
+        is_start = self._repetition_starts.get(nonterminal)
+        if is_start is None:
+            is_start = nonterminal.name().startswith(
+                (f"<__{NodeType.PLUS}:", f"<__{NodeType.STAR}:")
+            )
+            self._repetition_starts[nonterminal] = is_start
+        return is_start
+
     def place_repetition_shortcut(self, table: list[Column], k: int) -> None:
         col = table[k]
         states = col.states
-        beginner_nts = [f"<__{NodeType.PLUS}:", f"<__{NodeType.STAR}:"]
 
         found_beginners = set()
         for state in states:
-            if any(
-                map(
-                    lambda b: str(state.nonterminal.value()).startswith(b),
-                    beginner_nts,
-                )
-            ):
+            if self._is_repetition_start(state.nonterminal):
                 found_beginners.add(state.symbols[0][0])
 
         for beginner in found_beginners:
@@ -726,19 +929,14 @@ class IterativeParser(
             if len(origin_states) != 1:
                 continue
             origin_state = origin_states[0]
-            while not any(
-                map(
-                    lambda b: str(origin_state.nonterminal.value()).startswith(b),
-                    beginner_nts,
-                )
-            ):
+            while not self._is_repetition_start(origin_state.nonterminal):
                 assert new_state is not None
                 new_state = ParseState(
                     new_state.nonterminal,
                     origin_state.position,
                     new_state.symbols,
                     new_state._dot,
-                    [*origin_state.children, *new_state.children],
+                    (*origin_state.children, *new_state.children),
                     new_state.is_incomplete,
                 )
                 origin_states = table[new_state.position].find_dot(new_state.dot)
@@ -760,7 +958,12 @@ class IterativeParser(
         if isinstance(start, str):
             start = NonTerminal(start)
         self._start = start
-        self._table_idx = (7 - starter_bit) % 8
+        if starter_bit >= 0 or self.uses_bits(start):
+            self._columns_per_byte = 8
+            self._table_idx = (7 - starter_bit) % 8
+        else:
+            self._columns_per_byte = 1
+            self._table_idx = 0
         self._table = []
         self._table.append(Column())
         self._first_consume = True
@@ -786,7 +989,7 @@ class IterativeParser(
 
         # If >= 0, indicates the next bit to be scanned (7-0)
         table = list(self._table)
-        table.extend([Column() for _ in range(len(char) * 8)])
+        table.extend([Column() for _ in range(len(char) * self._columns_per_byte)])
         # Add the start state at the first consume
         if self._first_consume:
             table[self._table_idx].add(
@@ -806,6 +1009,14 @@ class IterativeParser(
             # True iff we have processed all characters
             # (or some bits of the last character)
             at_end = curr_word_idx >= len(word)
+            if self._columns_per_byte == 1 and not at_end:
+                # Filter predictions by the next character.
+                # At the end, more input may follow in the next `consume()`.
+                char = word[curr_word_idx]
+                self._lookahead = char if isinstance(char, int) else ord(char)
+                self._lookahead_is_bytes = isinstance(word, bytes)
+            else:
+                self._lookahead = None
             for state in table[curr_table_idx]:
                 if state.finished():
                     if state.nonterminal == self.implicit_start:
@@ -862,7 +1073,7 @@ class IterativeParser(
 
             self.place_repetition_shortcut(table, curr_table_idx)
             curr_table_idx += 1
-            if curr_table_idx % 8 == 0:
+            if curr_table_idx % self._columns_per_byte == 0:
                 curr_word_idx += 1
 
     def max_position(self) -> int:
@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from typing import Any, Optional
 
 from fandango.language.symbols import NonTerminal, Symbol
@@ -7,37 +8,65 @@ ParserStateSymbolContent = tuple[Symbol, frozenset[tuple[str, Any]]]
 
 
 class ParseState:
+    """
+    An Earley item: a rule `nonterminal -> symbols` started at column `position`,
+    with the dot before `symbols[dot]` and the trees derived so far in `children`.
+
+    Parse states are immutable; their hash is computed on construction.
+    Use `next()` and `copy()` to derive new states.
+    """
+
+    __slots__ = (
+        "_nonterminal",
+        "_position",
+        "_symbols",
+        "_dot",
+        "_children",
+        "_is_incomplete",
+        "_incomplete_idx",
+        "_rule_hash",
+        "_hash",
+    )
+
     def __init__(
         self,
         nonterminal: NonTerminal,
         position: int,
         symbols: tuple[ParserStateSymbolContent, ...],
         dot: int = 0,
-        children: Optional[list[DerivationTree]] = None,
+        children: Sequence[DerivationTree] = (),
         is_incomplete: bool = False,
         incomplete_idx: int = 0,
+        rule_hash: Optional[int] = None,
     ):
+        """
+        :param nonterminal: The nonterminal being derived.
+        :param position: The column this state was predicted in.
+        :param symbols: The symbols (and their parameters) of the rule.
+        :param dot: The index of the next symbol to be parsed.
+        :param children: The trees derived so far.
+        :param is_incomplete: True if the last child is an incomplete match of the symbol at the dot.
+        :param incomplete_idx: The length of the incomplete match.
+        :param rule_hash: The hash of `(nonterminal, symbols)`, if already known.
+        """
         self._nonterminal = nonterminal
         self._position = position
         self._symbols = symbols
         self._dot = dot
-        self.children = children or []
-        self.is_incomplete = is_incomplete
-        self.incomplete_idx = incomplete_idx
-        self._hash: Optional[int] = None
+        self._children = tuple(children)
+        self._is_incomplete = is_incomplete
+        self._incomplete_idx = incomplete_idx
+        # Nonterminal and symbols are shared by all states for the same rule,
+        # so their (comparatively expensive) hash is computed only once
+        self._rule_hash = (
+            hash((nonterminal, symbols)) if rule_hash is None else rule_hash
+        )
+        self._hash = hash((self._rule_hash, position, dot, self._children))
 
     @property
     def nonterminal(self) -> NonTerminal:
         return self._nonterminal
 
-    def append_child(self, child: DerivationTree) -> None:
-        self.children.append(child)
-        self._hash = None
-
-    def extend_children(self, children: list[DerivationTree]) -> None:
-        self.children.extend(children)
-        self._hash = None
-
     @property
     def position(self) -> int:
         return self._position
@@ -46,6 +75,18 @@ class ParseState:
     def symbols(self) -> tuple[ParserStateSymbolContent, ...]:
         return self._symbols
 
+    @property
+    def children(self) -> tuple[DerivationTree, ...]:
+        return self._children
+
+    @property
+    def is_incomplete(self) -> bool:
+        return self._is_incomplete
+
+    @property
+    def incomplete_idx(self) -> int:
+        return self._incomplete_idx
+
     @property
     def dot(self) -> Optional[Symbol]:
         return self.symbols[self._dot][0] if self._dot < len(self.symbols) else None
@@ -66,25 +107,18 @@ class ParseState:
         return self._dot < len(self.symbols) and self.symbols[self._dot][0].is_terminal
 
     def __hash__(self) -> int:
-        if self._hash is None:
-            self._hash = hash(
-                (
-                    self.nonterminal,
-                    self.position,
-                    self.symbols,
-                    self._dot,
-                    tuple(self.children),
-                )
-            )
         return self._hash
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         return (
             isinstance(other, ParseState)
-            and self.nonterminal == other.nonterminal
+            and self._rule_hash == other._rule_hash
+            and self._dot == other._dot
             and self.position == other.position
+            and self.nonterminal == other.nonterminal
             and self.symbols == other.symbols
-            and self._dot == other._dot
         )
 
     def __repr__(self) -> str:
@@ -101,18 +135,35 @@ class ParseState:
             + ")"
         )
 
-    def next(self) -> "ParseState":
-        next_state = self.copy()
-        next_state._dot += 1
-        return next_state
+    def next(self, *children: DerivationTree) -> "ParseState":
+        """
+        Return a state with the dot moved past the next symbol.
+
+        :param children: The trees derived from that symbol, appended to the children of this state.
+        """
+        return self.copy(
+            dot=self._dot + 1,
+            children=(*self._children, *children) if children else self._children,
+        )
 
-    def copy(self) -> "ParseState":
+    def copy(
+        self,
+        *,
+        dot: Optional[int] = None,
+        children: Optional[Sequence[DerivationTree]] = None,
+        is_incomplete: Optional[bool] = None,
+        incomplete_idx: Optional[int] = None,
+    ) -> "ParseState":
+        """
+        Return a copy of this state for the same rule, replacing the given attributes.
+        """
         return ParseState(
-            self.nonterminal,
-            self.position,
-            self.symbols,
-            self._dot,
-            self.children[:],
-            self.is_incomplete,
-            self.incomplete_idx,
+            self._nonterminal,
+            self._position,
+            self._symbols,
+            self._dot if dot is None else dot,
+            self._children if children is None else children,
+            self._is_incomplete if is_incomplete is None else is_incomplete,
+            self._incomplete_idx if incomplete_idx is None else incomplete_idx,
+            rule_hash=self._rule_hash,
         )
@@ -1,9 +1,10 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from copy import deepcopy
 from typing import Optional
 
 from cachetools import LRUCache
 
+from fandango.errors import FandangoParseError
 from fandango.language.grammar import ParsingMode
 from fandango.language.grammar.nodes.node import Node
 from fandango.language.grammar.parser.iterative_parser import IterativeParser
@@ -11,6 +12,10 @@ from fandango.language.symbols.non_terminal import NonTerminal
 from fandango.language.tree import DerivationTree
 from fandango.utils import cache_size
 
+# Number of bytes (or characters) fed to the parser at once when streaming.
+# Doubled with each step as long as the current element continues.
+STREAM_FEED_SIZE = 16
+
 
 class Parser:
     def __init__(self, grammar_rules: dict[NonTerminal, Node]):
@@ -120,6 +125,81 @@ class Parser:
             include_controlflow=include_controlflow,
         )
 
+    def parse_stream(
+        self,
+        chunks: Iterable[str | bytes],
+        start: str | NonTerminal = "<start>",
+        include_controlflow: bool = False,
+    ) -> Generator[DerivationTree, None, None]:
+        """
+        Parse the concatenation of `chunks` as a sequence of `start` elements,
+        yielding one tree per element as soon as it is complete.
+        Each element is the longest prefix of the remaining input that parses as `start`.
+        The parse table is discarded after each element,
+        so memory is bounded by the size of the largest element plus one chunk.
+        Raise `FandangoParseError` if the remaining input does not start with an element.
+        """
+        if isinstance(start, str):
+            start = NonTerminal(start)
+
+        chunk_iter = iter(chunks)
+        buffer: str | bytes = ""
+        offset = 0  # Position of `buffer[0]` in the stream
+        pos = 0  # Start of the current element in `buffer`
+        eof = False
+
+        while True:
+            if pos == len(buffer):
+                if eof:
+                    return
+                chunk = next(chunk_iter, None)
+                if chunk is None:
+                    return
+                offset += pos
+                buffer = chunk
+                pos = 0
+                continue
+
+            self._iter_parser.new_parse(start)
+            fed = pos
+            feed_size = STREAM_FEED_SIZE
+            while True:
+                if fed == len(buffer):
+                    chunk = None if eof else next(chunk_iter, None)
+                    if chunk is None:
+                        eof = True
+                        break
+                    # Drop the elements we already have
+                    offset += pos
+                    fed -= pos
+                    buffer = buffer[pos:] + chunk  # type: ignore[operator]
+                    pos = 0
+                    continue
+
+                piece = buffer[fed : fed + feed_size]
+                for _ in self._iter_parser.consume(piece):
+                    pass
+                fed += len(piece)
+                feed_size *= 2
+                if not self._iter_parser.can_continue():
+                    break
+
+            length, trees = self._iter_parser.longest_match()
+            if length < 0:
+                raise FandangoParseError(
+                    f"No {start.format_as_spec()} at position {offset + pos}",
+                    position=offset + pos,
+                )
+            pos += length
+
+            tree = trees[0]
+            if include_controlflow:
+                yield tree
+            else:
+                collapsed = self.collapse(tree)
+                if collapsed is not None:
+                    yield collapsed
+
     def parse(
         self,
         word: str | bytes | int | DerivationTree,
@@ -5,6 +5,8 @@ from fandango.language.tree import DerivationTree
 
 
 class ParserDerivationTree(DerivationTree):
+    __slots__ = ()
+
     def __init__(
         self,
         symbol: Symbol,
@@ -2,9 +2,16 @@ import os
 import platform
 import shutil
 from pathlib import Path
+from typing import NamedTuple, Optional
 
 from xdg_base_dirs import xdg_cache_home
 
+# Default upper bound on the total size of cached specs
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Suffix of cache entries
+CACHE_SUFFIX = ".pickle"
+
 
 def get_cache_dir() -> Path:
     """Return the parser cache directory"""
@@ -16,8 +23,81 @@ def get_cache_dir() -> Path:
     return cache_dir
 
 
+def cache_max_bytes() -> int:
+    """Return the maximum total size of the parser cache, in bytes"""
+    max_mb = os.environ.get("FANDANGO_SPEC_CACHE_MB")
+    if max_mb is None:
+        return DEFAULT_CACHE_MAX_BYTES
+    return int(float(max_mb) * 1024 * 1024)
+
+
 def clear_cache() -> None:
     """Clear the Fandango parser cache"""
     cache_dir = get_cache_dir()
     if os.path.exists(cache_dir):
         shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+class CacheStats(NamedTuple):
+    directory: Path
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+
+def _cache_entries(cache_dir: Path) -> list[tuple[Path, os.stat_result]]:
+    entries: list[tuple[Path, os.stat_result]] = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for entry in cache_dir.iterdir():
+        if entry.suffix != CACHE_SUFFIX:
+            continue
+        try:
+            entries.append((entry, entry.stat()))
+        except OSError:
+            pass  # removed concurrently
+    return entries
+
+
+def cache_stats() -> CacheStats:
+    """Return statistics on the Fandango parser cache"""
+    cache_dir = get_cache_dir()
+    entries = _cache_entries(cache_dir)
+    return CacheStats(
+        directory=cache_dir,
+        entries=len(entries),
+        total_bytes=sum(stat.st_size for _, stat in entries),
+        max_bytes=cache_max_bytes(),
+    )
+
+
+def prune_cache(max_bytes: Optional[int] = None) -> int:
+    """
+    Remove least recently used entries from the parser cache
+    until its total size is at most `max_bytes`.
+    :param max_bytes: The size limit (default: `cache_max_bytes()`)
+    :return: The number of entries removed
+    """
+    if max_bytes is None:
+        max_bytes = cache_max_bytes()
+
+    entries = _cache_entries(get_cache_dir())
+    total_bytes = sum(stat.st_size for _, stat in entries)
+    if total_bytes <= max_bytes:
+        return 0
+
+    # Loading an entry updates its modification time; evict the oldest first
+    entries.sort(key=lambda entry: entry[1].st_mtime)
+    removed = 0
+    for path, stat in entries:
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass  # removed concurrently
+        except OSError:
+            continue
+        total_bytes -= stat.st_size
+    return removed
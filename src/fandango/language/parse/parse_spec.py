@@ -31,12 +31,19 @@ def parse_content(
     :return: A FandangoSpec object containing the parsed grammar, constraints, and code text.
     """
     cached_spec: Optional[CachedFandangoSpec] = None
-    use_cache = False
     if used_symbols is None:
         used_symbols = set()
 
     if use_cache:
-        cached_spec = CachedFandangoSpec.load(fan_contents, filename)
+        cached_spec = CachedFandangoSpec.load(
+            fan_contents,
+            filename,
+            lazy=lazy,
+            max_repetitions=max_repetitions,
+            includes=includes,
+        )
+        if cached_spec:
+            cached_spec.restore(used_symbols)
 
     if not cached_spec:
         tree = parse_tree(filename, fan_contents)
@@ -51,7 +58,7 @@ def parse_content(
             includes=includes,
         )
         if use_cache:
-            cached_spec.persist(fan_contents, filename)
+            cached_spec.persist()
 
     spec = cached_spec.to_spec(
         pyenv_globals=pyenv_globals,
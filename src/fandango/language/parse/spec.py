@@ -3,6 +3,7 @@ import hashlib
 import os
 import pickle
 import sys
+import tempfile
 import time
 import uuid
 import warnings
@@ -10,14 +11,15 @@ from pathlib import Path
 from typing import Any, Optional
 
 import cachedir_tag
-from antlr4.tree.Tree import ParseTree
+from antlr4.Token import Token
+from antlr4.tree.Tree import ParseTree, TerminalNode
 
 import fandango
 from fandango.constraints import predicates
 from fandango.constraints.constraint import Constraint
 from fandango.constraints.soft import SoftValue
 from fandango.io import CURRENT_ENV_KEY
-from fandango.language.parse.cache import get_cache_dir
+from fandango.language.parse.cache import CACHE_SUFFIX, get_cache_dir, prune_cache
 from fandango.language.parse.convert import (
     ConstraintProcessor,
     GrammarProcessor,
@@ -25,7 +27,36 @@ from fandango.language.parse.convert import (
 )
 from fandango.language.parse.splitter import FandangoSplitter
 from fandango.language.parser.FandangoParser import FandangoParser
-from fandango.logger import LOGGER, print_exception
+from fandango.logger import LOGGER
+
+
+def _detach_token(token: Optional[Token]) -> None:
+    if token is None:
+        return
+    token._text = token.text  # materialize the text before dropping the input
+    token.source = (None, None)
+
+
+def detach_parse_tree(ctx: ParseTree) -> None:
+    """
+    Detach the parse tree containing `ctx` from its parser and input streams,
+    such that it can be pickled. The tree keeps all texts.
+    """
+    root: Any = ctx
+    while root.parentCtx is not None:
+        root = root.parentCtx
+
+    stack: list[Any] = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, TerminalNode):
+            _detach_token(node.symbol)  # type: ignore[attr-defined] # antlr4 does not declare TerminalNode attributes
+        else:
+            node.parser = None
+            node.exception = None
+            _detach_token(node.start)
+            _detach_token(node.stop)
+            stack.extend(node.children or [])
 
 
 class FandangoSpec:
@@ -160,12 +191,24 @@ class CachedFandangoSpec:
         self.filename = filename
         self.max_repetitions = max_repetitions
         self.used_symbols = used_symbols
+        self.key = self.cache_key(
+            fan_contents,
+            filename=filename,
+            lazy=lazy,
+            max_repetitions=max_repetitions,
+            includes=includes,
+        )
 
         LOGGER.debug(f"{filename}: extracting code")
+        given_symbols = set(used_symbols)
         splitter = FandangoSplitter(
             filename=filename, includes=includes, used_symbols=used_symbols
         )
         splitter.visit(tree)
+
+        # Included files and the symbols they define, for reuse from the cache
+        self.included_files = splitter.included_files
+        self.included_symbols = used_symbols - given_symbols
         python_processor = PythonProcessor()
         code_tree = python_processor.get_code(splitter.python_code)
         ast.fix_missing_locations(code_tree)
@@ -193,58 +236,161 @@ class CachedFandangoSpec:
             constraints_ctx=self.constraints,
         )
 
-    @classmethod
-    def load(cls, fan_contents: str, filename: str) -> Optional["CachedFandangoSpec"]:
-        pickle_file = cls.get_pickle_file(fan_contents)
+    def restore(self, used_symbols: Optional[set[str]]) -> None:
+        """
+        Prepare a spec loaded from the cache for use in a new context.
+        :param used_symbols: The set of used symbols to update, as passed to `__init__()`
+        """
+        if used_symbols is None:
+            used_symbols = set()
+        used_symbols.update(self.included_symbols)
+        self.used_symbols = used_symbols
 
-        if os.path.exists(pickle_file):
+    def is_current(self, fan_contents: str) -> bool:
+        """Return True if this spec reflects `fan_contents` and the current state of included files"""
+        if self.version != fandango.version() or self.fan_contents != fan_contents:
+            return False
+        for path, contents in self.included_files.items():
             try:
-                with open(pickle_file, "rb") as fp:
-                    LOGGER.info(f"{filename}: loading cached spec from {pickle_file}")
-                    start_time = time.time()
-                    with warnings.catch_warnings():
-                        warnings.simplefilter(
-                            "ignore", DeprecationWarning
-                        )  # for some reason, unpickling triggers the deprecation warnings in __getattr__ of DerivationTree and TreeValue
-                        spec = pickle.load(fp)
-                    assert spec is not None
-                    LOGGER.debug(f"Cached spec version: {spec.version}")
-                    if spec.fan_contents != fan_contents:
-                        error = fandango.FandangoValueError(
-                            "Hash collision (If you get this, you'll be real famous)"
-                        )
-                        raise error
-
-                    LOGGER.debug(
-                        f"{filename}: loaded from cache in {time.time() - start_time:.2f} seconds"
-                    )
-                    assert isinstance(spec, CachedFandangoSpec)
-                    return spec
-            except Exception as exc:
-                print_exception(exc)
-        return None
-
-    def persist(self, fan_contents: str, filename: str) -> None:
-        pickle_file = self.get_pickle_file(fan_contents)
-        LOGGER.info(f"{filename}: saving spec to cache {pickle_file}")
+                with open(path, "r", encoding="utf-8") as fp:
+                    if fp.read() != contents:
+                        return False
+            except OSError:
+                return False
+        return True
+
+    @classmethod
+    def load(
+        cls,
+        fan_contents: str,
+        filename: str,
+        *,
+        lazy: bool = False,
+        max_repetitions: int = 5,
+        includes: Optional[list[str]] = None,
+    ) -> Optional["CachedFandangoSpec"]:
+        """
+        Load the spec for `fan_contents` from the cache.
+        Entries that cannot be read or are outdated are removed.
+        :return: The cached spec, or None if there is no (valid) cache entry.
+        """
+        key = cls.cache_key(
+            fan_contents,
+            filename=filename,
+            lazy=lazy,
+            max_repetitions=max_repetitions,
+            includes=includes,
+        )
+        pickle_file = cls.get_pickle_file(key)
+
         try:
-            with open(pickle_file, "wb") as fp:
-                pickle.dump(self, fp)
-        except Exception as e:
-            print_exception(e)
-            try:
-                os.remove(pickle_file)  # might be inconsistent
-            except Exception:
-                pass
+            fp = open(pickle_file, "rb")
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            LOGGER.warning(f"{filename}: cannot read cached spec: {exc}")
+            return None
+
+        LOGGER.info(f"{filename}: loading cached spec from {pickle_file}")
+        start_time = time.time()
+        try:
+            with fp:
+                with warnings.catch_warnings():
+                    warnings.simplefilter(
+                        "ignore", DeprecationWarning
+                    )  # for some reason, unpickling triggers the deprecation warnings in __getattr__ of DerivationTree and TreeValue
+                    spec = pickle.load(fp)
+            if not isinstance(spec, CachedFandangoSpec):
+                raise TypeError(f"unexpected object of type {type(spec).__name__}")
+        except Exception as exc:
+            # Truncated or written by an incompatible version
+            LOGGER.warning(f"{filename}: ignoring unreadable cached spec: {exc}")
+            cls._remove(pickle_file)
+            return None
+
+        LOGGER.debug(f"Cached spec version: {spec.version}")
+        if not spec.is_current(fan_contents):
+            LOGGER.info(f"{filename}: cached spec is outdated")
+            cls._remove(pickle_file)
+            return None
+
+        # Mark as recently used, such that it survives pruning
+        try:
+            os.utime(pickle_file)
+        except OSError:
+            pass
+
+        LOGGER.debug(
+            f"{filename}: loaded from cache in {time.time() - start_time:.2f} seconds"
+        )
+        return spec
+
+    def persist(self) -> None:
+        """
+        Save this spec in the cache.
+        The cache entry is written to a temporary file first and then atomically
+        renamed, such that concurrent processes never see a partial entry.
+        """
+        pickle_file = self.get_pickle_file(self.key)
+        LOGGER.info(f"{self.filename}: saving spec to cache {pickle_file}")
+        tmp_file: Optional[str] = None
+        try:
+            for ctx in self.productions + self.constraints + self.grammar_settings:
+                detach_parse_tree(ctx)
+            with tempfile.NamedTemporaryFile(
+                "wb",
+                dir=pickle_file.parent,
+                prefix=pickle_file.stem + ".",
+                suffix=".tmp",
+                delete=False,
+            ) as fp:
+                tmp_file = fp.name
+                pickle.dump(self, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, pickle_file)
+            tmp_file = None
+        except Exception as exc:
+            LOGGER.warning(f"{self.filename}: cannot save spec to cache: {exc}")
+        finally:
+            if tmp_file is not None:
+                self._remove(Path(tmp_file))
+
+        prune_cache()
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # removed concurrently
+
+    @classmethod
+    def cache_key(
+        cls,
+        fan_contents: str,
+        *,
+        filename: str,
+        lazy: bool,
+        max_repetitions: int,
+        includes: Optional[list[str]] = None,
+    ) -> str:
+        """Return the cache key for a spec with the given contents and settings"""
+        # Keep separate entries for different Fandango and Python versions
+        parts = [
+            fan_contents,
+            filename,
+            repr(lazy),
+            repr(max_repetitions),
+            repr(sorted(str(include) for include in includes or [])),
+            fandango.version(),
+            sys.version,
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
 
     @classmethod
-    def get_pickle_file(cls, fan_contents: str) -> Path:
+    def get_pickle_file(cls, key: str) -> Path:
         cache_dir = get_cache_dir()
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir, mode=0o700, exist_ok=True)
             cachedir_tag.tag(cache_dir, application="Fandango")  # type: ignore[no-untyped-call] # cachedir_tag doesn't provide types
 
-        # Keep separate hashes for different Fandango and Python versions
-        hash_contents = fan_contents + fandango.version() + "-" + sys.version
-        hash = hashlib.sha256(hash_contents.encode()).hexdigest()
-        return cache_dir / (hash + ".pickle")
+        return cache_dir / (key + CACHE_SUFFIX)
@@ -12,7 +12,7 @@ from fandango.language.parser.FandangoParserVisitor import FandangoParserVisitor
 from fandango.logger import LOGGER
 
 
-def read_file(file_to_be_included: Path, includes: set[Path]) -> str:
+def locate_file(file_to_be_included: Path, includes: set[Path]) -> Path:
     dirs = {file_to_be_included.resolve().parent}
     dirs.update(includes)
 
@@ -30,17 +30,21 @@ def read_file(file_to_be_included: Path, includes: set[Path]) -> str:
 
     for dir in dirs:
         full_file_name = dir / file_to_be_included
-        if not full_file_name.exists():
-            continue
-        with full_file_name.open("r", encoding="utf-8") as full_file:
-            LOGGER.debug(f"{file_to_be_included}: including {full_file_name}")
-            return full_file.read()
+        if full_file_name.exists():
+            return full_file_name
 
     raise FileNotFoundError(
         f"{file_to_be_included!r} not found in {':'.join(str(dir) for dir in dirs)}"
     )
 
 
+def read_file(file_to_be_included: Path, includes: set[Path]) -> str:
+    full_file_name = locate_file(file_to_be_included, includes)
+    with full_file_name.open("r", encoding="utf-8") as full_file:
+        LOGGER.debug(f"{file_to_be_included}: including {full_file_name}")
+        return full_file.read()
+
+
 class FandangoSplitter(FandangoParserVisitor):
     def __init__(
         self,
@@ -63,6 +67,9 @@ class FandangoSplitter(FandangoParserVisitor):
         self.grammar_settings: list[FandangoParser.Grammar_setting_contentContext] = []
         self.python_code: list[FandangoParser.PythonContext] = []
 
+        # Included files (full path -> contents), for cache validation
+        self.included_files: dict[str, str] = {}
+
     def visitFandango(self, ctx: FandangoParser.FandangoContext) -> None:
         self.productions = []
         self.constraints = []
@@ -80,7 +87,10 @@ class FandangoSplitter(FandangoParserVisitor):
         filename = filename[
             1:-1
         ]  # remove quotes, assume we're just using simple quotes
-        contents = read_file(Path(filename), includes=self._includes)
+        full_file_name = locate_file(Path(filename), includes=self._includes)
+        LOGGER.debug(f"{filename}: including {full_file_name}")
+        with full_file_name.open("r", encoding="utf-8") as full_file:
+            contents = full_file.read()
         inner = FandangoSplitter(
             filename=filename,
             used_symbols=self._used_symbols,
@@ -90,6 +100,9 @@ class FandangoSplitter(FandangoParserVisitor):
         tree = parse_tree(filename, contents)
         inner.visit(tree)
 
+        self.included_files[str(full_file_name.resolve())] = contents
+        self.included_files.update(inner.included_files)
+
         self.productions = inner.productions + self.productions
         self.constraints = inner.constraints + self.constraints
         self.grammar_settings = inner.grammar_settings + self.grammar_settings
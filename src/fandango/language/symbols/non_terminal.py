@@ -2,6 +2,8 @@ from fandango.language.symbols.symbol import Symbol, SymbolType
 
 
 class NonTerminal(Symbol):
+    __slots__ = ()
+
     def __init__(self, symbol: str) -> None:
         assert isinstance(symbol, str)
         super().__init__(symbol, SymbolType.NON_TERMINAL)
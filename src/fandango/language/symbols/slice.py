@@ -3,6 +3,8 @@ from fandango.logger import LOGGER
 
 
 class Slice(Symbol):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__("", SymbolType.SLICE)
 
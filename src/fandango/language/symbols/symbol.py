@@ -13,6 +13,8 @@ class SymbolType(enum.Enum):
 
 
 class Symbol(abc.ABC):
+    __slots__ = ("_value", "_type", "_is_regex")
+
     def __init__(self, value: str | bytes | int | TreeValue, type_: SymbolType):
         self._value = value if isinstance(value, TreeValue) else TreeValue(value)
         self._type = type_
@@ -28,6 +30,10 @@ class Symbol(abc.ABC):
         """Return True if `word` matches"""
         return False
 
+    def can_start_with(self, word: str | bytes, position: int) -> bool:
+        """Return False if no match can start at `word[position]`"""
+        return True
+
     @property
     def is_terminal(self) -> bool:
         return self._type == SymbolType.TERMINAL
@@ -1,6 +1,8 @@
 import re
 from io import UnsupportedOperation
-from typing import cast
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parser  # type: ignore[attr-defined]
+from typing import Any, Optional, cast
 
 import regex
 
@@ -8,10 +10,88 @@ from fandango.errors import FandangoValueError
 from fandango.language.symbols.symbol import Symbol, SymbolType
 from fandango.language.tree_value import TreeValue, TreeValueType
 
+# Regular expressions with first sets larger than this are not indexed.
+# Indexing uses Python's own regular expression parser, `re._parser`.
+MAX_FIRST_CHARS = 1024
+
+
+def _first_chars(items: Any) -> tuple[Optional[set[int]], bool]:
+    """
+    Return the characters (code points or byte values) a match of the parsed regular expression `items`
+    can start with, together with whether the expression can match the empty string.
+    The first set is `None` if it cannot be determined.
+    """
+    first: set[int] = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            first.add(av)
+            return first, False
+        elif op is sre_constants.IN:
+            for set_op, set_av in av:
+                if set_op is sre_constants.LITERAL:
+                    first.add(set_av)
+                elif set_op is sre_constants.RANGE:
+                    low, high = set_av
+                    if high - low > MAX_FIRST_CHARS:
+                        return None, False
+                    first.update(range(low, high + 1))
+                else:
+                    # NEGATE, CATEGORY, ...
+                    return None, False
+            return first, False
+        elif op is sre_constants.BRANCH:
+            nullable = False
+            for branch in av[1]:
+                branch_first, branch_nullable = _first_chars(branch)
+                if branch_first is None:
+                    return None, False
+                first |= branch_first
+                nullable = nullable or branch_nullable
+            if not nullable:
+                return first, False
+        elif op is sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, subpattern = av
+            if add_flags or del_flags:
+                return None, False
+            sub_first, sub_nullable = _first_chars(subpattern)
+            if sub_first is None:
+                return None, False
+            first |= sub_first
+            if not sub_nullable:
+                return first, False
+        elif op in (
+            sre_constants.MAX_REPEAT,
+            sre_constants.MIN_REPEAT,
+            sre_constants.POSSESSIVE_REPEAT,
+        ):
+            min_repeat, _max_repeat, subpattern = av
+            sub_first, sub_nullable = _first_chars(subpattern)
+            if sub_first is None:
+                return None, False
+            first |= sub_first
+            if min_repeat > 0 and not sub_nullable:
+                return first, False
+        elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            # Zero-width assertions only restrict what follows
+            continue
+        else:
+            # ANY, NOT_LITERAL, GROUPREF, ...
+            return None, False
+
+        if len(first) > MAX_FIRST_CHARS:
+            return None, False
+
+    return first, True
+
 
 class Terminal(Symbol):
+    __slots__ = ("_patterns", "_first_chars")
+
     def __init__(self, symbol: str | bytes | int | TreeValue) -> None:
         super().__init__(symbol, SymbolType.TERMINAL)
+        # Compiled regular expressions and first character sets; set up on first use
+        self._patterns: Optional[dict[tuple[bool, bool], Any]] = None
+        self._first_chars: Optional[dict[bool, Optional[frozenset[int]]]] = None
 
     def count_bytes(self) -> int:
         return self._value.count_bytes()
@@ -67,12 +147,12 @@ class Terminal(Symbol):
 
         if self.is_regex:
             if not incomplete:
-                match = re.match(symbol, check_word)  # type: ignore [arg-type] # re actually does accept bytes
+                match = self._pattern(isinstance(symbol, bytes)).match(check_word)
                 if match:
                     # LOGGER.debug(f"It's a match: {match.group(0)!r}")
                     return True, len(match.group(0))
             else:
-                compiled = regex.compile(symbol)  # type: ignore[no-untyped-call] # regex doesn't provide types
+                compiled = self._pattern(isinstance(symbol, bytes), partial=True)
                 match = compiled.match(check_word, partial=True)
                 if match is not None and (
                     match.partial or match.end() == len(check_word)
@@ -105,6 +185,72 @@ class Terminal(Symbol):
         # LOGGER.debug(f"No match")
         return False, 0
 
+    def _pattern(self, as_bytes: bool, partial: bool = False) -> Any:
+        """
+        Return the compiled regular expression of this terminal.
+        :param as_bytes: If True, return a bytes pattern; otherwise, a string pattern
+        :param partial: If True, return a `regex` pattern supporting partial matches; otherwise, an `re` pattern
+        """
+        if self._patterns is None:
+            self._patterns = {}
+        key = (as_bytes, partial)
+        pattern = self._patterns.get(key)
+        if pattern is None:
+            symbol = self._value.to_bytes() if as_bytes else self._value.to_string()
+            if partial:
+                pattern = regex.compile(symbol)  # type: ignore[no-untyped-call] # regex doesn't provide types
+            else:
+                pattern = re.compile(symbol)
+            self._patterns[key] = pattern
+        return pattern
+
+    def first_chars(self, as_bytes: bool) -> Optional[frozenset[int]]:
+        """
+        Return the characters (as code points or byte values) a match of this terminal can start with,
+        or `None` if these are unknown (or the terminal can match the empty string).
+        :param as_bytes: If True, match against bytes; otherwise, against strings
+        """
+        if self._first_chars is None:
+            self._first_chars = {}
+        if as_bytes not in self._first_chars:
+            symbol = self._value.to_bytes() if as_bytes else self._value.to_string()
+            first: Optional[set[int]]
+            if not symbol:
+                first = None
+            elif not self.is_regex:
+                first = {symbol[0] if isinstance(symbol, bytes) else ord(symbol[0])}
+            else:
+                try:
+                    parsed = sre_parser.parse(symbol)
+                except re.error:
+                    parsed = None
+                if parsed is None or parsed.state.flags & (re.IGNORECASE | re.VERBOSE):
+                    first = None
+                else:
+                    first, nullable = _first_chars(parsed)
+                    if nullable:
+                        first = None
+            self._first_chars[as_bytes] = None if first is None else frozenset(first)
+        return self._first_chars[as_bytes]
+
+    def can_start_with(self, word: str | bytes, position: int) -> bool:
+        """
+        Return False if no match of this terminal can start at `word[position]`.
+        This is a quick check that does not invoke the regular expression engine;
+        if it returns True, use `check()` to find out whether there actually is a match.
+        """
+        if position >= len(word) or self._value.is_type(
+            TreeValueType.TRAILING_BITS_ONLY
+        ):
+            return True
+        # Same choice of pattern as in `check()`
+        as_bytes = self._value.is_type(TreeValueType.BYTES) and isinstance(word, bytes)
+        first = self.first_chars(as_bytes)
+        if first is None:
+            return True
+        char = word[position]
+        return (char if isinstance(char, int) else ord(char)) in first
+
     def check_all(self, word: str | bytes | int) -> bool:
         if isinstance(word, str):
             return self._value.to_string() == word
@@ -1,9 +1,11 @@
 import copy
 import warnings
 from collections import deque
-from collections.abc import Callable, Generator, Iterable, Iterator
-from typing import TYPE_CHECKING, Any, Optional, TypeVar, cast
+from collections.abc import Callable, Container, Generator, Iterable, Iterator
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, TypeVar, cast
 
+from fandango.evolution.profiler import span
 from fandango.language.symbols import NonTerminal, Slice, Symbol, Terminal
 from fandango.language.tree_value import (
     BYTES_TO_STRING_ENCODING,
@@ -25,6 +27,12 @@ if TYPE_CHECKING:
 else:
     TreeTuple = tuple[T, list]  # beartype falls over with recursive types
 
+# Most nodes have no sources and no repetition origins; these share one empty list.
+# Neither is ever modified in place, and the `sources` and `origin_repetitions`
+# properties hand out a fresh list instead.
+_NO_SOURCES: list["DerivationTree"] = []
+_NO_ORIGIN_REPETITIONS: list[tuple[str, int, int]] = []
+
 
 class ProtocolMessage:
     """
@@ -117,6 +125,21 @@ class DerivationTree:
     This class is used to represent a node in the derivation tree.
     """
 
+    # Trees are large and plentiful; avoid a per-node `__dict__`
+    __slots__ = (
+        "hash_cache",
+        "_parent",
+        "_sender",
+        "_recipient",
+        "_symbol",
+        "_children",
+        "_sources",
+        "_origin_repetitions",
+        "read_only",
+        "_size",
+        "_subtree_index",
+    )
+
     def __init__(
         self,
         symbol: Symbol,
@@ -149,14 +172,15 @@ class DerivationTree:
         self._recipient = recipient
         self._symbol = symbol
         self._children: list[DerivationTree] = []
-        self._sources: list[DerivationTree] = []  # init first
+        self._sources: list[DerivationTree] = _NO_SOURCES  # init first
         if sources is not None:
             self.sources = sources  # use setter
-        if origin_repetitions is None:
-            origin_repetitions = []
-        self.origin_repetitions: list[tuple[str, int, int]] = origin_repetitions
+        self._origin_repetitions: list[tuple[str, int, int]] = (
+            origin_repetitions or _NO_ORIGIN_REPETITIONS
+        )
         self.read_only = read_only
         self._size: Optional[int] = None
+        self._subtree_index: Optional["SubtreeIndex"] = None
         self.set_children(children or [])
 
     def __len__(self) -> int:
@@ -223,6 +247,7 @@ class DerivationTree:
 
     def invalidate_hash(self, update_size: bool = True) -> None:
         self.hash_cache = None
+        self._subtree_index = None
         if update_size:
             self._size = None
         if self._parent is not None:
@@ -310,16 +335,35 @@ class DerivationTree:
 
     @property
     def sources(self) -> list["DerivationTree"]:
-        return self._sources
+        return self._sources if self._sources else []
 
     @sources.setter
     def sources(self, source: list["DerivationTree"]) -> None:
-        if source is None:
-            self._sources = []
+        if not source:
+            self._sources = _NO_SOURCES
         else:
             self._sources = source
         for param in self._sources:
             param._parent = self
+        # Sources do not contribute to the hash, but they are indexed
+        node: Optional[DerivationTree] = self
+        while node is not None:
+            node._subtree_index = None
+            node = node._parent
+
+    @property
+    def origin_repetitions(self) -> list[tuple[str, int, int]]:
+        """
+        The repetitions this node was generated by, as `(id, iteration, repetition)` tuples.
+        To change these, assign a new list.
+        """
+        return self._origin_repetitions if self._origin_repetitions else []
+
+    @origin_repetitions.setter
+    def origin_repetitions(
+        self, origin_repetitions: list[tuple[str, int, int]]
+    ) -> None:
+        self._origin_repetitions = origin_repetitions or _NO_ORIGIN_REPETITIONS
 
     def add_child(self, child: "DerivationTree") -> None:
         self._children.append(child)
@@ -339,6 +383,13 @@ class DerivationTree:
             symbol = NonTerminal(symbol)
         else:
             assert isinstance(symbol, NonTerminal)
+        index = self.subtree_index()
+        if index is not None:
+            # Same level of the tree, same order: breadth-first is stable by depth
+            entries = sorted(index.by_symbol.get(symbol, []), key=itemgetter(0))
+            for _depth, tree in entries:
+                yield tree
+            return
         queue = deque([self])
         while queue:
             current = queue.popleft()
@@ -362,6 +413,9 @@ class DerivationTree:
         ]
 
     def find_by_origin(self, node_id: str) -> list["DerivationTree"]:
+        index = self.subtree_index()
+        if index is not None:
+            return list(index.by_origin.get(node_id, []))
         trees = sum(
             [
                 child.find_by_origin(node_id)
@@ -370,12 +424,38 @@ class DerivationTree:
             ],
             [],
         )
-        for o_node_id, _o_iter_id, _rep in self.origin_repetitions:
+        for o_node_id, _o_iter_id, _rep in self._origin_repetitions:
             if o_node_id == node_id:
                 trees.append(self)
                 break
         return trees
 
+    def subtree_index(self) -> Optional["SubtreeIndex"]:
+        """
+        Return an index of all nodes in this tree (including sources) if this is a root node; otherwise, None.
+        The index is built on first use and dropped whenever the tree changes.
+        """
+        if self._parent is not None:
+            return None
+        if self._subtree_index is None:
+            index = SubtreeIndex({}, {})
+            self._index_subtrees(index, 0)
+            self._subtree_index = index
+        return self._subtree_index
+
+    def _index_subtrees(self, index: "SubtreeIndex", depth: int) -> None:
+        if self._symbol.is_non_terminal:
+            index.by_symbol.setdefault(cast(NonTerminal, self._symbol), []).append(
+                (depth, self)
+            )
+        for child in [*self._children, *self._sources]:
+            child._index_subtrees(index, depth + 1)
+        # `find_by_origin()` only descends into nonterminals, but always checks the root
+        if depth == 0 or self._symbol.is_non_terminal:
+            for o_node_id, _o_iter_id, _rep in self._origin_repetitions:
+                index.by_origin.setdefault(o_node_id, []).append(self)
+                break
+
     def __getitem__(self, item: Any) -> "DerivationTree":
         if isinstance(item, list) and len(item) == 1:
             item = item[0]
@@ -474,31 +554,69 @@ class DerivationTree:
             return res
 
         # Create a new instance without copying the parent
-        copied = DerivationTree(
-            self.symbol,
-            [],
-            sender=self.sender,
-            recipient=self.recipient,
-            sources=[],
-            read_only=self.read_only,
-            origin_repetitions=list(self.origin_repetitions),
-        )
+        copied = self._copy_node()
         memo[id(self)] = copied
 
         # Deepcopy the children
         if copy_children:
-            copied.set_children(
-                [copy.deepcopy(child, memo) for child in self._children]
-            )
+            copied.set_children([child.__deepcopy__(memo) for child in self._children])
+            # The structure is the same, so hash and size carry over
+            copied.hash_cache = self.hash_cache
+            copied._size = self._size
 
         # Set the parent to None or update if necessary
-        if copy_parent:
-            copied._parent = copy.deepcopy(self.parent, memo)
+        if copy_parent and self._parent is not None:
+            copied._parent = self._parent.__deepcopy__(memo)
         if copy_params:
-            copied.sources = copy.deepcopy(self.sources, memo)
+            copied.sources = [param.__deepcopy__(memo) for param in self._sources]
 
         return copied
 
+    def _copy_node(self) -> "DerivationTree":
+        """
+        Copy this node without children, sources, and parent.
+        Hash and size are reset; callers may carry them over if the structure is the same.
+        """
+        copied = DerivationTree.__new__(DerivationTree)
+        copied.hash_cache = None
+        copied._parent = None
+        copied._sender = self._sender
+        copied._recipient = self._recipient
+        copied._symbol = self._symbol
+        copied._children = []
+        copied._sources = _NO_SOURCES
+        copied._origin_repetitions = (
+            list(self._origin_repetitions)
+            if self._origin_repetitions
+            else _NO_ORIGIN_REPETITIONS
+        )
+        copied.read_only = self.read_only
+        copied._size = None
+        copied._subtree_index = None
+        return copied
+
+    def _copy_unchanged(self, generators: Container[Symbol]) -> "DerivationTree":
+        """
+        Copy a subtree that `replace_multiple()` does not change.
+        This is what `replace_multiple()` would produce, without checking for replacements
+        or recomputing hashes: sources are kept for generator symbols only.
+        """
+        copied = self._copy_node()
+        copied.hash_cache = self.hash_cache
+        copied._size = self._size
+        copied._children = [
+            child._copy_unchanged(generators) for child in self._children
+        ]
+        for child in copied._children:
+            child._parent = copied
+        if self._symbol in generators:
+            copied._sources = [
+                param._copy_unchanged(generators) for param in self._sources
+            ]
+            for param in copied._sources:
+                param._parent = copied
+        return copied
+
     def should_be_serialized_to_bytes(self) -> bool:
         """
         Return true if the derivation tree should be serialized to bytes.
@@ -766,18 +884,39 @@ class DerivationTree:
             dict[tuple[PathStep, ...], "DerivationTree"]
         ] = None,
         current_path: Optional[tuple[PathStep, ...]] = None,
+        paths_to_replace: Optional[set[tuple[PathStep, ...]]] = None,
     ) -> "DerivationTree":
         """
         Replace the subtree rooted at the given node with the new subtree.
+        Subtrees without replacements are copied as is.
         """
         if path_to_replacement is None:
             path_to_replacement = dict()
             for replacee, replacement in replacements:
                 path_to_replacement[replacee.get_choices_path()] = replacement
+            with span("replace_multiple"):
+                return self.replace_multiple(
+                    grammar,
+                    replacements,
+                    path_to_replacement,
+                    current_path,
+                    paths_to_replace,
+                )
+
+        if paths_to_replace is None:
+            # All paths leading to a replacement
+            paths_to_replace = {
+                path[:i] for path in path_to_replacement for i in range(len(path) + 1)
+            }
 
         if current_path is None:
             current_path = self.get_choices_path()
 
+        if current_path not in paths_to_replace:
+            unchanged = self._copy_unchanged(grammar.generators)
+            unchanged._parent = self.parent
+            return unchanged
+
         if (
             current_path in path_to_replacement
             and self.symbol == path_to_replacement[current_path].symbol
@@ -796,6 +935,7 @@ class DerivationTree:
                         replacements,
                         path_to_replacement,
                         current_path + (ChildStep(i),),
+                        paths_to_replace,
                     )
                 )
             new_subtree.set_children(new_children)
@@ -812,6 +952,7 @@ class DerivationTree:
                 replacements,
                 path_to_replacement,
                 current_path + (SourceStep(i),),
+                paths_to_replace,
             )
             sources.append(new_param)
             if new_param != param:
@@ -822,6 +963,7 @@ class DerivationTree:
                 replacements,
                 path_to_replacement,
                 current_path + (ChildStep(i),),
+                paths_to_replace,
             )
             new_children.append(new_child)
             if new_child != child:
@@ -893,6 +1035,13 @@ class DerivationTree:
         """
         if isinstance(symbol, str):
             symbol = NonTerminal(symbol)
+        index = self.subtree_index()
+        if index is not None:
+            return [
+                node
+                for _depth, node in index.by_symbol.get(symbol, [])
+                if not (exclude_read_only and node.read_only)
+            ]
         nodes = []
         if self.symbol.is_non_terminal:
             nt = cast(NonTerminal, self.symbol)
@@ -1003,6 +1152,19 @@ class DerivationTree:
         return iter(self._children)
 
 
+class SubtreeIndex(NamedTuple):
+    """
+    Index of the nodes of a tree (including sources), built on demand for tree roots.
+    """
+
+    # Nonterminal nodes by symbol, as (depth, node) pairs in depth-first pre-order
+    by_symbol: dict[NonTerminal, list[tuple[int, DerivationTree]]]
+    # Nodes by repetition origin id, in depth-first post-order (see `find_by_origin()`)
+    by_origin: dict[str, list[DerivationTree]]
+
+
 class SliceTree(DerivationTree):
+    __slots__ = ()
+
     def __init__(self, children: list[DerivationTree], read_only: bool = False) -> None:
         super().__init__(Slice(), children, read_only=read_only)
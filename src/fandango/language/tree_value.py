@@ -11,6 +11,10 @@ STRING_TO_BYTES_ENCODING = "utf-8"  # according to the docs
 BYTES_TO_STRING_ENCODING = "latin-1"  # according to the docs
 
 
+# Shared by all values without trailing bits; never modified in place
+_NO_TRAILING_BITS: list[int] = []
+
+
 class TreeValueType(enum.Enum):
     STRING = "string"
     BYTES = "bytes"
@@ -342,6 +346,8 @@ DIRECT_ACCESS_METHODS_BASE_TO_UNDERLYING_TYPE = [
 @_attach_to_first_arg(DIRECT_ACCESS_METHODS_BASE_TO_FIRST_ARG_TYPE)
 @_attach_to_underlying(DIRECT_ACCESS_METHODS_BASE_TO_UNDERLYING_TYPE)
 class TreeValue:
+    __slots__ = ("_value", "_trailing_bits")
+
     def __init__(
         self,
         value: Optional[str | bytes | int],
@@ -351,7 +357,7 @@ class TreeValue:
     ):
         self._value: Optional[str | bytes]
         if trailing_bits is None:
-            trailing_bits = []
+            trailing_bits = _NO_TRAILING_BITS
         assert all(bit & 1 == bit for bit in trailing_bits), (
             "trailing bits must be 0 or 1, got " + str(trailing_bits)
         )
@@ -389,7 +395,7 @@ class TreeValue:
 
         num = trailing_bits_to_int(self._trailing_bits)
         bytes_ = num.to_bytes(len(self._trailing_bits) // 8)
-        self._trailing_bits = []
+        self._trailing_bits = _NO_TRAILING_BITS
         if isinstance(self._value, str):
             self._value = (
                 _str_to_bytes(self._value, encoding=str_to_bytes_encoding) + bytes_
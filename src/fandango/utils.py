@@ -1,6 +1,22 @@
+import functools
 import os
+from types import CodeType
 
 
 def cache_size() -> int:
     """Return the cache size"""
     return int(os.environ.get("FANDANGO_CACHE_SIZE", 10_000))
+
+
+@functools.lru_cache(maxsize=cache_size())
+def compile_expression(expression: str) -> CodeType:
+    """
+    Compile a Python expression for `eval()`.
+    Compiled code is cached by source, such that an expression that is evaluated
+    over and over (constraints, generators) is parsed and compiled only once.
+    As code objects are not stored elsewhere, the objects holding the expression
+    source remain picklable; they recompile on first use in a new process.
+    :param expression: The expression source
+    :return: The compiled code object
+    """
+    return compile(expression, "<string>", "eval")
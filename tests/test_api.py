@@ -1,5 +1,6 @@
 #!/usr/bin/env pytest
 
+import io
 import itertools
 import logging
 import random
@@ -8,6 +9,7 @@ import unittest
 import pytest
 
 from fandango import Fandango
+from fandango.errors import FandangoParseError
 
 from .utils import DOCS_ROOT, RESOURCES_ROOT
 
@@ -67,6 +69,36 @@ class APITest(unittest.TestCase):
 
         assert len(list(fan.parse(invalid_word))) == 0
 
+    SPEC_lines = r"""
+    <start> ::= <line>*
+    <line> ::= <field> ("," <field>)* "\n"
+    <field> ::= r"[a-z0-9]+"
+    """
+
+    def test_parse_stream(self):
+        fan = Fandango(self.SPEC_lines, use_stdlib=False)
+        data = "".join(f"a{i},b,{i}\n" for i in range(50))
+
+        for source in [data, io.StringIO(data), [data[:7], data[7:100], data[100:]]]:
+            trees = list(fan.parse_stream(source, chunk_size=10))
+            self.assertEqual(len(trees), 50)
+            self.assertTrue(all(tree.symbol.name() == "<line>" for tree in trees))
+            self.assertEqual("".join(str(tree) for tree in trees), data)
+
+    def test_parse_stream_bytes(self):
+        fan = Fandango(self.SPEC_abcd)
+        trees = list(fan.parse_stream(io.BytesIO(b"abdcd" * 10), chunk_size=4))
+        self.assertEqual([str(tree) for tree in trees], ["abd", "cd"] * 10)
+
+    def test_failing_parse_stream(self):
+        fan = Fandango(self.SPEC_lines, use_stdlib=False)
+        trees = fan.parse_stream("a,b\nc\n\n")
+        self.assertEqual(str(next(trees)), "a,b\n")
+        self.assertEqual(str(next(trees)), "c\n")
+        with self.assertRaises(FandangoParseError) as context:
+            next(trees)
+        self.assertEqual(context.exception.position, 6)
+
     def ensure_capped_generation(self):
         fan = Fandango(self.SPEC_abcd, logging_level=logging.INFO)
         solutions = fan.fuzz()
@@ -1,5 +1,9 @@
+import gc
 import itertools
+import pickle
+import random
 import sys
+import tracemalloc
 
 import pytest
 from pytest_benchmark.fixture import BenchmarkFixture
@@ -7,6 +11,7 @@ from pytest_benchmark.fixture import BenchmarkFixture
 from fandango.api import Fandango
 from fandango.constraints.constraint import Constraint
 from fandango.constraints.soft import SoftValue
+from fandango.evolution.evaluation import Evaluator
 from fandango.language.parse.parse import parse
 
 from .utils import RESOURCES_ROOT
@@ -82,3 +87,161 @@ def test_generate_with_single_soft_constraint(benchmark: BenchmarkFixture):
         raise AssertionError(f"9999 not found in the first 50 solutions: {solutions}")
 
     benchmark(func)
+
+
+def test_check_hard_constraint(benchmark: BenchmarkFixture):
+    with open(RESOURCES_ROOT / "even_numbers.fan", "r") as file:
+        contents = file.read()
+        grammar, constraints = parse(contents)
+        assert grammar is not None
+        assert len(constraints) == 1
+    constraint = constraints[0]
+    assert isinstance(constraint, Constraint)
+    trees = [grammar.parse(str(n)) for n in range(1000, 1200)]
+    assert all(tree is not None for tree in trees)
+
+    def func():
+        # Measure the cost of checking, not of looking up cached fitness values
+        constraint.clear_cache()
+        solved = sum(constraint.fitness(tree).success for tree in trees)
+        assert solved == len(trees) // 2
+
+    benchmark(func)
+
+
+BINARY_SPEC = r"""
+<start> ::= <record>+
+<record> ::= b'\x89' <byte> <byte>
+<byte> ::= rb'[\x00-\xff]'
+"""
+
+
+def _benchmark_parse(
+    benchmark: BenchmarkFixture,
+    contents: str,
+    word: str | bytes,
+    use_stdlib: bool = False,
+):
+    grammar, _ = parse(contents, use_stdlib=use_stdlib)
+    assert grammar is not None
+    benchmark.extra_info["input_bytes"] = len(word)
+
+    def func():
+        # Bypass the parse cache
+        grammar.update_parser()
+        assert grammar.parse(word) is not None
+
+    benchmark(func)
+
+
+def test_parse_text(benchmark: BenchmarkFixture):
+    with open(RESOURCES_ROOT / "csv.fan", "r") as file:
+        contents = file.read()
+    word = "".join(f"a{i};b{i};c{i}\n" for i in range(10))
+    _benchmark_parse(benchmark, contents, word)
+
+
+def test_parse_binary(benchmark: BenchmarkFixture):
+    word = b"".join(b"\x89" + bytes([i, 255 - i]) for i in range(128))
+    _benchmark_parse(benchmark, BINARY_SPEC, word)
+
+
+def test_parse_bits(benchmark: BenchmarkFixture):
+    with open(RESOURCES_ROOT / "rgb.fan", "r") as file:
+        contents = file.read()
+    word = b"".join(b"r" + bytes([i]) + b"b" for i in range(32)) + b"\x00;"
+    _benchmark_parse(benchmark, contents, word)
+
+
+@pytest.mark.parametrize(
+    "resource, word",
+    [
+        ("long_string.fan", "ab" * 250),
+        ("persons.fan", "Alice" + "x" * 150 + " Bob" + "y" * 150 + "," + "1" * 150),
+    ],
+)
+def test_parse_repetitions(benchmark: BenchmarkFixture, resource: str, word: str):
+    with open(RESOURCES_ROOT / resource, "r") as file:
+        contents = file.read()
+    _benchmark_parse(benchmark, contents, word, use_stdlib=True)
+
+
+def test_diversity_bonus(benchmark: BenchmarkFixture):
+    with open(RESOURCES_ROOT / "csv.fan", "r") as file:
+        grammar, _ = parse(file.read(), use_stdlib=False)
+    assert grammar is not None
+    random.seed(0)
+    population = [grammar.fuzz(max_nodes=30) for _ in range(300)]
+    evaluator = Evaluator(
+        grammar, [], expected_fitness=1.0, diversity_k=5, diversity_weight=1.0
+    )
+    # Measure scoring, as done every generation, not k-path extraction
+    evaluator.compute_diversity_bonus(population)
+
+    def func():
+        assert len(evaluator.compute_diversity_bonus(population)) == len(population)
+
+    benchmark(func)
+
+
+def test_fuzz(benchmark: BenchmarkFixture):
+    with open(RESOURCES_ROOT / "csv.fan", "r") as file:
+        grammar, _ = parse(file.read(), use_stdlib=False)
+    assert grammar is not None
+    random.seed(0)
+
+    def func():
+        for _ in range(50):
+            assert grammar.fuzz(max_nodes=200).size() > 0
+
+    benchmark(func)
+
+
+def test_find_subtrees(benchmark: BenchmarkFixture):
+    grammar, _ = parse(BINARY_SPEC, use_stdlib=False)
+    assert grammar is not None
+    tree = grammar.parse(b"".join(b"\x89" + bytes([i, 255 - i]) for i in range(128)))
+    assert tree is not None
+
+    def func():
+        # Like evaluating several quantified constraints on the same individual
+        for _ in range(20):
+            assert len(list(tree.find_subtrees("<record>"))) == 128
+            assert len(list(tree.find_subtrees("<byte>"))) == 256
+
+    benchmark(func)
+
+
+def _bytes_per_node(tree, make_copy, copies=5):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        trees = [make_copy() for _ in range(copies)]
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(trees) == copies
+    return allocated / (copies * tree.size())
+
+
+def test_tree_memory(benchmark: BenchmarkFixture):
+    with open(RESOURCES_ROOT / "csv.fan", "r") as file:
+        contents = file.read()
+    grammar, _ = parse(contents)
+    tree = grammar.parse("".join(f"a{i};b{i};c{i}\n" for i in range(20)))
+    assert tree is not None
+    data = pickle.dumps(tree)
+
+    # Unpickled trees own all their nodes, symbols and values;
+    # copies share symbols with the original
+    unpickled = _bytes_per_node(tree, lambda: pickle.loads(data))
+    copied = _bytes_per_node(tree, lambda: tree.deepcopy(copy_parent=False))
+    benchmark.extra_info["nodes"] = tree.size()
+    benchmark.extra_info["bytes_per_node"] = round(unpickled)
+    benchmark.extra_info["bytes_per_copied_node"] = round(copied)
+    # Without __slots__, these were ~550 and ~350 bytes
+    assert unpickled < 400
+    assert copied < 250
+
+    benchmark(lambda: tree.deepcopy(copy_parent=False))
@@ -0,0 +1,104 @@
+#!/usr/bin/env pytest
+import gc
+import pickle
+
+from fandango.cache_manager import CacheManager, ManagedCache, approximate_size
+from fandango.language.parse.parse import parse
+from fandango.language.symbols import NonTerminal, Terminal
+from fandango.language.tree import DerivationTree
+
+from .utils import RESOURCES_ROOT
+
+
+def test_evicts_least_recently_used_across_caches():
+    entry_size = approximate_size("x" * 100)
+    manager = CacheManager(max_bytes=3 * entry_size)
+    first = ManagedCache[int, str](manager)
+    second = ManagedCache[int, str](manager)
+
+    first[1] = "x" * 100
+    second[1] = "x" * 100
+    first[2] = "x" * 100
+    assert first[1] == "x" * 100
+    second[2] = "x" * 100
+
+    # The entry of `second` was the least recently used one
+    assert 1 in first and 2 in first
+    assert 1 not in second and 2 in second
+    assert manager.evictions == 1
+    assert manager.bytes == first.bytes + second.bytes == 3 * entry_size
+
+
+def test_hit_rates():
+    manager = CacheManager()
+    cache = ManagedCache[int, str](manager)
+    cache[1] = "one"
+    assert 1 in cache and cache[1] == "one"
+    assert cache.get(2) is None
+    cache[2] = "two"
+    assert (cache.hits, cache.misses) == (1, 2)
+    stats = manager.stats()
+    assert stats["entries"] == 2
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_releases_memory_of_cleared_and_collected_caches():
+    manager = CacheManager()
+    cache = ManagedCache[int, str](manager)
+    cache[1] = "one"
+    cache.clear()
+    assert len(cache) == 0 and manager.bytes == 0 and len(manager) == 0
+
+    cache[1] = "one"
+    assert manager.bytes > 0
+    del cache
+    gc.collect()
+    assert manager.bytes == 0 and len(manager) == 0
+
+
+def test_pickles_without_entries():
+    cache = ManagedCache[int, str](CacheManager())
+    cache[1] = "one"
+    copy = pickle.loads(pickle.dumps(cache))
+    assert len(copy) == 0
+    assert copy.manager is CacheManager.instance()
+
+
+def make_tree() -> DerivationTree:
+    return DerivationTree(
+        NonTerminal("<start>"),
+        [
+            DerivationTree(
+                NonTerminal("<ab>"),
+                [DerivationTree(Terminal("a")), DerivationTree(NonTerminal("<ab>"))],
+            )
+        ],
+    )
+
+
+def test_cached_failing_trees_refer_to_evaluated_tree():
+    with open(RESOURCES_ROOT / "constraints.fan", "r") as file:
+        _, constraints = parse(
+            file,
+            constraints=['forall <x> in <ab>: str(<x>) == "b";'],
+            use_stdlib=False,
+            use_cache=False,
+        )
+    (constraint,) = constraints
+
+    first = make_tree()
+    fitness = constraint.fitness(first)
+    assert not fitness.success and fitness.failing_trees
+    (cached,) = constraint.cache.values()
+    assert all(ref.tree is None for ref in cached.failing_trees)
+
+    second = make_tree()
+    hits = constraint.cache.hits
+    cached_fitness = constraint.fitness(second)
+    assert constraint.cache.hits == hits + 1
+    assert cached_fitness.fitness() == fitness.fitness()
+    assert [ft.tree for ft in cached_fitness.failing_trees] == [
+        ft.tree for ft in fitness.failing_trees
+    ]
+    for failing_tree in cached_fitness.failing_trees:
+        assert failing_tree.tree.get_root() is second
@@ -0,0 +1,146 @@
+#!/usr/bin/env pytest
+import json
+import os
+import pickle
+
+import pytest
+
+from fandango import Fandango
+from fandango.errors import FandangoValueError
+from fandango.evolution.checkpoint import (
+    POPULATION_FILE,
+    STATE_FILE,
+    decode_population,
+    encode_population,
+)
+from fandango.language.symbols import NonTerminal, Slice, Terminal
+from fandango.language.tree import DerivationTree
+from fandango.language.tree_value import TreeValue
+
+from .utils import RESOURCES_ROOT
+
+
+def assert_same_tree(expected: DerivationTree, actual: DerivationTree):
+    assert actual.symbol == expected.symbol
+    assert actual.symbol.is_regex == expected.symbol.is_regex
+    assert actual.sender == expected.sender
+    assert actual.recipient == expected.recipient
+    assert actual.read_only == expected.read_only
+    assert actual.origin_repetitions == expected.origin_repetitions
+    assert len(actual.sources) == len(expected.sources)
+    for expected_source, actual_source in zip(
+        expected.sources, actual.sources, strict=True
+    ):
+        assert_same_tree(expected_source, actual_source)
+        assert actual_source.parent is actual
+    assert len(actual.children) == len(expected.children)
+    for expected_child, actual_child in zip(
+        expected.children, actual.children, strict=True
+    ):
+        assert_same_tree(expected_child, actual_child)
+        assert actual_child.parent is actual
+
+
+def make_tree() -> DerivationTree:
+    regex = Terminal.from_symbol("r'[a-z]+'")
+    return DerivationTree(
+        NonTerminal("<start>"),
+        [
+            DerivationTree(
+                NonTerminal("<header>"),
+                [
+                    DerivationTree(Terminal(b"\x00\xff")),
+                    DerivationTree(Terminal(TreeValue(None, trailing_bits=[1, 0, 1]))),
+                ],
+                sources=[
+                    DerivationTree(NonTerminal("<seed>"), [DerivationTree(regex)])
+                ],
+                origin_repetitions=[("12", 0, 3), ("15", 2, -1)],
+                read_only=True,
+            ),
+            DerivationTree(
+                NonTerminal("<message>"),
+                [DerivationTree(Terminal("héllo \udc80")), DerivationTree(Slice())],
+                sender="Client",
+                recipient="Server",
+            ),
+            DerivationTree(Terminal("")),
+        ],
+    )
+
+
+def test_encode_population():
+    trees = [make_tree(), DerivationTree(NonTerminal("<start>"))]
+    decoded = decode_population(encode_population(trees))
+    assert len(decoded) == 2
+    for tree, decoded_tree in zip(trees, decoded, strict=True):
+        assert_same_tree(tree, decoded_tree)
+        assert decoded_tree == tree and hash(decoded_tree) == hash(tree)
+
+
+def test_encoded_population_is_compact():
+    with open(RESOURCES_ROOT / "persons.fan") as spec:
+        fandango = Fandango(spec)
+    population = fandango.fuzz(desired_solutions=50)
+    assert len(encode_population(population)) * 5 < len(pickle.dumps(population))
+
+
+def test_decode_invalid_population():
+    with pytest.raises(FandangoValueError):
+        decode_population(b"not a population")
+
+
+def fuzz(checkpoint_dir, constraints, **settings):
+    with open(RESOURCES_ROOT / "persons.fan") as spec:
+        fandango = Fandango(spec, constraints)
+    solutions = fandango.fuzz(
+        max_generations=3,
+        population_size=20,
+        resume=str(checkpoint_dir),
+        **settings,
+    )
+    return fandango.fandango, {solution.to_string() for solution in solutions}
+
+
+@pytest.mark.parametrize("dedup", ["exact", "bloom", "disk"])
+def test_resume(tmp_path, dedup):
+    first, first_solutions = fuzz(tmp_path, ["int(<age>) > 50"], dedup=dedup)
+    assert first.generations_made == 3
+    assert {STATE_FILE, POPULATION_FILE} <= set(os.listdir(tmp_path))
+    saved = [tree.to_string() for tree in first.population]
+
+    with open(RESOURCES_ROOT / "persons.fan") as spec:
+        fandango = Fandango(spec, ["int(<age>) > 50"])
+    fandango.init_population(population_size=20, resume=str(tmp_path), dedup=dedup)
+    resumed = fandango.fandango
+    # No need for a new initial population
+    assert [tree.to_string() for tree in resumed.population] == saved
+    assert resumed.generations_made == 3
+    assert resumed.adaptive_tuner.mutation_rate == first.adaptive_tuner.mutation_rate
+    assert len(resumed.evaluator._solution_set) == len(first.evaluator._solution_set)
+
+    second, second_solutions = fuzz(tmp_path, ["int(<age>) > 50"], dedup=dedup)
+    assert second.generations_made == 6
+    assert not first_solutions & second_solutions
+
+
+def test_resume_soft_values(tmp_path):
+    first, _ = fuzz(tmp_path, ["maximizing int(<age>)"])
+    (soft_value,) = first.constraints
+    with open(tmp_path / STATE_FILE) as fd:
+        state = json.load(fd)
+    assert state["soft_values"][soft_value.format_as_spec()]["n"] > 0
+
+    with open(RESOURCES_ROOT / "persons.fan") as spec:
+        fandango = Fandango(spec, ["maximizing int(<age>)"])
+    fandango.init_population(population_size=20, resume=str(tmp_path))
+    (resumed,) = fandango.fandango.constraints
+    # The resumed digest has also seen the evaluation of the restored population
+    assert resumed.tdigest._max == soft_value.tdigest._max
+    assert resumed.tdigest.n >= soft_value.tdigest.n
+
+
+def test_resume_from_empty_directory(tmp_path):
+    algorithm, solutions = fuzz(tmp_path / "new", ["int(<age>) > 50"])
+    assert solutions and algorithm.generations_made == 3
+    assert os.path.exists(tmp_path / "new" / STATE_FILE)
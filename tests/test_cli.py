@@ -112,6 +112,89 @@ class TestCLI(unittest.TestCase):
         )
         os.remove(RESOURCES_ROOT / "test.txt")
 
+    def test_output_with_test_command(self):
+        command = [
+            "fandango",
+            "fuzz",
+            "-f",
+            str(RESOURCES_ROOT / "digit.fan"),
+            "-n",
+            "10",
+            "--no-cache",
+            "--input-method",
+            "stdin",
+            "--executors",
+            "3",
+            "--exec-timeout",
+            "30",
+            sys.executable,
+            "-c",
+            "import sys; sys.stdout.write(sys.stdin.read() + ';')",
+        ]
+        out, err, code = run_command(command)
+        self.assertEqual(0, code, err)
+        # Executions may complete in any order
+        outputs = out.split(";")
+        self.assertEqual("", outputs.pop(), out)
+        self.assertEqual(10, len(outputs), out)
+        for output in outputs:
+            self.assertTrue(output.isdigit(), out)
+
+    def test_havoc_ratio(self):
+        out_dir = RESOURCES_ROOT / "test_havoc_files"
+        shutil.rmtree(out_dir, ignore_errors=True)
+        command = [
+            "fandango",
+            "fuzz",
+            "-f",
+            str(RESOURCES_ROOT / "digit.fan"),
+            "-n",
+            "10",
+            "--havoc-ratio",
+            "2.5",
+            "--no-cache",
+            "-d",
+            str(out_dir),
+        ]
+        try:
+            out, err, code = run_command(command)
+            self.assertEqual(0, code, err)
+            files = os.listdir(out_dir)
+            havoc_files = [f for f in files if f.startswith("fandango-havoc-")]
+            self.assertEqual(10, len(files) - len(havoc_files), files)
+            self.assertEqual(25, len(havoc_files), files)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    def test_resume(self):
+        checkpoint_dir = RESOURCES_ROOT / "test_checkpoint"
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        command = [
+            "fandango",
+            "fuzz",
+            "-f",
+            str(RESOURCES_ROOT / "digit.fan"),
+            "-N",
+            "2",
+            "--resume",
+            str(checkpoint_dir),
+            "--no-cache",
+        ]
+        try:
+            first_out, err, code = run_command(command)
+            self.assertEqual(0, code, err)
+            self.assertIn("state.json", os.listdir(checkpoint_dir))
+            second_out, err, code = run_command(command[:1] + ["-v"] + command[1:])
+            self.assertEqual(0, code, err)
+            self.assertIn("Resuming from generation 2", err)
+            self.assertNotIn("Generating (additional) initial population", err)
+            # Outputs of the first run are not produced again
+            first, second = first_out.split(), second_out.split()
+            self.assertTrue(first and second, (first_out, second_out))
+            self.assertFalse(set(first) & set(second))
+        finally:
+            shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
     def test_output_multiple_files(self):
         out_dir = RESOURCES_ROOT / "test_multiple_files"
         command = [
@@ -437,3 +437,67 @@ class ConverterTest(unittest.TestCase):
         tree = DerivationTree(Terminal(1))
         self.assertEqual(int(tree), 1, int(tree))
         self.assertEqual(tree.to_bits(), "1", tree.to_bits())
+
+
+INCREMENTAL_SPEC = """
+checked = []
+
+def is_small(item):
+    checked.append(str(item))
+    return int(item) < 50
+
+<start> ::= <item> ";" <item> ";" <item>
+<item> ::= <digit>+
+"""
+
+
+class IncrementalEvaluationTest(unittest.TestCase):
+    def get_constraint(self, constraint):
+        grammar, constraints = parse(INCREMENTAL_SPEC, constraints=[constraint])
+        self.assertEqual(1, len(constraints), len(constraints))
+        return grammar, constraints[0]
+
+    def replace_item(self, grammar, tree, index, value):
+        items = list(tree.find_subtrees(NonTerminal("<item>")))
+        new_item = grammar.parse(value, start="<item>")
+        return tree.replace(grammar, items[index], new_item)
+
+    def test_reuses_unchanged_combinations(self):
+        grammar, constraint = self.get_constraint("is_small(<item>)")
+        checked = constraint.global_variables["checked"]
+        constraint.set_incremental(True)
+        self.assertTrue(constraint.incremental)
+
+        tree = grammar.parse("1;20;30")
+        self.assertTrue(constraint.fitness(tree).success)
+        self.assertEqual(["1", "20", "30"], checked)
+
+        checked.clear()
+        mutated = self.replace_item(grammar, tree, 1, "99")
+        fitness = constraint.fitness(mutated)
+        self.assertFalse(fitness.success)
+        self.assertEqual(["99"], checked)
+        # Failing trees refer to the mutated individual
+        failing = [failing_tree.tree for failing_tree in fitness.failing_trees]
+        self.assertEqual(["99"], [str(tree) for tree in failing])
+        self.assertIs(mutated, failing[0].get_root())
+
+    def test_incremental_comparison(self):
+        grammar, constraint = self.get_constraint("int(<item>) < 50")
+        constraint.set_incremental(True)
+
+        tree = grammar.parse("1;20;30")
+        self.assertTrue(constraint.fitness(tree).success)
+        mutated = self.replace_item(grammar, tree, 2, "77")
+        fitness = constraint.fitness(mutated)
+        self.assertFalse(fitness.success)
+        self.assertEqual(constraint.fitness(mutated).fitness(), fitness.fitness())
+
+        constraint.set_incremental(False)
+        constraint.clear_cache()
+        self.assertEqual(fitness.fitness(), constraint.fitness(mutated).fitness())
+
+    def test_context_dependent_expressions(self):
+        _, constraint = self.get_constraint("len(<item>.parent.children) == 5")
+        constraint.set_incremental(True)
+        self.assertFalse(constraint.incremental)
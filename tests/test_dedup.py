@@ -0,0 +1,145 @@
+#!/usr/bin/env pytest
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from fandango import Fandango
+from fandango.errors import FandangoValueError
+from fandango.evolution.dedup import (
+    BloomSolutionSet,
+    DiskSolutionSet,
+    make_solution_set,
+)
+
+from .utils import RESOURCES_ROOT
+
+
+def random_keys(n, seed):
+    rng = random.Random(seed)
+    return [rng.randrange(-(2**63), 2**63) for _ in range(n)]
+
+
+@pytest.mark.parametrize("kind", ["exact", "bloom", "disk"])
+def test_solution_sets(kind):
+    solutions = make_solution_set(kind)
+    keys = random_keys(100, seed=1)
+    for key in keys:
+        solutions.add(key)
+    assert all(key in solutions for key in keys)
+    assert not any(key in solutions for key in random_keys(100, seed=2))
+    assert len(solutions) == 100
+    solutions.clear()
+    assert keys[0] not in solutions and len(solutions) == 0
+    solutions.close()
+
+
+def test_unknown_kind():
+    with pytest.raises(FandangoValueError):
+        make_solution_set("fuzzy")
+
+
+def test_bloom_error_rate():
+    solutions = BloomSolutionSet(error_rate=1e-3, initial_capacity=1000)
+    keys = random_keys(20_000, seed=3)
+    for key in keys:
+        solutions.add(key)
+    # No false negatives, even as filters are added
+    assert all(key in solutions for key in keys)
+    false_positives = sum(key in solutions for key in random_keys(20_000, seed=4))
+    assert false_positives <= 20_000 * 1e-3 * 2
+    # Far less than the 8 bytes of a hash alone
+    assert solutions.nbytes < 4 * len(keys)
+
+
+def test_disk_solutions_persist(tmp_path):
+    path = str(tmp_path / "solutions.db")
+    solutions = DiskSolutionSet(path)
+    solutions.add(42)
+    solutions.close()
+
+    solutions = DiskSolutionSet(path)
+    assert 42 in solutions and 43 not in solutions
+    solutions.close()
+
+
+def test_temporary_disk_solutions_are_removed():
+    solutions = DiskSolutionSet()
+    path = solutions.path
+    solutions.add(42)
+    assert os.path.exists(path)
+    solutions.close()
+    assert not os.path.exists(path)
+
+
+def _add_in_child(solutions, queue):
+    queue.put(42 in solutions)
+    solutions.add(43)
+    queue.put(43 in solutions)
+
+
+def test_disk_solutions_in_forked_process():
+    solutions = DiskSolutionSet()
+    solutions.add(42)
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_add_in_child, args=(solutions, queue))
+    process.start()
+    assert queue.get(timeout=30) and queue.get(timeout=30)
+    process.join()
+    # Hashes added in forked processes stay there
+    assert 42 in solutions and 43 not in solutions
+    solutions.close()
+
+
+def test_fuzz_with_bloom_filter():
+    with open(RESOURCES_ROOT / "persons.fan") as spec:
+        fandango = Fandango(spec)
+    solutions = fandango.fuzz(desired_solutions=20, dedup="bloom")
+    assert len(solutions) == 20
+    assert len({hash(solution) for solution in solutions}) == 20
+    assert isinstance(fandango.fandango.evaluator._solution_set, BloomSolutionSet)
+
+
+def test_solution_keys_are_stable_across_processes():
+    code = (
+        "from fandango.evolution.dedup import solution_key;"
+        "from fandango.language.symbols import NonTerminal, Terminal;"
+        "from fandango.language.tree import DerivationTree;"
+        "print(solution_key(DerivationTree(NonTerminal('<start>'), [DerivationTree(Terminal('a'))])))"
+    )
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env=os.environ | {"PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(keys) == 1
+
+
+@pytest.mark.parametrize("saved_kind", ["exact", "bloom", "disk"])
+@pytest.mark.parametrize("loaded_kind", ["exact", "bloom", "disk"])
+def test_dump_and_load(saved_kind, loaded_kind):
+    keys = random_keys(100, seed=5)
+    saved = make_solution_set(saved_kind)
+    for key in keys:
+        saved.add(key)
+    metadata, data = saved.dump()
+    loaded = make_solution_set(loaded_kind)
+    if saved_kind == "bloom" and loaded_kind != "bloom":
+        # Bloom filters cannot enumerate their hashes
+        with pytest.raises(FandangoValueError):
+            loaded.load(metadata, data)
+    else:
+        loaded.load(metadata, data)
+        assert all(key in loaded for key in keys)
+        assert len(loaded) == 100
+    saved.close()
+    loaded.close()
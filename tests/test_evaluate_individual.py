@@ -1,10 +1,12 @@
+from collections import Counter
 from itertools import islice
 
 import pytest
 
 from fandango import DerivationTree
-from fandango.evolution import GeneratorWithReturn
+from fandango.evolution import GeneratorWithReturn, evaluation
 from fandango.evolution.algorithm import DefaultAlgorithm
+from fandango.evolution.dedup import solution_key
 from fandango.language.parse.parse import parse
 from fandango.language.symbols.non_terminal import NonTerminal
 from tests.utils import RESOURCES_ROOT
@@ -304,3 +306,118 @@ def test_does_not_provide_suggestion_with_slice_and_fixed_value():
     assert len(failing_trees) == 0
     suggested_replacements = suggestion.get_replacements(individual, grammar)
     assert len(suggested_replacements) == 0
+
+
+def _describe_evaluation(grammar, evaluation):
+    return [
+        (
+            str(individual),
+            fitness,
+            [(ft.tree.get_choices_path(), id(ft.cause)) for ft in failing_trees],
+            [
+                (target.get_choices_path(), str(source))
+                for target, source in suggestion.get_replacements(individual, grammar)
+            ],
+        )
+        for individual, fitness, failing_trees, suggestion in evaluation
+    ]
+
+
+def test_parallel_evaluation_matches_serial_evaluation():
+    with open(RESOURCES_ROOT / "persons.fan", "r") as file:
+        grammar, constraints = parse(
+            [file, "where <first_name> == 'John'", "where int(<age>) > 50"]
+        )
+
+    assert grammar is not None
+    population = [
+        grammar.parse(f"{first} Doe,{age}")
+        for first in ["John", "Jane", "Jim"]
+        for age in [30, 60, 90]
+    ]
+    results = []
+    for workers in [1, 2]:
+        fan = DefaultAlgorithm(grammar, constraints, workers=workers, diversity_k=0)
+        solutions, evaluation = GeneratorWithReturn(
+            fan.evaluator.evaluate_population(population)
+        ).collect()
+        results.append(
+            (
+                [str(solution) for solution in solutions],
+                _describe_evaluation(grammar, evaluation),
+                fan.evaluator.get_fitness_check_count(),
+            )
+        )
+        fan.evaluator.shutdown()
+
+    assert results[0] == results[1]
+    assert results[1][0] == ["John Doe,60", "John Doe,90"]
+
+
+def test_parallel_evaluation_with_soft_constraints():
+    with open(RESOURCES_ROOT / "persons.fan", "r") as file:
+        grammar, constraints = parse([file, "maximizing int(<age>)"])
+
+    assert grammar is not None
+    fan = DefaultAlgorithm(grammar, constraints, workers=2)
+    solutions = list(islice(fan.generate(max_generations=2), 10))
+    fan.evaluator.shutdown()
+    assert len(solutions) == 10
+    assert len({str(solution) for solution in solutions}) == 10
+
+
+def test_islands():
+    with open(RESOURCES_ROOT / "persons.fan", "r") as file:
+        grammar, constraints = parse([file, "where int(<age>) > 50"])
+
+    assert grammar is not None
+    fan = DefaultAlgorithm(
+        grammar,
+        constraints,
+        population_size=20,
+        islands=2,
+        migration_interval=1,
+        random_seed=1,
+    )
+    solutions = list(fan.generate(max_generations=3))
+    assert len(solutions) > 0
+    assert len({str(solution) for solution in solutions}) == len(solutions)
+    assert all(int(str(solution).split(",")[1]) > 50 for solution in solutions)
+    # The fittest individuals of all islands form the new population
+    assert 0 < len(fan.population) <= 20
+    assert len(fan.evaluation) == len(fan.population)
+    assert all(
+        solution_key(solution) in fan.evaluator._solution_set for solution in solutions
+    )
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_diversity_bonus(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(evaluation, "np", None)
+    with open(RESOURCES_ROOT / "persons.fan", "r") as file:
+        grammar, constraints = parse(file)
+
+    assert grammar is not None
+    population = [
+        grammar.parse(f"{first} Doe,{age}")
+        for first in ["John", "Jane", "John"]
+        for age in [30, 60]
+    ]
+    fill_up = [grammar.parse("Jim Doe,30")]
+    fan = DefaultAlgorithm(grammar, constraints, diversity_k=4)
+    bonus = fan.evaluator.compute_diversity_bonus(population, fill_up)
+
+    all_k_paths = [
+        grammar._extract_k_paths_from_tree(individual, 4)
+        for individual in population + fill_up
+    ]
+    frequencies = Counter(path for k_paths in all_k_paths for path in k_paths)
+    expected = [
+        sum(1.0 / frequencies[path] for path in k_paths) / len(k_paths)
+        for k_paths in all_k_paths[: len(population)]
+    ]
+    assert bonus == pytest.approx(expected)
+    # Equal individuals get equal bonuses
+    assert bonus[0] == bonus[4]
+    assert fan.evaluator.compute_diversity_bonus([]) == []
@@ -0,0 +1,100 @@
+#!/usr/bin/env pytest
+import os
+import sys
+import time
+
+from fandango.executor import Executor, ExecutorPool, InputFile
+
+# Exits with the length of the input
+LENGTH_OF_FILE = [
+    sys.executable,
+    "-c",
+    "import sys; sys.exit(len(open(sys.argv[1], 'rb').read()))",
+]
+LENGTH_OF_STDIN = [
+    sys.executable,
+    "-c",
+    "import sys; sys.exit(len(sys.stdin.buffer.read()))",
+]
+# Reports the length of each input, and its process ID for b"pid"; exits on b"exit"
+PERSISTENT = [
+    sys.executable,
+    "-c",
+    """
+import os, struct, sys
+while header := sys.stdin.buffer.read(4):
+    data = sys.stdin.buffer.read(struct.unpack(">I", header)[0])
+    if data == b"exit":
+        sys.exit(3)
+    if data == b"hang":
+        data = sys.stdin.buffer.read()
+    print(os.getpid() if data == b"pid" else len(data), flush=True)
+""",
+]
+
+
+def test_input_file():
+    input_file = InputFile(suffix=".txt")
+    name = input_file.name
+    assert name.endswith(".txt")
+    input_file.write("long input")
+    input_file.write(b"short")
+    with open(name, "rb") as f:
+        assert f.read() == b"short"
+    input_file.close()
+    assert not os.path.exists(name)
+
+
+def test_executor_filename():
+    executor = Executor(LENGTH_OF_FILE, input_method="filename")
+    assert executor.run("abc") == 3
+    assert executor.run(b"abcdef") == 6
+    executor.close()
+
+
+def test_executor_stdin():
+    executor = Executor(LENGTH_OF_STDIN, input_method="stdin")
+    assert executor.run("abcd") == 4
+    executor.close()
+
+
+def test_executor_timeout():
+    executor = Executor(
+        [sys.executable, "-c", "import time; time.sleep(30)"],
+        input_method="stdin",
+        timeout=0.5,
+    )
+    start = time.monotonic()
+    assert executor.run("") is None
+    assert time.monotonic() - start < 10
+    executor.close()
+
+
+def test_executor_persistent():
+    executor = Executor(PERSISTENT, input_method="persistent", timeout=10)
+    pid = executor.run("pid")
+    assert executor.run("abc") == 3
+    # The same process handles all inputs
+    assert executor.run("pid") == pid
+    # Processes that exit are restarted
+    assert executor.run("exit") == 3
+    assert executor.run("pid") != pid
+    executor.close()
+
+
+def test_executor_persistent_timeout():
+    executor = Executor(PERSISTENT, input_method="persistent", timeout=0.5)
+    assert executor.run("hang") is None
+    assert executor.run("abcde") == 5
+    executor.close()
+
+
+def test_executor_pool():
+    with ExecutorPool(
+        LENGTH_OF_FILE, executors=3, input_method="filename", suffix=".txt"
+    ) as pool:
+        for i in range(10):
+            pool.submit("x" * (i % 2))
+    assert pool.executions == 10
+    assert pool.failures == 5
+    assert pool.timeouts == 0
@@ -45,6 +45,49 @@ class ConstraintTest(unittest.TestCase):
         tree = grammar.fuzz()
         print([t.symbol.format_as_spec() for t in tree.flatten()])
 
+    def test_extract_k_paths(self):
+        grammar, _ = parse(
+            """
+<start> ::= <pair> "," <pair>
+<pair> ::= <digit> <digit>
+<digit> ::= "0" | r"[1-9]"
+""",
+            use_stdlib=False,
+            use_cache=False,
+        )
+        assert grammar is not None
+        tree = grammar.parse("07,07")
+        assert tree is not None
+
+        def spec(k_paths):
+            return {" ".join(s.format_as_spec() for s in path) for path in k_paths}
+
+        self.assertEqual(
+            spec(grammar._extract_k_paths_from_tree(tree, 2)),
+            {
+                "<start>",
+                "<pair>",
+                "<digit>",
+                "','",
+                "'0'",
+                "r'[1-9]'",
+                "<start> <pair>",
+                "<start> ','",
+                "<pair> <digit>",
+                "<digit> '0'",
+                "<digit> r'[1-9]'",
+            },
+        )
+        # k-paths only contain grammar symbols, and all are found in the grammar
+        k_paths = grammar._extract_k_paths_from_tree(tree, 3)
+        self.assertLessEqual(k_paths, grammar.generate_all_k_paths(k=3))
+
+        # Equal subtrees are only processed once
+        pair_1, pair_2 = list(tree.find_subtrees("<pair>"))
+        cache = grammar._subtree_k_path_cache
+        self.assertIn((hash(pair_1), None, 3, None), cache)
+        self.assertEqual(hash(pair_1), hash(pair_2))
+
     def test_parse(self):
         with open(RESOURCES_ROOT / "grammar.fan", "r") as file:
             grammar, _ = parse(file, use_stdlib=False, use_cache=False)
@@ -268,3 +311,52 @@ class PrimerTest(unittest.TestCase):
         }
         for name, dist in should_values.items():
             self.assertEqual(rules[NonTerminal(name)].distance_to_completion, dist)
+
+
+class SizeEstimatorTest(unittest.TestCase):
+    SPEC = """
+<start> ::= <a>{3}
+<a> ::= "x" | "y" "z"
+<nested> ::= "x" | "(" <nested> ")"
+<tree> ::= "x" | <tree> <tree> <tree>
+<items> ::= <item>+
+<item> ::= <d> <d> <d> <d>
+<d> ::= "1"
+"""
+
+    def test_expected_sizes(self):
+        grammar, _ = parse(self.SPEC, use_stdlib=False, use_cache=False, check=False)
+        assert grammar is not None
+        sizes = grammar.expected_sizes()
+        self.assertEqual(sizes[NonTerminal("<a>")], 2.5)
+        self.assertEqual(sizes[NonTerminal("<start>")], 8.5)
+        self.assertAlmostEqual(sizes[NonTerminal("<nested>")], 5.0, places=2)
+        self.assertEqual(sizes[NonTerminal("<tree>")], float("inf"))
+        self.assertEqual(sizes[NonTerminal("<item>")], 9.0)
+
+        # Sizes depend on the maximum number of repetitions
+        max_repetitions = grammar.get_max_repetition()
+        try:
+            grammar.set_max_repetition(3)
+            self.assertEqual(grammar.expected_sizes()[NonTerminal("<items>")], 19.0)
+        finally:
+            grammar.set_max_repetition(max_repetitions)
+
+    def test_fuzz_within_budget(self):
+        grammar, _ = parse(self.SPEC, use_stdlib=False, use_cache=False, check=False)
+        assert grammar is not None
+        random.seed(0)
+        for max_nodes in [10, 30, 100]:
+            for _ in range(20):
+                tree = grammar.fuzz("<items>", max_nodes=max_nodes)
+                self.assertLessEqual(tree.size(), max_nodes)
+                self.assertTrue(grammar.parse(str(tree), "<items>"))
+
+    def test_fuzz_returns_size(self):
+        grammar, _ = parse(self.SPEC, use_stdlib=False, use_cache=False, check=False)
+        assert grammar is not None
+        random.seed(0)
+        for symbol in ["<start>", "<nested>", "<items>"]:
+            parent = DerivationTree(NonTerminal("<parent>"))
+            added = grammar[NonTerminal(symbol)].fuzz(parent, grammar, max_nodes=50)
+            self.assertEqual(added, parent.size() - 1)
@@ -534,3 +534,72 @@ def test_bytes_swap_mutation():
         assert bytearray(sorted(input)) == input_copy, (
             "Input does not contain all elements anymore"
         )
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_havoc_batch(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(havoc, "np", None)
+    elif havoc.np is None:
+        pytest.skip("NumPy is not installed")
+
+    inputs = [bytes(range(i)) for i in range(INPUT_SIZE)]
+    mutants = havoc.havoc_batch(inputs)
+    assert len(mutants) == len(inputs)
+    assert all(isinstance(mutant, bytes) for mutant in mutants)
+    assert (
+        sum(mutant != input_ for mutant, input_ in zip(mutants, inputs, strict=True))
+        > 0
+    )
+    assert havoc.havoc_batch([]) == []
+
+
+@pytest.mark.parametrize(
+    "mutation",
+    [
+        havoc.BitFlipMutation(),
+        havoc.ByteFlipMutation(),
+        havoc.ByteIncMutation(),
+        havoc.ByteDecMutation(),
+        havoc.MultiByteArithmeticMutation(2, havoc.ArithmeticOperation.ADD, True),
+        havoc.MultiByteArithmeticMutation(4, havoc.ArithmeticOperation.SUB, False),
+    ],
+)
+def test_havoc_batch_single_mutation(mutation):
+    if havoc.np is None:
+        pytest.skip("NumPy is not installed")
+
+    input_ = bytes(INPUT_SIZE)
+    for mutant in havoc.havoc_batch([input_] * ITERS, [mutation], max_stack_pow=0):
+        assert len(mutant) == len(input_)
+        expected = bytearray(input_)
+        # Applying the same mutation at the same place yields the same change
+        diffs = [i for i in range(len(mutant)) if mutant[i] != input_[i]]
+        assert diffs, "Input is not mutated"
+        assert diffs[-1] - diffs[0] < getattr(mutation, "num_bytes", 1)
+        if isinstance(mutation, havoc.ByteIncMutation):
+            expected[diffs[0]] = 1
+            assert mutant == expected
+        elif isinstance(mutation, havoc.ByteDecMutation):
+            expected[diffs[0]] = 255
+            assert mutant == expected
+
+
+def test_havoc_batch_short_inputs():
+    # Multi-byte mutations leave inputs alone that are too short for them
+    mutation = havoc.MultiByteInterestingMutation(4)
+    assert havoc.havoc_batch([b"", b"abc"], [mutation]) == [b"", b"abc"]
+
+
+def test_havoc_stage():
+    stage = havoc.HavocStage(2.5, batch_size=10)
+    counts = [len(stage.add(b"input")) for _ in range(5)]
+    # Fractions accumulate: 2 + 3 + 2 + 3 mutants fill the batch after four solutions
+    assert counts == [0, 0, 0, 10, 0]
+    assert len(stage.flush()) == 2
+    assert stage.mutants_made == 12
+
+    stage = havoc.HavocStage(0.5)
+    for _ in range(3):
+        stage.add(b"input")
+    assert len(stage.flush()) == 1
@@ -1,5 +1,9 @@
 #!/usr/bin/env pytest
+import socketserver
+import threading
+
 from fandango.api import Fandango
+from fandango.io import FandangoIO
 from fandango.language.grammar import FuzzingMode
 from fandango.language.tree import DerivationTree
 
@@ -28,3 +32,76 @@ def test_msg_exchange():
     assert messages[3].sender == "Extern"
     assert messages[3].recipient == "Fuzzer"
     assert str(messages[3].msg) == "paff\n"
+
+
+def test_wait_for_receive():
+    io_instance = FandangoIO()
+    assert not io_instance.wait_for_receive(timeout=0.01)
+
+    timer = threading.Timer(
+        0.05, io_instance.add_receive, ("Extern", "Fuzzer", "pong\n")
+    )
+    timer.start()
+    # Returns as soon as the complete message has arrived
+    assert io_instance.wait_for_receive(lambda messages: len(messages) == 5, timeout=5)
+    timer.join()
+    assert io_instance.get_full_fragments() == [("Extern", "Fuzzer", "pong\n")]
+
+
+def test_concurrent_sessions():
+    with open(RESOURCES_ROOT / "minimal_io.fan") as f:
+        spec = f.read()
+    fandango = Fandango(spec, use_stdlib=False, use_cache=False)
+    instances = len(FandangoIO._instances)
+    result_list = fandango.fuzz(mode=FuzzingMode.IO, population_size=1, sessions=3)
+    assert len(result_list) == 1
+    messages = result_list[0].protocol_msgs()
+    assert [str(message.msg) for message in messages] == [
+        "ping\n",
+        "pong\n",
+        "puff\n",
+        "paff\n",
+    ]
+    # The additional sessions are closed once fuzzing is done
+    assert len(FandangoIO._instances) == instances
+
+
+class _PongHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        self.server.connections += 1  # type: ignore[attr-defined]
+        for line in self.rfile:
+            if line == b"ping\n":
+                self.wfile.write(b"pong\n")
+
+
+def test_concurrent_network_sessions():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _PongHandler)
+    server.daemon_threads = True
+    server.connections = 0  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    spec = f"""
+<start> ::= <Client:Server:ping><Server:Client:pong>
+<ping> ::= 'ping\\n'
+<pong> ::= 'pong\\n'
+
+class Client(NetworkParty):
+    def __init__(self):
+        super().__init__("tcp://127.0.0.1:{port}", connection_mode=ConnectionMode.CONNECT)
+        self.start()
+
+class Server(NetworkParty):
+    def __init__(self):
+        super().__init__("tcp://127.0.0.1:{port}", connection_mode=ConnectionMode.EXTERNAL)
+"""
+    try:
+        fandango = Fandango(spec, use_stdlib=False, use_cache=False)
+        result_list = fandango.fuzz(mode=FuzzingMode.IO, population_size=1, sessions=4)
+        assert len(result_list) == 1
+        messages = result_list[0].protocol_msgs()
+        assert [str(message.msg) for message in messages] == ["ping\n", "pong\n"]
+        # The initial connection, plus one connection per session
+        assert server.connections == 5  # type: ignore[attr-defined]
+    finally:
+        server.shutdown()
+        server.server_close()
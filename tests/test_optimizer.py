@@ -132,6 +132,58 @@ class GeneticTest(unittest.TestCase):
         for individual in copy_of_initial_population:
             self.assertIn(individual, population)
 
+    def test_refill_population_with_batches(self):
+        manager = PopulationManager(
+            grammar=self.fandango.grammar,
+            start_symbol=self.fandango.start_symbol,
+        )
+        population: list[DerivationTree] = []
+        expected_count = 10
+        solutions = list(
+            manager.refill_population(
+                current_population=population,
+                eval_individual=self.fandango.evaluator.evaluate_individual,
+                max_nodes=self.fandango.adaptive_tuner.current_max_nodes,
+                target_population_size=expected_count,
+                eval_batch=self.fandango.evaluator.evaluate_batch,
+            )
+        )
+        self.assertEqual(len(population), expected_count, len(population))
+        self.assertEqual(len(set(population)), expected_count)
+        for individual in solutions:
+            self.assertIn(individual, population)
+
+    def test_refill_population_stops_when_saturated(self):
+        grammar, _ = parse('<start> ::= "a" | "b"', use_stdlib=False, use_cache=False)
+        assert grammar is not None
+        fandango = DefaultAlgorithm(grammar=grammar, constraints=[])
+        manager = PopulationManager(grammar=grammar, start_symbol="<start>")
+        generated = 0
+        generate_population_entry = manager._generate_population_entry
+
+        def counting_generate_population_entry(max_nodes: int) -> DerivationTree:
+            nonlocal generated
+            generated += 1
+            return generate_population_entry(max_nodes)
+
+        manager._generate_population_entry = counting_generate_population_entry  # type: ignore[method-assign]
+        population: list[DerivationTree] = []
+        solutions = list(
+            manager.refill_population(
+                current_population=population,
+                eval_individual=fandango.evaluator.evaluate_individual,
+                max_nodes=fandango.adaptive_tuner.current_max_nodes,
+                target_population_size=100,
+                eval_batch=fandango.evaluator.evaluate_batch,
+            )
+        )
+        self.assertEqual(
+            sorted(str(individual) for individual in population), ["a", "b"]
+        )
+        self.assertEqual(len(solutions), 2)
+        # A single block suffices to detect that the grammar is saturated
+        self.assertEqual(generated, 100)
+
     def test_evaluate_fitness(self):
         # Evaluate the fitness of the population
         population = self.fandango.population
@@ -13,6 +13,7 @@ from fandango.language.grammar.parser.parser import Parser
 from fandango.language.parse.parse import parse
 from fandango.language.symbols import NonTerminal, Terminal
 from fandango.language.tree import DerivationTree
+from fandango.language.tree_value import TreeValue
 
 from .utils import DOCS_ROOT, RESOURCES_ROOT, run_command
 
@@ -456,6 +457,131 @@ class TestCanContinueParsing(unittest.TestCase):
         next(self.iter_parser.consume(b"rgbd;"), (None, None))
 
 
+class TestByteAlignedParsing(unittest.TestCase):
+    SPEC = """
+<start> ::= <text> | <bits>
+<text> ::= <word> (";" <word>)*
+<word> ::= r"[a-z]+"
+<bits> ::= b"!" <bit>{8}
+<bit> ::= 0 | 1
+"""
+
+    def setUp(self):
+        grammar, _ = parse(self.SPEC, use_stdlib=False, use_cache=False)
+        assert grammar is not None
+        self.grammar = grammar
+        self.iter_parser = IterativeParser(self.grammar.rules)
+
+    def test_uses_bits(self):
+        self.assertTrue(self.iter_parser.uses_bits(NonTerminal("<start>")))
+        self.assertTrue(self.iter_parser.uses_bits(NonTerminal("<bits>")))
+        self.assertFalse(self.iter_parser.uses_bits(NonTerminal("<text>")))
+        self.assertFalse(self.iter_parser.uses_bits(NonTerminal("<word>")))
+
+    def test_parse(self):
+        for word, start in [
+            ("abc;de", "<start>"),
+            ("abc;de", "<text>"),
+            (b"!A", "<start>"),
+            (b"!A", "<bits>"),
+        ]:
+            tree = self.grammar.parse(word, start)
+            self.assertIsNotNone(tree, (word, start))
+            assert tree is not None
+            self.assertEqual(tree.to_bytes(), TreeValue(word).to_bytes())
+
+    def test_consume_byte_aligned(self):
+        self.iter_parser.new_parse("<text>")
+        parsed = []
+        for char in "abc;de":
+            for tree, is_complete in self.iter_parser.consume(char):
+                self.assertTrue(is_complete)
+                parsed.append(str(self.iter_parser.collapse(tree)))
+        self.assertEqual(parsed, ["a", "ab", "abc", "abc;d", "abc;de"])
+
+
+class TestTerminalIndex(unittest.TestCase):
+    def test_first_chars(self):
+        for spec, as_bytes, expected in [
+            ('"abc"', False, {ord("a")}),
+            ("b'abc'", True, {ord("a")}),
+            ('r"[a-c]x*"', False, {ord("a"), ord("b"), ord("c")}),
+            ('r"(?:foo)?bar"', False, {ord("f"), ord("b")}),
+            ('r"(x|y)+z"', False, {ord("x"), ord("y")}),
+            ('r"^a"', False, {ord("a")}),
+            ("rb'[\\x00-\\x02]'", True, {0, 1, 2}),
+            ('r"a*"', False, None),
+            ('r"."', False, None),
+            ('r"[^a]"', False, None),
+            ('r"\\d"', False, None),
+            ('r"(?i)a"', False, None),
+        ]:
+            terminal = Terminal.from_symbol(spec)
+            self.assertEqual(terminal.first_chars(as_bytes), expected, spec)
+
+    def test_can_start_with(self):
+        terminal = Terminal.from_symbol('r"[0-9]+"')
+        self.assertTrue(terminal.can_start_with("a1", 1))
+        self.assertFalse(terminal.can_start_with("a1", 0))
+        self.assertTrue(terminal.can_start_with(b"a1", 1))
+        self.assertFalse(terminal.can_start_with(b"a1", 0))
+        # At the end of the input, incomplete matches are still possible
+        self.assertTrue(terminal.can_start_with("a1", 2))
+
+    def test_compiled_patterns(self):
+        terminal = Terminal.from_symbol('r"[0-9]+"')
+        self.assertEqual(terminal.check("123a"), (True, 3))
+        self.assertEqual(terminal.check(b"123a"), (True, 3))
+        self.assertEqual(terminal.check("12", incomplete=True), (True, 2))
+        self.assertEqual(terminal.check("a"), (False, 0))
+
+
+class TestPredictionFilter(unittest.TestCase):
+    SPEC = """
+<start> ::= <item>+
+<item> ::= <number> | <name> | <quoted>
+<number> ::= <sign> r"[0-9]+"
+<sign> ::= "" | "-" | "+"
+<name> ::= r"[a-z]+"
+<quoted> ::= "'" r"[a-z ]*" "'"
+"""
+
+    def setUp(self):
+        grammar, _ = parse(self.SPEC, use_stdlib=False, use_cache=False)
+        assert grammar is not None
+        self.grammar = grammar
+        self.iter_parser = IterativeParser(self.grammar.rules)
+
+    def first_sets(self, nonterminal):
+        first_sets = self.iter_parser.first_sets(word_is_bytes=False)
+        return {first for _rule, first in first_sets[NonTerminal(nonterminal)]}
+
+    def test_first_sets(self):
+        digits = frozenset(map(ord, "0123456789"))
+        self.assertEqual(
+            self.first_sets("<number>"), {digits | frozenset(map(ord, "+-"))}
+        )
+        # Nullable rules can always be predicted
+        self.assertEqual(self.first_sets("<sign>"), {None})
+        self.assertEqual(self.first_sets("<quoted>"), {frozenset([ord("'")])})
+
+    def test_parse(self):
+        for word in ["-12", "abc", "'x y'", "12ab-3+4", "", "'"]:
+            expected = word in ["-12", "abc", "'x y'", "12ab-3+4"]
+            self.assertEqual(self.grammar.parse(word) is not None, expected, word)
+
+    def test_predicted_rules(self):
+        self.iter_parser._lookahead = ord("a")
+        self.assertEqual(self.iter_parser.predicted_rules(NonTerminal("<number>")), [])
+        self.assertEqual(
+            len(self.iter_parser.predicted_rules(NonTerminal("<name>"))), 1
+        )
+        self.iter_parser._lookahead = None
+        self.assertEqual(
+            len(self.iter_parser.predicted_rules(NonTerminal("<number>"))), 1
+        )
+
+
 class TestCLIParsing(unittest.TestCase):
     pass
 
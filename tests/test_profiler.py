@@ -0,0 +1,99 @@
+#!/usr/bin/env pytest
+import json
+
+from fandango import Fandango
+from fandango.cache_manager import CacheManager, ManagedCache
+from fandango.evolution.profiler import Profiler, active_profiler, span
+
+from .utils import RESOURCES_ROOT
+
+
+def test_nested_spans():
+    with Profiler(enabled=True) as profiler:
+        assert active_profiler() is profiler
+        for _ in range(3):
+            with span("outer"):
+                with span("inner"):
+                    pass
+                with span("inner"):
+                    pass
+    assert active_profiler() is None
+
+    (outer,) = profiler.root.sorted_children()
+    assert outer.name == "outer"
+    assert outer.calls == 3
+    (inner,) = outer.sorted_children()
+    assert inner.calls == 6
+    assert 0 <= outer.self_ns <= outer.total_ns
+    assert inner.total_ns <= outer.total_ns
+
+
+def test_spans_of_abandoned_generators():
+    def generator():
+        with span("generator"):
+            yield 1
+            yield 2
+
+    with Profiler(enabled=True) as profiler:
+        with span("outer"):
+            gen = generator()
+            next(gen)
+        with span("next"):
+            pass
+    del gen
+
+    names = [child.name for child in profiler.root.sorted_children()]
+    assert sorted(names) == ["next", "outer"]
+
+
+def test_disabled_profiler():
+    profiler = Profiler(enabled=False)
+    with profiler:
+        assert active_profiler() is None
+        with profiler.timer("timer", increment=3) as timer:
+            timer.increment()
+    assert profiler.root.children == {}
+
+
+def test_timer_increment():
+    profiler = Profiler(enabled=True)
+    with profiler.timer("timer", increment=[1, 2]) as timer:
+        timer.increment(3)
+    assert profiler.root.children["timer"].items == 5
+
+
+def test_cache_stats():
+    profiler = Profiler(enabled=True)
+    cache = ManagedCache[int, str](CacheManager())
+    profiler.track_cache("cache", cache)
+    cache[1] = "one"
+    assert cache[1] == "one"
+    (stats,) = profiler.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["bytes"] == cache.bytes > 0
+
+
+def test_profile_fuzzing(tmp_path):
+    with open(RESOURCES_ROOT / "persons.fan") as spec:
+        fandango = Fandango(spec, ["int(<age>) > 50"])
+    with Profiler(enabled=True) as profiler:
+        fandango.fuzz(desired_solutions=10)
+
+    filename = tmp_path / "profile.json"
+    profiler.write(str(filename))
+    with open(filename) as fd:
+        data = json.load(fd)
+
+    events = data["traceEvents"]
+    assert any(event["name"] == "fitness: int(<age>) > 50" for event in events)
+    assert all(event["dur"] >= 0 for event in events if event["ph"] == "X")
+
+    def names(spans):
+        for s in spans:
+            yield s["name"]
+            yield from names(s["children"])
+
+    span_names = set(names(data["profile"]["spans"]))
+    assert {"initial_population", "fuzz", "fitness: int(<age>) > 50"} <= span_names
+    caches = {c["name"]: c for c in data["profile"]["caches"]}
+    assert caches["fitness: int(<age>) > 50"]["misses"] > 0
@@ -0,0 +1,120 @@
+#!/usr/bin/env pytest
+
+import os
+import time
+
+import pytest
+
+from fandango.language.parse.cache import (
+    cache_stats,
+    clear_cache,
+    get_cache_dir,
+    prune_cache,
+)
+from fandango.language.parse.parse_spec import parse_content
+
+from .utils import run_command
+
+SPEC = """
+<start> ::= <greeting> ", " <name>
+<greeting> ::= "Hello" | "Hi"
+<name> ::= "World" | "Fandango"
+where str(<name>) != "World"
+"""
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("FANDANGO_SPEC_CACHE_MB", raising=False)
+    yield get_cache_dir()
+    clear_cache()
+
+
+def cache_entries():
+    return sorted(get_cache_dir().glob("*.pickle"))
+
+
+def test_cache_roundtrip(cache_home):
+    spec = parse_content(SPEC, filename="<cache-test>")
+    assert cache_stats().entries == 1
+    (entry,) = cache_entries()
+    assert not list(cache_home.glob("*.tmp"))
+
+    os.utime(entry, (0, 0))
+    cached = parse_content(SPEC, filename="<cache-test>")
+    assert str(cached.grammar) == str(spec.grammar)
+    assert [c.format_as_spec() for c in cached.constraints] == [
+        c.format_as_spec() for c in spec.constraints
+    ]
+    # Loading marks the entry as recently used
+    assert entry.stat().st_mtime > 0
+
+
+def test_cache_keys_on_settings(cache_home):
+    parse_content(SPEC, filename="<cache-test>")
+    parse_content(SPEC, filename="<cache-test>", max_repetitions=10)
+    parse_content(SPEC, filename="<other-cache-test>")
+    assert cache_stats().entries == 3
+
+
+def test_cache_ignores_corrupt_entries(cache_home):
+    spec = parse_content(SPEC, filename="<cache-test>")
+    (entry,) = cache_entries()
+    entry.write_bytes(entry.read_bytes()[:100])
+
+    reparsed = parse_content(SPEC, filename="<cache-test>")
+    assert str(reparsed.grammar) == str(spec.grammar)
+    (entry,) = cache_entries()
+    assert entry.stat().st_size > 100
+
+
+def test_cache_tracks_included_files(cache_home, tmp_path):
+    outer_file = tmp_path / "outer.fan"
+    inner_file = tmp_path / "inner.fan"
+    outer_file.write_text('include("inner.fan")\n')
+    inner_file.write_text('<start> ::= "Hello"\n')
+
+    used_symbols = {"<stdlib-symbol>"}
+    spec = parse_content(
+        outer_file.read_text(), filename=str(outer_file), used_symbols=used_symbols
+    )
+    assert "<start>" in str(spec.grammar)
+    assert "<start>" in used_symbols
+
+    # Symbols from included files are restored from the cache, too
+    used_symbols = {"<stdlib-symbol>"}
+    parse_content(
+        outer_file.read_text(), filename=str(outer_file), used_symbols=used_symbols
+    )
+    assert "<start>" in used_symbols
+
+    inner_file.write_text('<start> ::= "Goodbye"\n')
+    spec = parse_content(outer_file.read_text(), filename=str(outer_file))
+    assert "Goodbye" in str(spec.grammar)
+    assert cache_stats().entries == 1
+
+
+def test_prune_cache(cache_home):
+    cache_home.mkdir(parents=True)
+    now = time.time()
+    for i in range(5):
+        entry = cache_home / f"{i}.pickle"
+        entry.write_bytes(b"x" * 1000)
+        os.utime(entry, (now - 100 + i, now - 100 + i))
+
+    assert prune_cache(max_bytes=10_000) == 0
+    assert prune_cache(max_bytes=2500) == 3
+    assert [entry.name for entry in cache_entries()] == ["3.pickle", "4.pickle"]
+    assert cache_stats().total_bytes == 2000
+
+
+def test_cache_command(cache_home):
+    parse_content(SPEC, filename="<cache-test>")
+    out, err, code = run_command(["fandango", "cache", "stats"])
+    assert code == 0, err
+    assert "Cached specs:    1" in out
+
+    _, err, code = run_command(["fandango", "cache", "clear"])
+    assert code == 0, err
+    assert cache_stats().entries == 0
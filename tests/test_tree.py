@@ -79,3 +79,77 @@ def test_find_nt_is_breadth_first():
     assert targets[1].parent is not None
     assert str(targets[0].parent.symbol) == "<left>"
     assert str(targets[1].parent.symbol) == "<right>"
+
+
+def test_replace_copies_unchanged_subtrees():
+    SPEC = """
+    <start> ::= <a> <b> <c> <c>
+    <a> ::= "a" | "A"
+    <b> ::= "b" | "B"
+    <c> ::= "c" <d> | "C" <d>
+    <d> ::= "d" | "D"
+    """
+
+    grammar, _ = parse(SPEC)
+    assert grammar is not None
+    tree = grammar.parse("abcdCD")
+    assert isinstance(tree, DerivationTree)
+    original_hash = hash(tree)
+
+    last_d = list(tree.find_subtrees("<d>"))[-1]
+    new_tree = tree.replace(grammar, last_d, grammar.parse("d", start="<d>"))
+
+    assert str(new_tree) == "abcdCd"
+    # The original tree is left alone
+    assert str(tree) == "abcdCD"
+    assert hash(tree) == original_hash
+
+    # Unchanged subtrees are copies, with consistent parents and hashes
+    for old, new in zip(tree.children[:3], new_tree.children[:3], strict=True):
+        assert new is not old
+        assert new == old
+        assert new.parent is new_tree
+    for node in new_tree.descendants():
+        assert any(child is node for child in node.parent.children)
+    assert hash(new_tree) == hash(grammar.parse("abcdCd"))
+
+
+def test_subtree_index():
+    spec = """
+<start> ::= <left> <right>
+<left> ::= <target> <target>
+<right> ::= "x" <target>
+<target> ::= "a" | "b"
+"""
+    grammar, _ = parse(spec)
+    assert grammar is not None
+    tree = grammar.parse("abxa")
+    assert isinstance(tree, DerivationTree)
+    left, right = tree.children
+
+    # Only roots are indexed
+    assert left.subtree_index() is None
+    index = tree.subtree_index()
+    assert index is not None
+    assert tree.subtree_index() is index
+
+    # Same results (and order) as without an index
+    targets = list(tree.find_subtrees("<target>"))
+    assert targets == [*left.children, right.children[1]]
+    assert tree.find_all_nodes(NonTerminal("<target>")) == targets
+    assert list(tree.find_subtrees("<start>")) == [tree]
+
+    # Changes anywhere in the tree drop the index
+    new_target = grammar.parse("b", start="<target>")
+    assert isinstance(new_target, DerivationTree)
+    right.add_child(new_target)
+    assert tree._subtree_index is None
+    assert list(tree.find_subtrees("<target>"))[-1] is new_target
+
+    source = grammar.parse("a", start="<target>")
+    assert isinstance(source, DerivationTree)
+    right.sources = [source]
+    assert len(list(tree.find_subtrees("<target>"))) == 5
+
+    left.children[0].read_only = True
+    assert len(tree.find_all_nodes(NonTerminal("<target>"))) == 4